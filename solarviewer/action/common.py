@@ -4,9 +4,12 @@ import numpy as np
 from PyQt5 import QtWidgets
 
 from solarviewer.app.content import ContentController
+from solarviewer.app.util import getExtensionString
 from solarviewer.config.base import ItemConfig, ViewerType, DataType, ActionController
 from solarviewer.config.ioc import RequiredFeature
-from solarviewer.util import executeLongRunningTask
+from solarviewer.ui.open_region import Ui_OpenRegion
+from solarviewer.util import executeLongRunningTask, classproperty
+from solarviewer.viewer.map import MapViewerController, MapModel, openMapRegion
 
 
 class CutController(ActionController):
@@ -23,8 +26,8 @@ class CutController(ActionController):
         data_copy.map = submap
         return data_copy
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setMenuPath("Edit/Crop To Current View").addSupportedViewer(
             ViewerType.MPL).addSupportedData(DataType.MAP)
 
@@ -32,8 +35,8 @@ class CutController(ActionController):
 class SNRController(ActionController):
     content_ctrl: ContentController = RequiredFeature(ContentController.name)
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setMenuPath("Help/Calculate SNR").addSupportedViewer(
             ViewerType.MPL).addSupportedData(DataType.MAP)
 
@@ -42,3 +45,27 @@ class SNRController(ActionController):
         snr = np.mean(data) / np.std(data)
         message = "Estimated SNR: {0:.7}".format(float(snr))
         QtWidgets.QMessageBox.information(None, "SNR", message)
+
+
+class OpenRegionAction(ActionController):
+    content_ctrl: ContentController = RequiredFeature(ContentController.name)
+
+    def __init__(self):
+        self._view = QtWidgets.QDialog()
+        self._ui = Ui_OpenRegion()
+        self._ui.setupUi(self._view)
+
+    @classproperty
+    def item_config(cls) -> ItemConfig:
+        return ItemConfig().setMenuPath("File/Open SunPy Map/Region")
+
+    def onAction(self):
+        extensions = getExtensionString(MapViewerController.viewer_config.file_types)
+        files, _ = QtWidgets.QFileDialog.getOpenFileNames(None, "Open Region", "", extensions)
+        if not files or not self._view.exec_():
+            return
+        bottom_left = (self._ui.x_min.value(), self._ui.y_min.value())
+        top_right = (self._ui.x_max.value(), self._ui.y_max.value())
+        world = self._ui.unit_combo.currentText() == "Arcsec"
+        self.content_ctrl.openFiles(MapViewerController, files,
+                                    lambda f: MapModel(openMapRegion(f, bottom_left, top_right, world)))
@@ -1,41 +1,45 @@
 from PyQt5 import QtWidgets, QtCore
 from PyQt5.QtGui import QStandardItemModel, QStandardItem
-from sunpy.image.coalignment import mapsequence_coalign_by_match_template
 from sunpy.map import Map
-from sunpy.physics.solar_rotation import mapsequence_solar_derotate
 
 from solarviewer.app.content import ContentController
 from solarviewer.config.base import ItemConfig, ActionController, DataType, DataModel, ViewerType
 from solarviewer.config.impl import DataActionController
 from solarviewer.config.ioc import RequiredFeature
 from solarviewer.ui.open_composite import Ui_OpenComposite
+from solarviewer.util import classproperty, lazyImport
 from solarviewer.viewer.composite import CompositeMapModel, CompositeMapViewerController
 
+coalignment = lazyImport("sunpy.image.coalignment")
+solar_rotation = lazyImport("sunpy.physics.solar_rotation")
+
 
 class DerotateController(DataActionController):
+    copy_data = False  # the maps are replaced
 
     def modifyData(self, data_model: CompositeMapModel) -> DataModel:
         mc = Map(data_model.getMaps(), cube=True)
-        derotated = mapsequence_solar_derotate(mc)
+        derotated = solar_rotation.mapsequence_solar_derotate(mc)
         data_model.updateMaps(derotated.maps)
         return data_model
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setMenuPath("Edit/Composite Map/Derotate").addSupportedViewer(
             ViewerType.ANY).addSupportedData(DataType.MAP_COMPOSITE)
 
 
 class CoalignController(DataActionController):
+    copy_data = False  # the maps are replaced
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setMenuPath("Edit/Composite Map/Coalign").addSupportedViewer(
             ViewerType.ANY).addSupportedData(DataType.MAP_COMPOSITE)
 
     def modifyData(self, data_model: CompositeMapModel) -> DataModel:
         mc = Map(data_model.getMaps(), cube=True)
-        coaligned = mapsequence_coalign_by_match_template(mc)
+        coaligned = coalignment.mapsequence_coalign_by_match_template(mc)
         data_model.updateMaps(coaligned.maps)
         return data_model
 
@@ -43,8 +47,8 @@ class CoalignController(DataActionController):
 class CreateCompositeMapTool(ActionController):
     content_ctrl: ContentController = RequiredFeature(ContentController.name)
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setMenuPath("File/Open SunPy Composite Map/From Active")
 
     def onAction(self):
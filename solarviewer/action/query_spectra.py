@@ -1,14 +1,13 @@
 from PyQt5 import QtCore
 from PyQt5.QtCore import QDateTime
 from PyQt5.QtWidgets import QDialog
-from radiospectra.sources import CallistoSpectrogram
 
 from solarviewer.app.content import ContentController
 from solarviewer.config.base import ActionController, ItemConfig
 from solarviewer.config.ioc import RequiredFeature
 from solarviewer.ui.query_callisto import Ui_QueryCallisto
 from solarviewer.util import executeLongRunningTask
-from solarviewer.viewer.spectra import CallistoViewerController
+from solarviewer.viewer.spectra import CallistoViewerController, sources
 
 
 class QueryCallistoActionController(ActionController):
@@ -28,7 +27,7 @@ class QueryCallistoActionController(ActionController):
             start_time = ui.start_time.dateTime().toString(QtCore.Qt.ISODate).replace("T", " ")
             end_time = ui.end_time.dateTime().toString(QtCore.Qt.ISODate).replace("T", " ")
 
-            executeLongRunningTask(CallistoSpectrogram.from_range, [ui.instrument.currentText(), start_time, end_time],
+            executeLongRunningTask(sources.CallistoSpectrogram.from_range, [ui.instrument.currentText(), start_time, end_time],
                                    "Downloading", self._openSpectrogram)
 
     def _openSpectrogram(self, spectrogram):
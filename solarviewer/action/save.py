@@ -1,31 +1,36 @@
+import copy
 import os
-import pickle
 
 import matplotlib
 from PyQt5 import QtWidgets
 from PyQt5.QtWidgets import QFileDialog
-from radiospectra.sources import CallistoSpectrogram
 from sunpy.map import GenericMap
 
 from solarviewer.app.content import ContentController
+from solarviewer.app.project import ProjectFile
 from solarviewer.app.util import saveFits, getExtensionString
 from solarviewer.config.base import ActionController, ItemConfig, DataType, ViewerType, FileType
 from solarviewer.config.ioc import RequiredFeature
 from solarviewer.ui.save_image import Ui_SaveImage
+from solarviewer.util import classproperty, executeLongRunningTask
+from solarviewer.viewer.spectra import sources
 
+project_data_types = [DataType.MAP, DataType.MAP_COMPOSITE, DataType.PLAIN_2D]  # models supported by project files
 
-class ProjectSaveWrapper:
-    def __init__(self, viewer_ctrl_type, model):
-        self.viewer_ctrl_type = viewer_ctrl_type
-        self.model = model
+
+def saveProject(viewer_ctrl, file):
+    """Writes the project in the background. The model is copied on write, the viewer can be modified meanwhile."""
+    model = copy.deepcopy(viewer_ctrl.model)
+    executeLongRunningTask(ProjectFile(file).save, [type(viewer_ctrl), model], "Saving Project")
 
 
 class SaveProjectAction(ActionController):
     content_ctrl: ContentController = RequiredFeature(ContentController.name)
 
-    @property
-    def item_config(self) -> ItemConfig:
-        return ItemConfig().setMenuPath("File/Save").addSupportedData(DataType.ANY).addSupportedViewer(ViewerType.ANY)
+    @classproperty
+    def item_config(cls) -> ItemConfig:
+        return ItemConfig().setMenuPath("File/Save").setSupportedData(list(project_data_types)).addSupportedViewer(
+            ViewerType.ANY)
 
     def onAction(self):
         ctrl = self.content_ctrl.getViewerController()
@@ -39,20 +44,16 @@ class SaveProjectAction(ActionController):
                 return
             model.path = file
 
-        wrapper = ProjectSaveWrapper(type(ctrl), model)
-        # write to file
-        bin_file = open(file, mode="wb")
-        pickle.dump(wrapper, bin_file)
-        bin_file.close()
+        saveProject(ctrl, file)
 
 
 class SaveAsProjectAction(ActionController):
     content_ctrl: ContentController = RequiredFeature(ContentController.name)
 
-    @property
-    def item_config(self) -> ItemConfig:
-        return ItemConfig().setMenuPath("File/Save As..").addSupportedData(DataType.ANY).addSupportedViewer(
-            ViewerType.ANY)
+    @classproperty
+    def item_config(cls) -> ItemConfig:
+        return ItemConfig().setMenuPath("File/Save As..").setSupportedData(
+            list(project_data_types)).addSupportedViewer(ViewerType.ANY)
 
     def onAction(self):
         ctrl = self.content_ctrl.getViewerController()
@@ -62,19 +63,14 @@ class SaveAsProjectAction(ActionController):
         if not file:
             return
         model.path = file
-        wrapper = ProjectSaveWrapper(type(ctrl), model)
-
-        # write to file
-        bin_file = open(file, mode="wb")
-        pickle.dump(wrapper, bin_file)
-        bin_file.close()
+        saveProject(ctrl, file)
 
 
 class OpenProjectAction(ActionController):
     content_ctrl: ContentController = RequiredFeature(ContentController.name)
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setMenuPath("File/Open SV Project")
 
     def onAction(self):
@@ -82,18 +78,17 @@ class OpenProjectAction(ActionController):
         if not file:
             return
 
-        bin_file = open(file, mode="rb")
-        wrapper = pickle.load(bin_file)
-        ctrl = wrapper.viewer_ctrl_type.fromModel(wrapper.model)
-        self.content_ctrl.addViewerController(ctrl)
-        bin_file.close()
+        # the manifest is small, the data is read in the background (maps are shown as preview first)
+        project = ProjectFile(file)
+        self.content_ctrl.openFiles(project.getViewerType(), [file], lambda f: project.readModel(),
+                                    lambda f: project.readModel(preview=True))
 
 
 class SaveFitsAction(ActionController):
     content_ctrl: ContentController = RequiredFeature(ContentController.name)
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setMenuPath("File/Export/FITS").addSupportedData(DataType.MAP).addSupportedViewer(
             ViewerType.ANY)
 
@@ -105,13 +100,13 @@ class SaveFitsAction(ActionController):
 class SaveSpectraFitsAction(ActionController):
     content_ctrl: ContentController = RequiredFeature(ContentController.name)
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setMenuPath("File/Export/FITS").addSupportedData(DataType.SPECTROGRAM).addSupportedViewer(
             ViewerType.ANY)
 
     def onAction(self):
-        spec: CallistoSpectrogram = self.content_ctrl.getDataModel().spectrogram
+        spec: sources.CallistoSpectrogram = self.content_ctrl.getDataModel().spectrogram
         name, _ = QtWidgets.QFileDialog.getSaveFileName(filter=getExtensionString(FileType.FITS.value))
         if name:
             spec.save(name)
@@ -120,8 +115,8 @@ class SaveSpectraFitsAction(ActionController):
 class SaveImageController(ActionController):
     content_ctrl: ContentController = RequiredFeature(ContentController.name)
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setMenuPath("File/Export/Image").addSupportedData(DataType.ANY).addSupportedViewer(
             ViewerType.MPL)
 
@@ -4,6 +4,7 @@ from PyQt5.QtWidgets import QFileDialog
 
 from solarviewer.config.base import ActionController, ItemConfig
 from solarviewer.ui.db_settings import Ui_DBSettings
+from solarviewer.util import classproperty
 
 
 class DBDialog(ActionController):
@@ -20,8 +21,8 @@ class DBDialog(ActionController):
         self._ui.file_select.clicked.connect(selectFile)
         self._ui.buttonBox.accepted.connect(self.onOk)
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setMenuPath("File/Change DB Settings")
 
     def onAction(self):
@@ -1,15 +1,15 @@
-from typing import List
+from typing import List, Type
 
 from PyQt5 import QtWidgets, QtGui
 from PyQt5.QtWidgets import QShortcut, QFileDialog
 
 from solarviewer.app.content import ContentController
 from solarviewer.app.statusbar import StatusBarController
-from solarviewer.app.util import InitUtil, supported, getExtensionString
+from solarviewer.app.util import InitUtil, supported, getExtensionString, getItemConfig
 from solarviewer.config import content_ctrl_name, viewers_name
-from solarviewer.config.base import ToolController, DialogController, ActionController, ViewerController
+from solarviewer.config.base import ToolController, DialogController, ActionController, ViewerController, Controller
 from solarviewer.config.impl import ToolbarController
-from solarviewer.config.ioc import RequiredFeature, MatchingFeatures, IsInstanceOf
+from solarviewer.config.ioc import RequiredFeature, MatchingFeatureTypes, IsSubclassOf, features
 from solarviewer.ui.app import Ui_MainWindow
 from solarviewer.util import installMissingAndExecute, classproperty
 
@@ -18,10 +18,10 @@ class AppController(QtWidgets.QMainWindow):
     content_ctrl: ContentController = RequiredFeature(content_ctrl_name)
     status_bar_ctrl: StatusBarController = RequiredFeature(StatusBarController.name)
     viewers = RequiredFeature(viewers_name)
-    tool_ctrls: List[ToolController] = MatchingFeatures(IsInstanceOf(ToolController))
-    dlg_ctrls: List[DialogController] = MatchingFeatures(IsInstanceOf(DialogController))
-    action_ctrls: List[ActionController] = MatchingFeatures(IsInstanceOf(ActionController))
-    toolbar_ctrls: List[ToolbarController] = MatchingFeatures(IsInstanceOf(ToolbarController))
+    tool_ctrls: List[Type[ToolController]] = MatchingFeatureTypes(IsSubclassOf(ToolController))
+    dlg_ctrls: List[Type[DialogController]] = MatchingFeatureTypes(IsSubclassOf(DialogController))
+    action_ctrls: List[Type[ActionController]] = MatchingFeatureTypes(IsSubclassOf(ActionController))
+    toolbar_ctrls: List[Type[ToolbarController]] = MatchingFeatureTypes(IsSubclassOf(ToolbarController))
 
     def __init__(self, parent=None):
         QtWidgets.QMainWindow.__init__(self, parent)
@@ -68,7 +68,7 @@ class AppController(QtWidgets.QMainWindow):
                 return
         for ctrl in self.action_ctrls:
             if ctrl.name == controller_name:
-                ctrl.onAction()
+                self._triggerAction(ctrl)
                 return
         for ctrl in self.toolbar_ctrls:
             if ctrl.name == controller_name:
@@ -80,21 +80,19 @@ class AppController(QtWidgets.QMainWindow):
         files, _ = QFileDialog.getOpenFileNames(None, "Open File", "", extensions)
         if not files:
             return
-        if ctrl.viewer_config.multi_file:
-            viewer = ctrl.fromFile(files)
-            self.content_ctrl.addViewerController(viewer)
-            return
-        for f in files:
-            viewer = ctrl.fromFile(f)
-            self.content_ctrl.addViewerController(viewer)
+        self.content_ctrl.openFiles(ctrl, files)
+
+    def _getController(self, ctrl: Type[Controller]) -> Controller:
+        return features[ctrl.name]  # instantiates the controller upon first request
 
-    def _toggleTool(self, ctrl: ToolController, action=None):
+    def _toggleTool(self, ctrl: Type[ToolController], action=None):
         if ctrl.name not in self.active_tools:
-            dock = QtWidgets.QDockWidget(ctrl.item_config.title)
-            content = ctrl.view
+            item_config = getItemConfig(ctrl)
+            dock = QtWidgets.QDockWidget(item_config.title)
+            content = self._getController(ctrl).view
             dock.setWidget(content)
             self._setCloseAction(action, content, dock, ctrl.name)
-            self.addDockWidget(ctrl.item_config.orientation, dock)
+            self.addDockWidget(item_config.orientation, dock)
             self.active_tools[ctrl.name] = dock
         else:
             self.active_tools.pop(ctrl.name).close()
@@ -108,18 +106,21 @@ class AppController(QtWidgets.QMainWindow):
 
         dock.closeEvent = f
 
-    def _toggleToolbar(self, ctrl: ToolbarController):
+    def _toggleToolbar(self, ctrl: Type[ToolbarController]):
         if ctrl.name not in self.active_toolbars:
-            tool_bar = ctrl.view
-            self.addToolBar(ctrl.item_config.orientation, tool_bar)
+            tool_bar = self._getController(ctrl).view
+            self.addToolBar(getItemConfig(ctrl).orientation, tool_bar)
             self.active_toolbars[ctrl.name] = tool_bar
         else:
             self.active_toolbars.pop(ctrl.name).close()
 
-    def _openDialog(self, dlg_ctrl: DialogController):
-        dlg = dlg_ctrl.view
+    def _openDialog(self, dlg_ctrl: Type[DialogController]):
+        dlg = self._getController(dlg_ctrl).view
         dlg.exec_()
 
+    def _triggerAction(self, action_ctrl: Type[ActionController]):
+        self._getController(action_ctrl).onAction()
+
     def _initIcon(self):
         icon = QtGui.QIcon()
         icon.addPixmap(QtGui.QPixmap(":/image/icon.png"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
@@ -136,17 +137,18 @@ class AppController(QtWidgets.QMainWindow):
 
     def _initTools(self):
         for ctrl in self.tool_ctrls:
-            tree = ctrl.item_config.menu_path.split("/")
+            item_config = getItemConfig(ctrl)
+            tree = item_config.menu_path.split("/")
             if len(tree) == 1:
                 continue
             action = InitUtil.getAction(tree, self.ui.menubar, True)
             action.triggered.connect(lambda evt, c=ctrl, a=action: self._toggleTool(c, a))
-            if ctrl.item_config.shortcut:
-                QShortcut(ctrl.item_config.shortcut, self, lambda: action.trigger() if action.isEnabled() else None)
+            if item_config.shortcut:
+                QShortcut(item_config.shortcut, self, lambda: action.trigger() if action.isEnabled() else None)
 
     def _initDialogs(self):
         for ctrl in self.dlg_ctrls:
-            tree = ctrl.item_config.menu_path.split("/")
+            tree = getItemConfig(ctrl).menu_path.split("/")
             if len(tree) == 1:
                 continue
 
@@ -155,16 +157,16 @@ class AppController(QtWidgets.QMainWindow):
 
     def _initActions(self):
         for ctrl in self.action_ctrls:
-            tree = ctrl.item_config.menu_path.split("/")
+            tree = getItemConfig(ctrl).menu_path.split("/")
             if len(tree) == 1:
                 continue
 
             action_manager = self._getActionManager(ctrl, tree)
-            action_manager.register(ctrl, ctrl.onAction, self)
+            action_manager.register(ctrl, lambda c=ctrl: self._triggerAction(c), self)
 
     def _initToolbars(self):
         for ctrl in self.toolbar_ctrls:
-            tree = ctrl.item_config.menu_path.split("/")
+            tree = getItemConfig(ctrl).menu_path.split("/")
             if len(tree) == 1:
                 continue
             action = InitUtil.getAction(tree, self.ui.menubar, checkable=True)
@@ -174,16 +176,18 @@ class AppController(QtWidgets.QMainWindow):
         def f(vc: ViewerController, a=action, c=ctrl):
             dt = vc.data_type if vc else None
             vt = vc.viewer_type if vc else None
-            enabled = supported(dt, vt, c.item_config.supported_data_types, c.item_config.supported_viewer_types)
+            item_config = getItemConfig(c)
+            enabled = supported(dt, vt, item_config.supported_data_types, item_config.supported_viewer_types)
             a.setEnabled(enabled)
 
         self.content_ctrl.subscribeViewerChanged(f)
         f(None)  # initial
 
     def _getActionManager(self, ctrl, tree):
-        if ctrl.item_config.menu_path in self.action_managers:
-            action_manager = self.action_managers[ctrl.item_config.menu_path]
+        menu_path = getItemConfig(ctrl).menu_path
+        if menu_path in self.action_managers:
+            action_manager = self.action_managers[menu_path]
         else:
             action_manager = InitUtil.createActionManager(tree, self.ui.menubar)
-            self.action_managers[ctrl.item_config.menu_path] = action_manager
+            self.action_managers[menu_path] = action_manager
         return action_manager
@@ -1,10 +1,11 @@
-from typing import Callable, List, Dict
+import sys
+from typing import Callable, List, Dict, Type
 
 from PyQt5 import QtWidgets, QtCore
 from PyQt5.QtWidgets import QTabWidget
 
 from solarviewer.config.base import ViewerController, Controller, DataModel, Viewer
-from solarviewer.util import executeWaitTask
+from solarviewer.util import executeTask, CancellationToken, Priority
 
 
 class ContentModel:
@@ -47,6 +48,13 @@ class ContentModel:
         tab = self._tabs.pop(v_id)
         return ctrl, tab
 
+    def replace(self, v_id, viewer: ViewerController):
+        """Replaces the viewer controller, the order of the viewers and tabs is kept."""
+        ctrl, tab = self._viewers[v_id], self._tabs[v_id]
+        self._viewers = {viewer.v_id if k == v_id else k: viewer if k == v_id else v for k, v in self._viewers.items()}
+        self._tabs = {viewer.v_id if k == v_id else k: v for k, v in self._tabs.items()}
+        return ctrl, tab
+
     def count(self):
         return len(self._viewers.keys())
 
@@ -67,6 +75,7 @@ class ContentController(Controller):
         self._viewer_added_subscribers = {}
         self._viewer_closed_subscribers = {}
         self._data_changed_subscribers = {}
+        self._memory_providers = []
 
         self._view = QtWidgets.QMainWindow()
         self._view.setTabPosition(QtCore.Qt.AllDockWidgetAreas, QTabWidget.North)
@@ -90,7 +99,7 @@ class ContentController(Controller):
         """
         if data_type:
             return [v for v in self._model.getViewerCtrls().values() if v.data_type == data_type]
-        return self._model.getViewerCtrls().value()
+        return list(self._model.getViewerCtrls().values())
 
     def getViewerController(self, v_id=-1) -> ViewerController:
         """
@@ -189,12 +198,10 @@ class ContentController(Controller):
     def addViewerController(self, viewer_ctrl):
         self._model.addViewerCtrl(viewer_ctrl)
 
-        wrapper = QtWidgets.QDockWidget("{}: {}".format(viewer_ctrl.v_id, viewer_ctrl.getTitle()))
-        wrapper.setWidget(viewer_ctrl.view)
+        wrapper = QtWidgets.QDockWidget(self._getTabTitle(viewer_ctrl))
+        self._setTabViewer(wrapper, viewer_ctrl)
 
         wrapper.setFocusPolicy(QtCore.Qt.ClickFocus)
-        wrapper.focusInEvent = lambda x, v=viewer_ctrl.v_id, dock=wrapper: self._onViewerChanged(v, dock)
-        wrapper.closeEvent = lambda evt, v=viewer_ctrl.v_id: self._onTabClosed(v)
         wrapper.setFeatures(
             QtWidgets.QDockWidget.DockWidgetVerticalTitleBar | QtWidgets.QDockWidget.DockWidgetClosable | QtWidgets.QDockWidget.DockWidgetFloatable | QtWidgets.QDockWidget.DockWidgetMovable)
         wrapper.setMinimumSize(300, 300)
@@ -206,6 +213,116 @@ class ContentController(Controller):
         self._onViewerAdded(viewer_ctrl)
         wrapper.setFocus()  # triggers _onViewerChanged
 
+    def activateViewer(self, v_id):
+        """
+        Shows the tab of the viewer with id=v_id and makes it the active viewer.
+        :param v_id: the unique identifier
+        """
+        wrapper = self._model.getTabs()[v_id]
+        wrapper.raise_()
+        wrapper.setFocus()
+        self._onViewerChanged(v_id, wrapper)
+
+    def replaceViewerController(self, v_id, viewer_ctrl):
+        """
+        Replaces the viewer controller with id=v_id by viewer_ctrl, in the same tab. Subscribers are notified as
+        if the old viewer was closed and the new one was added.
+
+        :param v_id: the unique identifier of the replaced viewer
+        :param viewer_ctrl: the new viewer controller
+        """
+        active = self._model.isActive(v_id)
+        old_ctrl, wrapper = self._model.replace(v_id, viewer_ctrl)
+        old_ctrl.close()
+        self._onViewerClosed(old_ctrl)
+
+        self._setTabViewer(wrapper, viewer_ctrl)
+        wrapper.setWindowTitle(self._getTabTitle(viewer_ctrl))
+        self._onViewerAdded(viewer_ctrl)
+        if active:
+            self._model.setActiveViewer(None)
+            self._onViewerChanged(viewer_ctrl.v_id, wrapper)
+
+    def _setTabViewer(self, wrapper, viewer_ctrl):
+        wrapper.setWidget(viewer_ctrl.view)
+        wrapper.focusInEvent = lambda x, v=viewer_ctrl.v_id, dock=wrapper: self._onViewerChanged(v, dock)
+        wrapper.closeEvent = lambda evt, v=viewer_ctrl.v_id: self._onTabClosed(v)
+
+    def openFiles(self, viewer_ctrl_type: Type[ViewerController], files: List[str],
+                  read_model: Callable = None, read_preview: Callable = None) -> CancellationToken:
+        """
+        Opens the files in new viewers. The files are read in parallel and each viewer is added as soon as its file
+        is ready. Large files are shown as preview first, if supported by the viewer. A progress dialog allows to
+        cancel the remaining files. Errors are reported per file.
+
+        :param viewer_ctrl_type: the viewer controller class
+        :param files: the file paths (opened in a single viewer for multi file viewers)
+        :param read_model: optional function of form read_model(file) -> DataModel to replace
+            viewer_ctrl_type.readModel (e.g., to read a region of the file). No preview is shown.
+        :param read_preview: optional function of form read_preview(file) -> DataModel to replace
+            viewer_ctrl_type.readPreview
+        :return: the cancellation token of the batch
+        """
+        jobs = [files] if viewer_ctrl_type.viewer_config.multi_file else list(files)
+        batch = _OpenBatch(viewer_ctrl_type, len(jobs))
+        if read_model is not None:
+            batch.read_model = read_model
+            batch.read_preview = lambda f: None
+        if read_preview is not None:
+            batch.read_preview = read_preview
+        for job in jobs:
+            # models are wrapped, since None is a valid result
+            executeTask(lambda f: (batch.read_preview(f),), [job], self._onPreviewRead, [batch, job],
+                        token=batch.token, call_error=self._onPreviewError)
+        return batch.token
+
+    def _onPreviewRead(self, result, batch, file):
+        preview, = result
+        viewer_ctrl = None
+        if preview is not None:
+            viewer_ctrl = batch.viewer_ctrl_type.fromModel(preview)
+            self.addViewerController(viewer_ctrl)
+        priority = Priority.BACKGROUND if preview is not None else Priority.DEFAULT
+        executeTask(lambda f: (batch.read_model(f),), [file], self._onFileRead,
+                    [batch, file, viewer_ctrl, preview], priority=priority, token=batch.token,
+                    call_error=self._onFileError)
+
+    def _onPreviewError(self, ex, batch, file):
+        # the file is opened without preview
+        self._onPreviewRead((None,), batch, file)
+
+    def _onFileRead(self, result, batch, file, preview_ctrl, preview):
+        model, = result
+        batch.step()
+        if preview_ctrl is not None:  # replace the preview
+            if model is not None and preview_ctrl.v_id in self._model.getViewerCtrls():
+                if preview_ctrl.model is not preview:  # keep the changes of the user
+                    model.setDisplayState(preview_ctrl.model)
+                self.setDataModel(model, preview_ctrl.v_id)
+                self._model.getTabs()[preview_ctrl.v_id].setWindowTitle(self._getTabTitle(preview_ctrl))
+            return
+        try:
+            # controllers without readModel are created on the GUI thread
+            viewer_ctrl = batch.viewer_ctrl_type.fromModel(model) if model is not None else \
+                batch.viewer_ctrl_type.fromFile(file)
+        except Exception as ex:
+            self._reportFileError(ex, file)
+            return
+        self.addViewerController(viewer_ctrl)
+
+    def _onFileError(self, ex, batch, file, preview_ctrl=None, preview=None):
+        batch.step()
+        self._reportFileError(ex, file)
+
+    def _reportFileError(self, ex, file):
+        # report without aborting the remaining files
+        error = IOError("Unable to open {}: {}".format(file, ex))
+        sys.excepthook(IOError, error, ex.__traceback__)
+
+    def _getTabTitle(self, viewer_ctrl):
+        title = "{}: {}".format(viewer_ctrl.v_id, viewer_ctrl.getTitle())
+        return title + " (preview)" if viewer_ctrl.model.preview else title
+
     def _getDefaultDockArea(self):
         if self._model.getActiveTab():
             return self._view.dockWidgetArea(self._model.getActiveTab())
@@ -238,7 +355,7 @@ class ContentController(Controller):
     def _onViewerClosed(self, viewer_controller):
         for sub in self._viewer_closed_subscribers.values():
             sub(viewer_controller)
-        self._data_changed_subscribers.pop(viewer_controller.v_id)
+        self._data_changed_subscribers.pop(viewer_controller.v_id, None)
 
     def _onDataChanged(self, v_id):
         viewer_ctrl = self.getViewerController(v_id)
@@ -251,8 +368,8 @@ class ContentController(Controller):
 
         if viewer_controller is None:
             notify()
-        else:
-            executeWaitTask(viewer_controller.view.rendered, notify, [subscribers, viewer_controller])
+        else:  # notify once after the current render
+            viewer_controller.view.callAfterRender(notify, id(subscribers))
 
     def _onTabClosed(self, v_id):
         ctrl, tabs = self._model.remove(v_id)
@@ -268,6 +385,37 @@ class ContentController(Controller):
         if self._model.count() == 0:
             self._notifySubscribers(None, self._viewer_changed_subscribers)
 
+    def registerMemoryProvider(self, category: str, provider: Callable[[int], int]):
+        """
+        Registers an additional source of memory consumption for the accounting (e.g., undo history, tool buffers).
+
+        :param category: the category of the reported memory (e.g., 'history' or 'render')
+        :param provider: Callable function of form provider(v_id) -> bytes
+        """
+        self._memory_providers.append((category, provider))
+
+    def getMemoryUsage(self, v_id=-1) -> Dict[str, int]:
+        """
+        Returns the memory used by the viewer with id=v_id. When no id is provided the active viewer is used.
+        :param v_id: the unique identifier
+        :return: bytes per category (data, history, render) and the total
+        """
+        viewer_ctrl = self.getViewerController(v_id)
+        if viewer_ctrl is None:
+            return None
+        usage = {"data": viewer_ctrl.model.nbytes, "history": 0, "render": viewer_ctrl.view.render_nbytes}
+        for category, provider in self._memory_providers:
+            usage[category] = usage.get(category, 0) + provider(viewer_ctrl.v_id)
+        usage["total"] = sum(usage.values())
+        return usage
+
+    def getMemoryReport(self) -> Dict[int, Dict[str, int]]:
+        """
+        Returns the memory usage of all open viewers.
+        :return: dictionary v_id -> usage (see getMemoryUsage)
+        """
+        return {v_id: self.getMemoryUsage(v_id) for v_id in self._model.getViewerCtrls().keys()}
+
     def unsubscribe(self, sub_id):
         removed = self._viewer_changed_subscribers.pop(sub_id, None)
         if removed is not None:
@@ -279,3 +427,20 @@ class ContentController(Controller):
             removed = d.pop(sub_id, None)
             if removed is not None:
                 return
+
+
+class _OpenBatch:
+    """Progress of the files opened together with ContentController.openFiles."""
+
+    def __init__(self, viewer_ctrl_type, n_jobs):
+        self.viewer_ctrl_type = viewer_ctrl_type
+        self.read_preview = viewer_ctrl_type.readPreview
+        self.read_model = viewer_ctrl_type.readModel
+        self.token = CancellationToken()
+        self.progress = QtWidgets.QProgressDialog("Opening files...", "Cancel", 0, n_jobs)
+        self.progress.setMinimumDuration(500)
+        self.progress.canceled.connect(self.token.cancel)
+        self.progress.setValue(0)
+
+    def step(self):
+        self.progress.setValue(self.progress.value() + 1)
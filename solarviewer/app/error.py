@@ -8,9 +8,11 @@ from solarviewer.app.app import AppController
 from solarviewer.config.base import ToolController, ItemConfig
 from solarviewer.config.ioc import RequiredFeature
 from solarviewer.ui.error_log import Ui_ErrorLog
+from solarviewer.util import classproperty
 
 
 class ErrorLogTool(ToolController):
+    eager = True
     app_ctrl: AppController = RequiredFeature(AppController.name)
 
     def __init__(self):
@@ -33,8 +35,8 @@ class ErrorLogTool(ToolController):
         # open tool
         self.app_ctrl.openController(self.name)
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setMenuPath("Help/Error Log").setTitle("Error Log").setOrientation(
             QtCore.Qt.BottomDockWidgetArea)
 
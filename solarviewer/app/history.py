@@ -1,45 +1,309 @@
+import atexit
 import copy
+import itertools
+import mmap
+import os
+import shutil
+import tempfile
+import zlib
+from typing import Dict, List
 
+import numpy as np
 from PyQt5 import QtGui
 
 from solarviewer.app.content import ContentController
-from solarviewer.config.base import ItemConfig, Controller, ActionController, DataType, ViewerType
+from solarviewer.config.base import ItemConfig, Controller, ActionController, DataType, ViewerType, DataModel, \
+    arrayBytes
 from solarviewer.config.ioc import RequiredFeature
+from solarviewer.util import classproperty, executeTask, Priority
 
 
 class HistoryController(Controller):
+    eager = True
     viewers = {}
     skip_next_change = False
+    max_entries = 20
+    memory_budget = 256 * 1024 ** 2  # bytes of all undo histories kept in memory, older entries are spilled to disk
+    hot_entries = 2  # number of newest entries that are kept uncompressed
+    compression_level = 1
     content_ctrl: ContentController = RequiredFeature(ContentController.name)
 
     def __init__(self):
+        self.viewers: Dict[int, List[_Snapshot]] = {}
+        self._sequence = itertools.count()
+        self._spill_dir = None
+        self._restored = {}  # models of viewers that are not added yet
+
         self.content_ctrl.subscribeViewerAdded(self.onViewerAdded)
         self.content_ctrl.subscribeViewerClosed(self.onViewerClosed)
+        self.content_ctrl.registerMemoryProvider("history", lambda v_id: self.getFootprint(v_id)["memory"])
 
     def undo(self, id):
         history = self.viewers[id]
         if len(history) <= 1:
             return None
-        del history[-1]
+        newer = history.pop()
+        self._drop(newer)
+        model = history[-1].load(newer.array())
         # change event will be triggered by undo
         self.skip_next_change = True
-        self.content_ctrl.setDataModel(copy.deepcopy(history[-1]), id)
+        self.content_ctrl.setDataModel(copy.deepcopy(model), id)
+
+    def getFootprint(self, id) -> Dict[str, int]:
+        """
+        Returns the resources used by the undo history of the viewer. The current model is not included.
+
+        :param id: the viewer id
+        :return: dictionary with the number of entries and the bytes held in memory and on disk
+        """
+        history = self.viewers.get(id, [])
+        return {"entries": len(history), "memory": sum(s.memory for s in history[:-1]),
+                "disk": sum(s.disk for s in history[:-1])}
 
     def onViewerClosed(self, viewer_ctrl):
-        del self.viewers[viewer_ctrl.v_id]
+        for snapshot in self.viewers.pop(viewer_ctrl.v_id):
+            self._drop(snapshot)
 
     def onViewerAdded(self, viewer_ctrl):
-        self.viewers[viewer_ctrl.v_id] = [viewer_ctrl.model]
+        self.viewers[viewer_ctrl.v_id] = [_Snapshot(viewer_ctrl.model, next(self._sequence))]
         self.content_ctrl.subscribeDataChanged(viewer_ctrl.v_id, self.onDataChanged)
+        if viewer_ctrl.v_id in self._restored:
+            self.setModels(viewer_ctrl.v_id, self._restored.pop(viewer_ctrl.v_id))
 
     def onDataChanged(self, viewer_ctrl):
         if self.skip_next_change:
             self.skip_next_change = False
             return
         history = self.viewers[viewer_ctrl.v_id]
-        if (len(history) > 10):
-            del history[0]
-        history.append(viewer_ctrl.model)
+        if not viewer_ctrl.model.preview:  # previews are replaced by the full resolution model
+            while history and history[0].model.preview:
+                self._drop(history.pop(0))
+        snapshot = _Snapshot(viewer_ctrl.model, next(self._sequence))
+        if history and history[-1].array() is not None and history[-1].array() is snapshot.array():
+            history[-1].share()  # pixel buffer unchanged
+        history.append(snapshot)
+        while len(history) > self.max_entries:
+            self._drop(history.pop(0))
+        self._compress(history)
+        self._enforceBudget()
+
+    def getSnapshots(self, id) -> List["_Snapshot"]:
+        """
+        Returns copies of the history entries of the viewer, oldest first. The current model is not included.
+        The copies can be restored outside the GUI thread with restoreModels.
+
+        :param id: the viewer id
+        :return: the list of entries
+        """
+        return [copy.copy(s) for s in self.viewers.get(id, [])[:-1]]
+
+    def setModels(self, id, models: List[DataModel]):
+        """
+        Replaces the history of the viewer (e.g., when a session is restored). The current model stays the newest
+        entry.
+
+        :param id: the viewer id (the viewer might not be added yet)
+        :param models: the previous models, oldest first
+        """
+        if id not in self.viewers:
+            self._restored[id] = models
+            return
+        history = self.viewers[id]
+        for snapshot in history[:-1]:
+            self._drop(snapshot)
+        current = history[-1]
+        history[:] = [_Snapshot(m, next(self._sequence)) for m in models[-(self.max_entries - 1):]] + [current]
+        current.seq = next(self._sequence)
+        self._compress(history)
+        self._enforceBudget()
+
+    def _compress(self, history):
+        for i, older in enumerate(history[:-self.hot_entries]):
+            if older.compressible:
+                older.compressing = True
+                reference = self._getReference(history, i)
+                executeTask(older.compress, [reference.array(), self.compression_level], self._onCompressed,
+                            [history, older, reference], priority=Priority.BACKGROUND)
+
+    def _getReference(self, history, index):
+        """Returns the next newer entry with a distinct pixel buffer."""
+        for snapshot in history[index + 1:]:
+            if not snapshot.shared:
+                return snapshot
+        return history[-1]
+
+    def _onCompressed(self, payload, history, snapshot, reference):
+        snapshot.compressing = False
+        if snapshot not in history[:-self.hot_entries]:  # dropped or restored in the meantime
+            return
+        if self._getReference(history, history.index(snapshot)) is not reference:
+            return  # compressed against an outdated entry, retry with the next change
+        snapshot.setPayload(*payload)
+        self._enforceBudget()
+
+    def _enforceBudget(self):
+        """Spills the oldest compressed entries to disk while the memory budget is exceeded."""
+        snapshots = [s for history in self.viewers.values() for s in history[:-self.hot_entries]]
+        memory = sum(s.memory for history in self.viewers.values() for s in history[:-1])
+        for snapshot in sorted(snapshots, key=lambda s: s.seq):
+            if memory <= self.memory_budget:
+                break
+            if snapshot.payload is None:
+                continue
+            memory -= snapshot.memory
+            snapshot.spill(self._getSpillDir())
+
+    def _getSpillDir(self):
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="solarviewer-history-")
+            atexit.register(shutil.rmtree, self._spill_dir, True)
+        return self._spill_dir
+
+    def _drop(self, snapshot):
+        if snapshot.path is not None:
+            os.remove(snapshot.path)
+            snapshot.path = None
+
+
+class _Snapshot:
+    """
+    Entry of the undo history. The pixel buffer of the model is either held by the model (raw), identical to the
+    newer entry (shared) or stored compressed, as difference to the newer entry if possible (delta).
+    Compressed entries can be spilled to disk and are memory mapped on reload.
+    Models without pixel buffer (data and setData) are kept as is.
+    """
+
+    def __init__(self, model: DataModel, seq: int):
+        self.model = model
+        self.seq = seq
+        self.shared = False
+        self.delta = False
+        self.payload = None
+        self.path = None
+        self.size = 0
+        self.shape = None
+        self.dtype = None
+        self.compressing = False
+
+    @property
+    def compressible(self) -> bool:
+        # memory mapped buffers are already on disk
+        return not self.compressing and not self.shared and self.payload is None and self.path is None \
+               and arrayBytes(self.array()) > 0
+
+    @property
+    def memory(self) -> int:
+        if self.payload is not None:
+            return len(self.payload)
+        if self.shared or self.path is not None:
+            return 0
+        return arrayBytes(self.array())
+
+    @property
+    def disk(self) -> int:
+        return self.size if self.path is not None else 0
+
+    def array(self):
+        if self.shared or self.payload is not None or self.path is not None:
+            return None
+        data = getattr(self.model, "data", None)
+        return data if isinstance(data, np.ndarray) and hasattr(self.model, "setData") else None
+
+    def share(self):
+        self.model = self._strip()
+        self.shared = True
+
+    def compress(self, reference, level):
+        """Computes the compressed payload (executed in the background)."""
+        array = np.ascontiguousarray(self.array())
+        delta = reference is not None and reference.shape == array.shape and reference.dtype == array.dtype
+        raw = array.view(np.uint8)
+        if delta:
+            raw = np.bitwise_xor(raw, np.ascontiguousarray(reference).view(np.uint8))
+        return zlib.compress(raw.tobytes(), level), delta, array.shape, array.dtype
+
+    def setPayload(self, payload, delta, shape, dtype):
+        if self.shared or self.array() is None:
+            return
+        self.model = self._strip()
+        self.payload = payload
+        self.delta = delta
+        self.shape = shape
+        self.dtype = dtype
+
+    def spill(self, directory):
+        fd, self.path = tempfile.mkstemp(suffix=".zlib", dir=directory)
+        with os.fdopen(fd, "wb") as f:
+            f.write(self.payload)
+        self.size = len(self.payload)
+        self.payload = None
+
+    def load(self, reference) -> DataModel:
+        """
+        Restores the pixel buffer of the model.
+
+        :param reference: the pixel buffer of the newer entry (required for shared and delta entries)
+        :return: the restored model
+        """
+        data = self._restoreArray(reference)
+        if data is None:
+            return self.model
+        self.model.setData(data)
+        if self.path is not None:
+            os.remove(self.path)
+        self.shared, self.delta, self.payload, self.path = False, False, None, None
+        return self.model
+
+    def restore(self, reference) -> DataModel:
+        """
+        Returns a copy of the model with the restored pixel buffer. Unlike load, the entry is not modified.
+
+        :param reference: the pixel buffer of the newer entry (required for shared and delta entries)
+        :return: the restored copy of the model
+        """
+        model = copy.deepcopy(self.model)
+        data = self._restoreArray(reference)
+        if data is not None:
+            model.setData(data)
+        return model
+
+    def _restoreArray(self, reference):
+        if self.shared:
+            return reference
+        if self.payload is None and self.path is None:
+            return None
+        data = np.frombuffer(self._readPayload(), np.uint8)
+        if self.delta:
+            data = np.bitwise_xor(data, np.ascontiguousarray(reference).reshape(-1).view(np.uint8))
+        return data.view(self.dtype).reshape(self.shape)
+
+    def _readPayload(self):
+        if self.payload is not None:
+            return zlib.decompress(self.payload)
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            return zlib.decompress(m)
+
+    def _strip(self):
+        model = copy.deepcopy(self.model)
+        model.setData(None)
+        return model
+
+
+def restoreModels(snapshots: List[_Snapshot], model: DataModel) -> List[DataModel]:
+    """
+    Restores the models of the history entries (see HistoryController.getSnapshots).
+
+    :param snapshots: the history entries, oldest first
+    :param model: the current model of the viewer
+    :return: the models, oldest first
+    """
+    models = []
+    reference = getattr(model, "data", None)
+    for snapshot in reversed(snapshots):
+        restored = snapshot.restore(reference)
+        models.insert(0, restored)
+        reference = getattr(restored, "data", None)
+    return models
 
 
 class UndoAction(ActionController):
@@ -49,8 +313,8 @@ class UndoAction(ActionController):
     def __init__(self):
         ActionController.__init__(self)
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setTitle("History").setMenuPath("Edit/Undo").addSupportedData(
             DataType.ANY).addSupportedViewer(ViewerType.ANY).setShortcut(QtGui.QKeySequence("Ctrl+Z"))
 
@@ -1,22 +1,35 @@
+import sys
 from abc import abstractmethod
+from typing import List
 
-from PyQt5 import QtWidgets
+from PyQt5 import QtWidgets, QtCore
 from matplotlib import pyplot as plt
+from matplotlib.artist import Artist
+from matplotlib.backend_bases import DrawEvent
 from matplotlib.backends.backend_qt5 import NavigationToolbar2QT
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 
 from solarviewer.config.base import Viewer, DataModel
 from solarviewer.ui.plot import Ui_Plot
-from solarviewer.util import executeTask
+from solarviewer.util import executeTask, Priority
 
 
 class PlotWidget(Viewer):
+    redraw_delay = 30  # ms; redraw requests within this interval are coalesced into a single draw
 
     def __init__(self):
         Viewer.__init__(self)
         self.ui = Ui_Plot()
         self.ui.setupUi(self)
 
+        self._model = None
+        self._generation = 0  # incremented with each redraw request; only the newest generation is shown
+        self._rendering = False
+        self._redraw_timer = QtCore.QTimer(self)
+        self._redraw_timer.setSingleShot(True)
+        self._redraw_timer.setInterval(self.redraw_delay)
+        self._redraw_timer.timeout.connect(self._startRedraw)
+
         self.initMainCanvas()
         self.rendered.clear()
 
@@ -25,6 +38,7 @@ class PlotWidget(Viewer):
         self.canvas = FigureCanvas(self.figure)
         self.toolbar = NavigationToolbar2QT(self.canvas, self)
         self.toolbar.setVisible(False)
+        self.overlay = OverlayLayer(self.canvas)
         FigureCanvas.setSizePolicy(self.canvas,
                                    QtWidgets.QSizePolicy.Expanding,
                                    QtWidgets.QSizePolicy.Expanding)
@@ -33,24 +47,163 @@ class PlotWidget(Viewer):
         self.ui.verticalLayout.addWidget(self.canvas)
 
     def updateModel(self, model: DataModel):
-        self._model = model
+        previous, self._model = self._model, model
+        if previous is not None and self.rendered.is_set() and not self._rendering and \
+                self.updateArtists(previous, model):
+            self.canvas.draw_idle()  # the figure is kept, only rasterized again
+            return
         self.redraw()
 
+    def updateArtists(self, previous: DataModel, model: DataModel) -> bool:
+        """
+        Applies display-only changes (e.g., colormap or normalization) to the artists of the rendered figure,
+        without drawing the figure from scratch.
+
+        :param previous: the model of the rendered figure
+        :param model: the new model
+        :return: True if the artists were updated, False if the figure needs to be redrawn
+        """
+        return False
+
     def redraw(self):
+        self._generation += 1
         self.rendered.clear()
         self.canvas.hide()
         self.ui.progress.show()
-        executeTask(self._redraw, [], self._afterRedraw)
+        self._redraw_timer.start()
 
-    def _redraw(self):
-        self.draw(self._model)
+    def _startRedraw(self):
+        if self._rendering:  # the newest generation is drawn once the current render finished
+            return
+        self._rendering = True
+        executeTask(self._redraw, [self._generation, self._model], self._afterRedraw, [self._generation],
+                    priority=Priority.RENDER, call_error=self._onRedrawError)
+
+    def _redraw(self, generation, model):
+        if generation != self._generation:  # superseded before start
+            return
+        self.draw(model)
+        if generation != self._generation:  # superseded, skip the rasterization
+            return
         self.canvas.draw()
 
-    def _afterRedraw(self):
+    def _afterRedraw(self, generation):
+        self._rendering = False
+        if generation != self._generation:
+            if not self._redraw_timer.isActive():
+                self._startRedraw()
+            return
         self.ui.progress.hide()
         self.canvas.show()
         self.rendered.set()
 
+    def _onRedrawError(self, ex, generation):
+        if generation == self._generation:
+            self.figure.clear()
+            self.figure.text(0.5, 0.5, s="Error during rendering data: " + str(ex), ha="center", va="center")
+            self.canvas.draw()
+        self._afterRedraw(generation)
+        sys.excepthook(type(ex), ex, ex.__traceback__)  # reported in the error log
+
+    @property
+    def render_nbytes(self) -> int:
+        # RGBA buffer of the Agg renderer and the Qt image of the canvas
+        ratio = self.canvas.devicePixelRatio() or 1
+        return int(self.figure.bbox.width * ratio) * int(self.figure.bbox.height * ratio) * 4 * 2
+
     @abstractmethod
     def draw(self, data_model: DataModel):
         raise NotImplementedError
+
+
+class OverlayLayer:
+    """
+    Artists of interactive tools (e.g., markers, lines and annotations) that are blitted over the rendered figure.
+    The figure is rendered without them and cached, so that adding or removing artists does not redraw the figure.
+    The artists are part of the figure when it is saved.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self._artists = []
+        self._background = None  # rendered figure without the overlay
+        self._composite = None  # rendered figure with the overlay
+        self._blitting = False
+        canvas.mpl_connect("draw_event", self._onDraw)
+
+    def addArtists(self, artists: List[Artist], refresh=True):
+        """
+        Registers artists that were added to the figure.
+
+        :param artists: the artists
+        :param refresh: draw the artists immediately, otherwise with the next update
+        """
+        for artist in artists:
+            artist.set_animated(True)  # skipped when the figure is drawn
+            self._artists.append(artist)
+        if not refresh:
+            return
+        if self._background is None:
+            self.canvas.draw_idle()
+        elif self._composite is None:
+            self.update()
+        else:  # draw over the previous overlay
+            self.canvas.restore_region(self._composite)
+            self._drawArtists(artists)
+            self._blit()
+
+    def removeArtists(self, artists: List[Artist], refresh=True):
+        """
+        Removes the artists from the figure.
+
+        :param artists: the registered artists
+        :param refresh: update the overlay immediately
+        """
+        for artist in artists:
+            if artist in self._artists:
+                self._artists.remove(artist)
+            try:
+                artist.remove()
+            except (ValueError, NotImplementedError):
+                pass  # already removed with the figure
+        self._composite = None
+        if refresh:
+            self.update()
+
+    def update(self):
+        """Draws the registered artists over the cached figure (e.g., after they were modified)."""
+        if self._background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._background)
+        self._drawArtists(self._artists)
+        self._blit()
+
+    def _drawArtists(self, artists):
+        for artist in artists:
+            self.canvas.figure.draw_artist(artist)
+
+    def _blit(self):
+        figure = self.canvas.figure
+        self._composite = self.canvas.copy_from_bbox(figure.bbox)
+        self.canvas.blit(figure.bbox)
+        # widgets that blit themselves (e.g., cursors) save their background on draw events
+        self._blitting = True
+        try:
+            event = DrawEvent("draw_event", self.canvas, self.canvas.get_renderer())
+            self.canvas.callbacks.process("draw_event", event)
+        finally:
+            self._blitting = False
+
+    def _onDraw(self, event):
+        if self._blitting:
+            return
+        figure = self.canvas.figure
+        self._artists = [a for a in self._artists if a.figure is figure and (a.axes is None or a.axes in figure.axes)]
+        if self.canvas.is_saving():
+            for artist in self._artists:
+                artist.draw(event.renderer)
+            return
+        self._background = self.canvas.copy_from_bbox(figure.bbox)
+        self._drawArtists(self._artists)
+        self._composite = self.canvas.copy_from_bbox(figure.bbox)
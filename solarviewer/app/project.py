@@ -0,0 +1,408 @@
+"""
+Solar Viewer project files (.svp).
+
+The file starts with a magic number, followed by zlib compressed data chunks, the JSON manifest and a fixed size
+trailer that points to the manifest. The manifest holds the viewer type, the display state of the model and the index
+of the chunks. Arrays are split into chunks that are addressed by the hash of their content, so that saving an
+existing project appends only the changed chunks and a new manifest. Only types of loaded modules are restored and
+no code is executed on opening.
+"""
+import hashlib
+import inspect
+import json
+import math
+import os
+import struct
+import sys
+import tempfile
+import weakref
+import zlib
+from threading import Lock
+from typing import Type, List
+
+import numpy as np
+
+from solarviewer.config.base import DataModel, ViewerController
+
+magic = b"SVPROJ\x00\x01"
+chunk_size = 4 * 1024 ** 2  # bytes of uncompressed array data per chunk
+compression_level = 1
+preview_pixels = 4096 * 4096  # a decimated preview is stored for larger maps
+preview_size = 1024  # the maximum side length of the preview
+
+_trailer = struct.Struct("<QQ8s")
+_trailer_magic = b"SVPEND\x00\x00"
+_save_lock = Lock()
+_array_digests = {}  # id(array) -> (weak reference, chunk digests) of read-only arrays
+
+
+class ProjectFile:
+    """Reads and writes a project file. The manifest is read once and shared by subsequent reads."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._manifest = None
+
+    def getViewerType(self) -> Type[ViewerController]:
+        """
+        Returns the viewer controller class of the project. Only classes of loaded modules are resolved.
+
+        :return: the viewer controller class
+        """
+        return _findClass(self.getManifest()["viewer"], ViewerController)
+
+    def getManifest(self) -> dict:
+        if self._manifest is None:
+            with open(self.path, "rb") as f:
+                self._manifest = _readManifest(f)
+        return self._manifest
+
+    def readModel(self, preview=False) -> DataModel:
+        """
+        Reads the data model. Arrays are decompressed chunk by chunk.
+
+        :param preview: read the stored decimated maps instead of the full resolution data
+        :return: the data model or None if a preview is requested and the project contains no preview
+        """
+        manifest = self.getManifest()
+        with open(self.path, "rb") as f:
+            decoder = _Decoder(f, manifest["chunks"], preview)
+            model = decoder.decode(manifest["model"])
+        if preview:
+            if not decoder.previewed:
+                return None
+            model.preview = True
+        model.path = self.path
+        return model
+
+    def readHistory(self) -> List[DataModel]:
+        """
+        Reads the stored undo history.
+
+        :return: the previous models, oldest first
+        """
+        manifest = self.getManifest()
+        with open(self.path, "rb") as f:
+            decoder = _Decoder(f, manifest["chunks"], False)
+            return [decoder.decode(m) for m in manifest.get("history", [])]
+
+    def save(self, viewer_ctrl_type: Type[ViewerController], model: DataModel, history: List[DataModel] = ()):
+        """
+        Writes the model to the project file. Chunks that are already stored in the file are not written again.
+        The file is rewritten if more than half of it is occupied by unreferenced data.
+
+        :param viewer_ctrl_type: the viewer controller class
+        :param model: the data model
+        :param history: the previous models of the undo history, oldest first. Unchanged chunks are shared.
+        """
+        encoder = _Encoder()
+        state = {"viewer": _className(viewer_ctrl_type), "model": encoder.encode(model),
+                 "history": [encoder.encode(m) for m in history]}
+        with _save_lock:
+            try:
+                with open(self.path, "rb") as f:
+                    index = _readManifest(f)["chunks"]
+                    size = f.seek(0, os.SEEK_END)
+            except (OSError, ValueError, KeyError):
+                index, size = {}, 0  # new file or no project
+            live = sum(index[d][1] for d in encoder.chunks if d in index)
+            if size - live > live:
+                index = {}  # compact
+            if index:
+                with open(self.path, "r+b") as f:
+                    f.seek(size)
+                    try:
+                        self._manifest = _writeProject(f, state, encoder.chunks, index)
+                    except BaseException:
+                        f.truncate(size)  # the previous trailer is at the end of the file again
+                        raise
+                return
+            # write to a temporary file first, so that the previous version stays intact on errors
+            fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(os.path.abspath(self.path)))
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(magic)
+                    self._manifest = _writeProject(f, state, encoder.chunks, {})
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.remove(tmp)
+                raise
+
+
+def _writeProject(f, state, chunks, index):
+    """Appends the new chunks, the manifest and the trailer at the current position of the file."""
+    entries = {}
+    for digest, chunk in chunks.items():
+        if digest in index:
+            entries[digest] = index[digest]
+            continue
+        payload = zlib.compress(chunk, compression_level)
+        entries[digest] = [f.tell(), len(payload)]
+        f.write(payload)
+    manifest = dict(state, chunks=entries)
+    content = json.dumps(manifest).encode("utf-8")
+    offset = f.tell()
+    f.write(content)
+    f.write(_trailer.pack(offset, len(content), _trailer_magic))
+    f.flush()
+    os.fsync(f.fileno())
+    return manifest
+
+
+def _readManifest(f) -> dict:
+    """Reads the manifest of the last trailer. The previous manifest is used if an append was interrupted."""
+    if f.read(len(magic)) != magic:
+        raise IOError("{} is no Solar Viewer project file (projects of previous versions are not supported)".format(
+            f.name))
+    end = f.seek(0, os.SEEK_END)
+    manifest = _readTrailer(f, end)
+    if manifest is None:
+        for position in _findTrailers(f, end):
+            manifest = _readTrailer(f, position)
+            if manifest is not None:
+                break
+    if manifest is None:
+        raise IOError("The project file {} is incomplete".format(f.name))
+    return manifest
+
+
+def _readTrailer(f, end):
+    """Returns the manifest of the trailer that ends at the position or None if there is no valid trailer."""
+    if end < len(magic) + _trailer.size:
+        return None
+    f.seek(end - _trailer.size)
+    offset, length, trailer_magic = _trailer.unpack(f.read(_trailer.size))
+    if trailer_magic != _trailer_magic or offset < len(magic) or offset + length != end - _trailer.size:
+        return None
+    f.seek(offset)
+    try:
+        return json.loads(f.read(length).decode("utf-8"))
+    except ValueError:
+        return None
+
+
+def _findTrailers(f, end, block_size=1024 ** 2):
+    """Yields the end positions of possible trailers before the position, last first."""
+    overlap = b""
+    while end > len(magic):
+        start = max(end - block_size, len(magic))
+        f.seek(start)
+        block = f.read(end - start) + overlap
+        position = len(block)
+        while True:
+            position = block.rfind(_trailer_magic, 0, position + len(_trailer_magic) - 1)
+            if position < 0:
+                break
+            yield start + position + len(_trailer_magic)
+        overlap = block[:len(_trailer_magic) - 1]
+        end = start
+
+
+def _className(cls) -> str:
+    return "{}:{}".format(cls.__module__, cls.__qualname__)
+
+
+def _findClass(name: str, base):
+    """Resolves the class name. Modules are not imported, to avoid the execution of code from project files."""
+    module_name, _, qualname = name.partition(":")
+    cls = sys.modules.get(module_name)
+    for attr in qualname.split("."):
+        cls = getattr(cls, attr, None)
+    if not isinstance(cls, type) or not issubclass(cls, base):
+        raise IOError("Unsupported type in project file: {}".format(name))
+    return cls
+
+
+class _Encoder:
+    """Converts the model into JSON compatible values. Arrays are split into chunks."""
+
+    def __init__(self):
+        self.chunks = {}  # digest -> uncompressed chunk
+
+    def encode(self, value):
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, list):
+            return [self.encode(v) for v in value]
+        if isinstance(value, tuple):
+            return {"__tuple__": [self.encode(v) for v in value]}
+        if isinstance(value, dict):
+            if all(isinstance(k, str) and not k.startswith("__") for k in value):
+                return {k: self.encode(v) for k, v in value.items()}
+            return {"__dict__": [[self.encode(k), self.encode(v)] for k, v in value.items()]}
+        if isinstance(value, np.ndarray):
+            return {"__array__": self.encodeArray(value)}
+        if isinstance(value, DataModel):
+            return {"__model__": {"type": _className(type(value)), "state": self.encode(dict(value.__dict__))}}
+
+        from astropy.time import Time
+        from astropy.visualization import BaseStretch, BaseInterval
+        from astropy.wcs import WCS
+        from matplotlib.colors import Colormap, Normalize
+        from sunpy.map import GenericMap
+        if isinstance(value, GenericMap):
+            return {"__map__": self.encodeMap(value)}
+        if isinstance(value, Colormap):
+            return {"__cmap__": {"name": value.name, "colors": self.encodeArray(value(np.linspace(0, 1, value.N))),
+                                 "over": list(value.get_over()), "under": list(value.get_under()),
+                                 "bad": list(value.get_bad())}}
+        if isinstance(value, Normalize):
+            parameters = {}
+            for name in inspect.signature(type(value).__init__).parameters:
+                parameter = getattr(value, name, None) if name not in ["self", "data"] else None
+                if parameter is not None:
+                    parameters[name] = self.encode(parameter)
+            return {"__norm__": {"type": _className(type(value)), "parameters": parameters}}
+        if isinstance(value, (BaseStretch, BaseInterval)):
+            return {"__transform__": {"type": _className(type(value)), "state": self.encode(dict(value.__dict__))}}
+        if isinstance(value, WCS):
+            return {"__wcs__": value.to_header_string(relax=True)}
+        if isinstance(value, Time):
+            return {"__time__": {"jd1": self.encodeArray(np.asarray(value.jd1)),
+                                 "jd2": self.encodeArray(np.asarray(value.jd2)), "scale": value.scale,
+                                 "format": value.format}}
+        raise TypeError("{} can not be stored in a project".format(type(value).__name__))
+
+    def encodeMap(self, s_map) -> dict:
+        meta = {k: v if v is None or isinstance(v, (bool, int, float, str, dict, list, np.generic)) else str(v)
+                for k, v in s_map.meta.items()}
+        entry = {"data": self.encodeArray(s_map.data), "meta": self.encode(meta),
+                 "plot_settings": self.encode(dict(s_map.plot_settings)), "path": getattr(s_map, "path", None)}
+        if s_map.mask is not None:
+            entry["mask"] = self.encodeArray(np.asarray(s_map.mask))
+        if s_map.data.ndim == 2 and s_map.data.size > preview_pixels:
+            step = int(math.ceil(max(s_map.data.shape) / preview_size))
+            entry["preview"] = {"data": self.encodeArray(s_map.data[::step, ::step]), "step": step}
+        return entry
+
+    def encodeArray(self, array: np.ndarray) -> dict:
+        if array.dtype.hasobject or array.dtype.fields is not None:
+            raise TypeError("Arrays of type {} can not be stored in a project".format(array.dtype))
+        raw = memoryview(np.ascontiguousarray(array).reshape(-1).view(np.uint8))
+        digests = self._getDigests(array, raw)
+        for i, digest in enumerate(digests):
+            self.chunks[digest] = raw[i * chunk_size:(i + 1) * chunk_size]
+        return {"dtype": array.dtype.str, "shape": list(array.shape), "chunks": digests}
+
+    def _getDigests(self, array, raw):
+        # read-only arrays are shared between model copies and can not change, the digests are computed once
+        key = id(array)
+        cached = _array_digests.get(key)
+        if cached is not None and cached[0]() is array and cached[1] == chunk_size:
+            return cached[2]
+        digests = [hashlib.blake2b(raw[i:i + chunk_size], digest_size=20).hexdigest()
+                   for i in range(0, len(raw), chunk_size)]
+        if not array.flags.writeable:
+            _array_digests[key] = (weakref.ref(array, lambda ref: _forgetDigests(key, ref)), chunk_size, digests)
+        return digests
+
+
+def _forgetDigests(key, ref):
+    if _array_digests.get(key, (None,))[0] is ref:
+        del _array_digests[key]
+
+
+class _Decoder:
+    """Restores the values of the manifest. Arrays are read from the chunks of the file."""
+
+    def __init__(self, f, chunks: dict, preview: bool):
+        self.file = f
+        self.chunks = chunks
+        self.preview = preview
+        self.previewed = False
+
+    def decode(self, value):
+        if isinstance(value, list):
+            return [self.decode(v) for v in value]
+        if not isinstance(value, dict):
+            return value
+        if len(value) == 1 and next(iter(value)).startswith("__"):
+            tag, entry = next(iter(value.items()))
+            decode = getattr(self, "_decode" + tag.strip("_").capitalize(), None)
+            if decode is None:
+                raise IOError("Unsupported entry in project file: {}".format(tag))
+            return decode(entry)
+        return {k: self.decode(v) for k, v in value.items()}
+
+    def decodeArray(self, entry) -> np.ndarray:
+        dtype = np.dtype(entry["dtype"])
+        if dtype.hasobject:
+            raise IOError("Unsupported array type in project file: {}".format(dtype))
+        array = np.empty(entry["shape"], dtype)
+        raw = array.reshape(-1).view(np.uint8)
+        position = 0
+        for digest in entry["chunks"]:
+            offset, length = self.chunks[digest]
+            self.file.seek(offset)
+            chunk = np.frombuffer(zlib.decompress(self.file.read(length)), np.uint8)
+            raw[position:position + len(chunk)] = chunk
+            position += len(chunk)
+        if position != raw.size:
+            raise IOError("Corrupted array in project file")
+        return array
+
+    def _decodeTuple(self, entry):
+        return tuple(self.decode(v) for v in entry)
+
+    def _decodeDict(self, entry):
+        return {self.decode(k): self.decode(v) for k, v in entry}
+
+    def _decodeArray(self, entry):
+        return self.decodeArray(entry)
+
+    def _decodeModel(self, entry):
+        cls = _findClass(entry["type"], DataModel)
+        model = cls.__new__(cls)
+        model.__dict__.update(self.decode(entry["state"]))
+        return model
+
+    def _decodeMap(self, entry):
+        from sunpy.map import Map
+        from sunpy.util import MetaDict
+        from solarviewer.viewer.map import sectionHeader
+        meta = MetaDict(self.decode(entry["meta"]))
+        if self.preview and "preview" in entry:
+            data = self.decodeArray(entry["preview"]["data"])
+            meta = sectionHeader(meta, step=entry["preview"]["step"])
+            self.previewed = True
+        else:
+            data = self.decodeArray(entry["data"])
+        s_map = Map(data, meta)
+        if "mask" in entry and s_map.data.shape == tuple(entry["mask"]["shape"]):
+            s_map.mask = self.decodeArray(entry["mask"])
+        s_map.plot_settings = self.decode(entry["plot_settings"])
+        if entry["path"] is not None:
+            s_map.path = entry["path"]
+        return s_map
+
+    def _decodeCmap(self, entry):
+        from matplotlib.colors import ListedColormap
+        cmap = ListedColormap(self.decodeArray(entry["colors"]), name=entry["name"])
+        cmap.set_over(entry["over"])
+        cmap.set_under(entry["under"])
+        cmap.set_bad(entry["bad"])
+        return cmap
+
+    def _decodeNorm(self, entry):
+        from matplotlib.colors import Normalize
+        return _findClass(entry["type"], Normalize)(**self.decode(entry["parameters"]))
+
+    def _decodeTransform(self, entry):
+        from astropy.visualization import BaseStretch, BaseInterval
+        cls = _findClass(entry["type"], (BaseStretch, BaseInterval))
+        transform = cls.__new__(cls)
+        transform.__dict__.update(self.decode(entry["state"]))
+        return transform
+
+    def _decodeWcs(self, entry):
+        from astropy.io import fits
+        from astropy.wcs import WCS
+        return WCS(fits.Header.fromstring(entry))
+
+    def _decodeTime(self, entry):
+        from astropy.time import Time
+        time = Time(self.decodeArray(entry["jd1"]), self.decodeArray(entry["jd2"]), format="jd", scale=entry["scale"])
+        time.format = entry["format"]
+        return time
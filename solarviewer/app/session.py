@@ -0,0 +1,282 @@
+import copy
+import json
+import os
+import sys
+import tempfile
+import uuid
+from threading import Lock
+
+from PyQt5 import QtWidgets, QtCore
+
+from solarviewer.app.content import ContentController
+from solarviewer.app.history import HistoryController, restoreModels
+from solarviewer.app.project import ProjectFile
+from solarviewer.config import user_dir
+from solarviewer.config.base import Controller, ViewerController, DataModel, Viewer, ViewerConfig
+from solarviewer.config.ioc import RequiredFeature
+from solarviewer.util import executeTask, Priority
+
+session_dir = os.path.join(user_dir, "session")
+
+
+class SessionController(Controller):
+    """
+    Autosaves the open viewers and their undo histories in the background and restores them on the next start.
+    Only viewers that changed since the last checkpoint are written. Restored viewers are shown as placeholders
+    and read from disk when their tab is focused for the first time.
+    """
+    eager = True
+    enabled = True
+    autosave_interval = 30000  # ms, changes are written at most once per interval
+    directory = session_dir
+    content_ctrl: ContentController = RequiredFeature(ContentController.name)
+    history_ctrl: HistoryController = RequiredFeature(HistoryController.name)
+
+    def __init__(self):
+        self._files = {}  # v_id -> session file name
+        self._dirty = set()
+        self._index_changed = False
+        self._saving = False
+        self._write_lock = Lock()  # serializes background and blocking writes
+        self._sequence = 0  # number of checkpoints
+        self._written = 0  # the last checkpoint that was written
+        self._pending = []  # jobs of the background checkpoint
+        self._restoring = False
+        self._unsupported = set()
+
+        if not self.enabled:
+            return
+        self.content_ctrl.subscribeViewerAdded(self.onViewerAdded)
+        self.content_ctrl.subscribeViewerClosed(self.onViewerClosed)
+        self.content_ctrl.subscribeViewerChanged(self.onViewerChanged)
+
+        self._timer = QtCore.QTimer()
+        self._timer.timeout.connect(self.checkpoint)
+        self._timer.start(self.autosave_interval)
+        QtCore.QTimer.singleShot(0, self.restore)
+        QtWidgets.QApplication.instance().aboutToQuit.connect(lambda: self.checkpoint(blocking=True))
+
+    def onViewerAdded(self, viewer_ctrl):
+        self.content_ctrl.subscribeDataChanged(viewer_ctrl.v_id, self.onDataChanged)
+        if viewer_ctrl.v_id in self._files:  # restored
+            return
+        self._files[viewer_ctrl.v_id] = uuid.uuid4().hex + ".svp"
+        self._dirty.add(viewer_ctrl.v_id)
+        self._index_changed = True
+
+    def onViewerClosed(self, viewer_ctrl):
+        if self._files.pop(viewer_ctrl.v_id, None) is not None:
+            self._index_changed = True  # the file is removed with the next checkpoint
+        self._dirty.discard(viewer_ctrl.v_id)
+        self._unsupported.discard(viewer_ctrl.v_id)
+
+    def onDataChanged(self, viewer_ctrl):
+        if viewer_ctrl.v_id in self._files:
+            self._dirty.add(viewer_ctrl.v_id)
+
+    def onViewerChanged(self, viewer_ctrl):
+        if isinstance(viewer_ctrl, SessionViewerController):
+            self.load(viewer_ctrl)
+
+    def checkpoint(self, blocking=False):
+        """
+        Writes the viewers that changed since the last checkpoint. The models are copied on the GUI thread and
+        written in the background, unless blocking is set. A blocking checkpoint waits for the write in progress
+        and writes the remaining changes afterwards.
+
+        :param blocking: write on the calling thread (e.g., on exit)
+        """
+        if (self._saving and not blocking) or not (self._dirty or self._index_changed):
+            return
+        jobs = []
+        for v_id in list(self._dirty):
+            viewer_ctrl = self.content_ctrl.getViewerController(v_id)
+            if viewer_ctrl is None or viewer_ctrl.model.preview:
+                continue  # previews are written once the full model is loaded
+            self._dirty.discard(v_id)
+            jobs.append((v_id, os.path.join(self.directory, self._files[v_id]), type(viewer_ctrl),
+                         copy.deepcopy(viewer_ctrl.model), self.history_ctrl.getSnapshots(v_id)))
+        self._index_changed = False
+        self._sequence += 1
+        if blocking:
+            with self._write_lock:
+                if self._saving and self._written < self._sequence - 1:
+                    # the background checkpoint did not start yet and is written with this one
+                    v_ids = {job[0] for job in jobs}
+                    jobs += [job for job in self._pending if job[0] not in v_ids]
+                self._written = self._sequence
+                self._addUnsupported(self._write(jobs, self._getIndex()))
+            return
+        self._saving = True
+        self._pending = jobs
+        executeTask(self._save, [jobs, self._getIndex(), self._sequence], self._onSaved, [jobs], priority=Priority.BACKGROUND,
+                    call_error=self._onSaveError)
+
+    def restore(self):
+        """Adds a placeholder tab for each viewer of the previous session. The active viewer is loaded."""
+        try:
+            with open(os.path.join(self.directory, "session.json")) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+        active = None
+        self._restoring = True  # tabs are focused when added
+        for i, entry in enumerate(index.get("viewers", [])):
+            viewer_ctrl = SessionViewerController(SessionModel(os.path.join(self.directory, entry["file"]),
+                                                               entry["title"]))
+            self._files[viewer_ctrl.v_id] = entry["file"]
+            self.content_ctrl.addViewerController(viewer_ctrl)
+            if i == index.get("active"):
+                active = viewer_ctrl
+        self._restoring = False
+        if active is not None:
+            self.content_ctrl.activateViewer(active.v_id)
+            self.load(active)
+
+    def load(self, placeholder: "SessionViewerController"):
+        """
+        Reads the viewer of the placeholder in the background and replaces the placeholder.
+
+        :param placeholder: the viewer controller of the restored tab
+        """
+        if placeholder.model.loading or self._restoring:
+            return
+        placeholder.model.loading = True
+        placeholder.view.setText("Loading {}...".format(placeholder.model.title))
+        executeTask(self._read, [placeholder.model.file], self._onLoaded, [placeholder],
+                    call_error=self._onLoadError)
+
+    def _read(self, file):
+        project = ProjectFile(file)
+        return project.getViewerType(), project.readModel(), project.readHistory()
+
+    def _onLoaded(self, result, placeholder):
+        viewer_type, model, history = result
+        file = self._files.pop(placeholder.v_id, None)
+        if file is None:  # closed in the meantime
+            return
+        viewer_ctrl = viewer_type.fromModel(model)
+        self._files[viewer_ctrl.v_id] = file
+        self.content_ctrl.replaceViewerController(placeholder.v_id, viewer_ctrl)
+        self.history_ctrl.setModels(viewer_ctrl.v_id, history)
+
+    def _onLoadError(self, ex, placeholder):
+        if self._files.pop(placeholder.v_id, None) is None:
+            return
+        self._index_changed = True
+        placeholder.view.setText("Unable to restore {}".format(placeholder.model.title))
+        error = IOError("Unable to restore {}: {}".format(placeholder.model.title, ex))
+        sys.excepthook(IOError, error, ex.__traceback__)
+
+    def _getIndex(self):
+        viewers, active = [], None
+        for viewer_ctrl in self.content_ctrl.getViewerControllers():
+            if viewer_ctrl.v_id not in self._files or viewer_ctrl.v_id in self._unsupported:
+                continue
+            if viewer_ctrl.v_id == self.content_ctrl.getCurrentId():
+                active = len(viewers)
+            viewers.append({"file": self._files[viewer_ctrl.v_id], "title": viewer_ctrl.getTitle()})
+        return {"viewers": viewers, "active": active}
+
+    def _save(self, jobs, index, sequence):
+        with self._write_lock:
+            if sequence < self._written:
+                return []  # superseded by a blocking checkpoint
+            self._written = sequence
+            return self._write(jobs, index)
+
+    def _write(self, jobs, index):
+        """Writes the viewers and the session index. Files of closed viewers are removed afterwards."""
+        os.makedirs(self.directory, exist_ok=True)
+        unsupported = []
+        for v_id, path, viewer_ctrl_type, model, snapshots in jobs:
+            try:
+                ProjectFile(path).save(viewer_ctrl_type, model, restoreModels(snapshots, model))
+            except TypeError:
+                unsupported.append(v_id)  # the model can not be stored
+        files = [entry["file"] for entry in index["viewers"]]
+        fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        with os.fdopen(fd, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp, os.path.join(self.directory, "session.json"))
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".svp") and entry.name not in files:
+                os.remove(entry.path)
+        return unsupported
+
+    def _onSaved(self, unsupported, jobs=None):
+        self._saving = False
+        self._addUnsupported(unsupported)
+
+    def _addUnsupported(self, unsupported):
+        if unsupported:
+            self._unsupported.update(unsupported)
+            self._index_changed = True
+
+    def _onSaveError(self, ex, jobs):
+        # retry with the next checkpoint (e.g., spilled history entries were removed in the meantime)
+        self._saving = False
+        self._dirty.update(v_id for v_id, *_ in jobs if v_id in self._files)
+        self._index_changed = True
+
+
+class SessionModel(DataModel):
+    """Data model of restored viewers that have not been loaded yet."""
+
+    def __init__(self, file, title):
+        self.file = file
+        self.title = title
+        self.loading = False
+
+
+class SessionViewer(Viewer):
+
+    def __init__(self):
+        Viewer.__init__(self)
+        self._label = QtWidgets.QLabel()
+        self._label.setAlignment(QtCore.Qt.AlignCenter)
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(self._label)
+        self.rendered.set()
+
+    def setText(self, text):
+        self._label.setText(text)
+
+    def updateModel(self, model):
+        self.setText(model.title)
+
+
+class SessionViewerController(ViewerController):
+    """Placeholder for viewers of the previous session. Replaced by the restored viewer when focused."""
+    data_type = None
+    viewer_type = None
+    viewer_config = ViewerConfig()
+
+    def __init__(self, model: SessionModel):
+        ViewerController.__init__(self)
+        self._model = model
+        self._view = SessionViewer()
+        self._view.updateModel(model)
+
+    @classmethod
+    def fromFile(cls, file):
+        raise TypeError("Session placeholders can not be opened from files: {}".format(file))
+
+    @classmethod
+    def fromModel(cls, model):
+        return cls(model)
+
+    @property
+    def model(self) -> SessionModel:
+        return self._model
+
+    @property
+    def view(self) -> Viewer:
+        return self._view
+
+    def updateModel(self, model):
+        self._model = model
+        self._view.updateModel(model)
+
+    def getTitle(self):
+        return self._model.title
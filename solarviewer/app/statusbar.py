@@ -1,11 +1,47 @@
-from PyQt5 import QtWidgets
+import os
 
+from PyQt5 import QtWidgets, QtCore
+
+from solarviewer.app.content import ContentController
 from solarviewer.config.base import Controller
+from solarviewer.config.ioc import RequiredFeature
+
+
+def _physicalMemory():
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return 8 * 1024 ** 3
+
+
+def formatBytes(n_bytes: int) -> str:
+    """
+    Formats a number of bytes human readable.
+
+    :param n_bytes: the number of bytes
+    :return: the formatted string (e.g., '1.5 GB')
+    """
+    for unit in ["B", "KB", "MB", "GB"]:
+        if abs(n_bytes) < 1024:
+            return "%.1f %s" % (n_bytes, unit) if unit != "B" else "%d B" % n_bytes
+        n_bytes /= 1024
+    return "%.1f TB" % n_bytes
 
 
 class StatusBarController(Controller):
+    update_interval = 2000  # ms
+    warning_threshold = int(_physicalMemory() * 0.75)  # bytes of all open viewers
+    content_ctrl: ContentController = RequiredFeature(ContentController.name)
+
     def __init__(self):
         self._view = QtWidgets.QStatusBar()
+        self._memory_label = QtWidgets.QLabel()
+        self._view.addPermanentWidget(self._memory_label)
+        self._warned = False
+
+        self._timer = QtCore.QTimer()
+        self._timer.timeout.connect(self.updateMemory)
+        self._timer.start(self.update_interval)
 
     @property
     def view(self):
@@ -13,3 +49,23 @@ class StatusBarController(Controller):
 
     def setText(self, text: str):
         self._view.showMessage(text, 5000)
+
+    def updateMemory(self):
+        """Updates the memory indicator and warns once when the threshold is exceeded."""
+        report = self.content_ctrl.getMemoryReport()
+        total = sum(usage["total"] for usage in report.values())
+        lines = []
+        for v_id, usage in sorted(report.items(), key=lambda item: -item[1]["total"]):
+            title = self.content_ctrl.getViewerController(v_id).getTitle()
+            lines.append("%s: %s (data %s, history %s, render %s)" % (
+                title, formatBytes(usage["total"]), formatBytes(usage["data"]), formatBytes(usage["history"]),
+                formatBytes(usage["render"])))
+        self._memory_label.setText("Memory: " + formatBytes(total))
+        self._memory_label.setToolTip("\n".join(lines))
+
+        exceeded = total > self.warning_threshold
+        self._memory_label.setStyleSheet("color: red" if exceeded else "")
+        if exceeded and not self._warned:
+            largest = ", ".join(line.split(" (")[0] for line in lines[:3])
+            self._view.showMessage("High memory usage! Consider closing: " + largest, 10000)
+        self._warned = exceeded
@@ -1,9 +1,14 @@
+from typing import Type
+
 from PyQt5 import QtWidgets
 from PyQt5.QtWidgets import QShortcut
 
 from solarviewer.app.content import ContentController
 from solarviewer.config.base import FileType, ViewerController, Controller
-from solarviewer.config.ioc import RequiredFeature
+from solarviewer.config.compression import compression_types, writeCompressed
+from solarviewer.config.ioc import RequiredFeature, features
+from solarviewer.ui.save_fits import Ui_SaveFits
+from solarviewer.util import executeLongRunningTask
 
 
 class ActionManager:
@@ -19,21 +24,22 @@ class ActionManager:
         self._shortcut = False
         self.content_ctrl.subscribeViewerChanged(self._checkActionSupported)
 
-    def register(self, ctrl: Controller, action, parent):
+    def register(self, ctrl: Type[Controller], action, parent):
         self.controllers[ctrl] = action
         self._checkActionSupported(self.content_ctrl.getViewerController())
         self._registerShortcut(ctrl, parent)
 
     def _registerShortcut(self, ctrl, parent):
+        shortcut = getItemConfig(ctrl).shortcut
         if self._shortcut is not False:
-            assert ctrl.item_config.shortcut == self._shortcut, \
+            assert shortcut == self._shortcut, \
                 "invalid configuration. different shortcuts for same action encountered."
             return
-        if not ctrl.item_config.shortcut:
+        if not shortcut:
             self._shortcut = None
         else:
-            self._shortcut = ctrl.item_config.shortcut
-            QShortcut(ctrl.item_config.shortcut, parent,
+            self._shortcut = shortcut
+            QShortcut(shortcut, parent,
                       lambda: self.action.trigger() if self.action.isEnabled() else None)
 
     def _checkActionSupported(self, vc: ViewerController):
@@ -42,7 +48,8 @@ class ActionManager:
 
         enabled = False
         for c in self.controllers.keys():
-            if supported(dt, vt, c.item_config.supported_data_types, c.item_config.supported_viewer_types):
+            item_config = getItemConfig(c)
+            if supported(dt, vt, item_config.supported_data_types, item_config.supported_viewer_types):
                 enabled = True
                 self._active_ctrl = c
                 break
@@ -100,11 +107,63 @@ def supported(data_type, viewer_type, supported_types, supported_viewers):
             str(ViewerType.ANY) in viewers or str(viewer_type) in viewers)
 
 
+def getItemConfig(ctrl: Type[Controller]):
+    """
+    Returns the item configuration of the controller type without instantiating the controller.
+    Controllers that define the configuration per instance are instantiated.
+
+    :param ctrl: the controller type
+    :return: ItemConfig or ToolbarConfig
+    """
+    item_config = ctrl.item_config
+    if isinstance(item_config, property):
+        item_config = features[ctrl.name].item_config
+    return item_config
+
+
 def saveFits(s_map):
-    f = getattr(s_map, "path", None)
-    name, _ = QtWidgets.QFileDialog.getSaveFileName(directory=f, filter=getExtensionString(FileType.FITS.value))
-    if name:
-        s_map.save(name, overwrite=True)
+    ui = Ui_SaveFits()
+    dlg = QtWidgets.QDialog()
+    ui.setupUi(dlg)
+    ui.compression_combo.addItems(["None"] + compression_types)
+    ui.file_path.setText(getattr(s_map, "path", None) or "")
+
+    def selectFile():
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(directory=ui.file_path.text(),
+                                                        filter=getExtensionString(FileType.FITS.value))
+        if path:
+            ui.file_path.setText(path)
+
+    ui.file_select.clicked.connect(selectFile)
+    if not dlg.exec_() or not ui.file_path.text():
+        return
+
+    compression_type = ui.compression_combo.currentText()
+    compression_type = compression_type if compression_type in compression_types else None
+    tile_shape = (ui.tile_rows_spin.value(), ui.tile_columns_spin.value())
+    executeLongRunningTask(writeFits, [s_map, ui.file_path.text(), compression_type, tile_shape,
+                                       ui.quantize_spin.value()], "Exporting FITS")
+
+
+def writeFits(s_map, path: str, compression_type: str = None, tile_shape=None, quantize_level=16.):
+    """
+    Writes the map as FITS file. Tile compressed files are compressed on multiple cores.
+
+    :param s_map: the SunPy Map
+    :param path: the output file path
+    :param compression_type: the tile compression algorithm or None to write uncompressed
+    :param tile_shape: the tile shape (rows, columns)
+    :param quantize_level: the quantization level of floating point data
+    """
+    if compression_type is None:
+        s_map.save(path, overwrite=True)
+        return
+    if hasattr(s_map, "fits_header"):
+        header = s_map.fits_header
+    else:
+        from sunpy.io.fits import header_to_fits
+        header = header_to_fits(s_map.meta)
+    writeCompressed(path, s_map.data, header, compression_type, tile_shape, quantize_level)
 
 
 def getExtensionString(file_types):
@@ -1,2 +1,5 @@
+import os
+
 content_ctrl_name = "ContentController"
 viewers_name = "viewer-controllers"
+user_dir = os.path.join(os.path.expanduser("~"), ".solarviewer")
@@ -1,17 +1,18 @@
 """Abstract base classes and default types"""
 import copy
+import mmap
 from abc import ABC, abstractmethod
 from enum import Enum
-from threading import Event
-from typing import List, Dict
+from typing import List, Dict, Callable
 
+import numpy as np
 from PyQt5 import QtWidgets, QtGui, QtCore
 from PyQt5.QtWidgets import QWidget
 
 from solarviewer.config import content_ctrl_name
 from solarviewer.config.ioc import RequiredFeature
 from solarviewer.ui.dialog import Ui_Dialog
-from solarviewer.util import classproperty
+from solarviewer.util import classproperty, NotifyingEvent
 
 V_ID = 0
 
@@ -298,11 +299,114 @@ class ViewerConfig:
 class DataModel(ABC):
     """Base class for viewer controller models."""
     path = None
+    preview = False  # decimated preview, replaced by the full resolution model once it is loaded
+    shared_attributes = ()  # attributes (e.g., pixel buffers) that are shared between copies until replaced
+    display_attributes = ()  # display settings (e.g., colormap) that are kept when the preview is replaced
+
+    def __deepcopy__(self, memo):
+        """
+        Copy-on-write copy. The display state is deep copied, the shared attributes are passed to copyShared.
+        Modifications of shared data need to replace the attribute (e.g., setData).
+        """
+        clone = self.__class__.__new__(self.__class__)
+        memo[id(self)] = clone
+        for key, value in self.__dict__.items():
+            if key in self.shared_attributes:
+                clone.__dict__[key] = self.copyShared(key, value, memo)
+            else:
+                clone.__dict__[key] = copy.deepcopy(value, memo)
+        return clone
+
+    @property
+    def nbytes(self) -> int:
+        """Memory of the data held by the model (e.g., the pixel buffer). Memory mapped data is not counted."""
+        return arrayBytes(getattr(self, "data", None))
+
+    def copyShared(self, name: str, value, memo: dict):
+        """
+        Returns the copy of a shared attribute. By default arrays are referenced and set read-only.
+
+        :param name: the attribute name
+        :param value: the attribute value
+        :param memo: the deepcopy memo dictionary
+        :return: the (shallow) copy
+        """
+        return shareArray(value)
+
+    def setDisplayState(self, model: 'DataModel'):
+        """
+        Copies the display attributes of the model (e.g., the settings changed by the user on the preview).
+
+        :param model: the model to copy from
+        """
+        for key in self.display_attributes:
+            if key in model.__dict__:
+                self.__dict__[key] = copy.deepcopy(model.__dict__[key])
+
+    def privateCopy(self) -> 'DataModel':
+        """
+        Deep copy that does not share data with this model. The arrays of the copy are writable.
+
+        :return: the copied model
+        """
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(copy.deepcopy(self.__dict__))
+        return clone
+
+
+def arrayBytes(value) -> int:
+    """Returns the resident size of the array (0 for memory mapped arrays and other objects)."""
+    if not isinstance(value, np.ndarray):
+        return 0
+    base = value
+    while isinstance(base, np.ndarray) and base.base is not None:
+        base = base.base
+    if isinstance(value, np.memmap) or isinstance(base, mmap.mmap):
+        return 0
+    return value.nbytes
+
+
+def shareArray(value):
+    """Marks the array as read-only, so that shared buffers can not be modified in place."""
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    return value
 
 
 class Viewer(QtWidgets.QWidget):
     """Base class for the displayed widget."""
-    rendered = Event()
+    renderFinished = QtCore.pyqtSignal()  # emitted on the GUI thread after each completed render
+
+    def __init__(self, *args, **kwargs):
+        QtWidgets.QWidget.__init__(self, *args, **kwargs)
+        self.rendered = _RenderedEvent(self.renderFinished)  # render state of this viewer
+        self._render_callbacks = {}
+        self.renderFinished.connect(self._onRenderFinished)
+
+    def callAfterRender(self, callback: Callable, key=None):
+        """
+        Calls the function on the GUI thread when the viewer finished rendering.
+        If the viewer is currently rendered the function is called immediately.
+
+        :param callback: the function to call
+        :param key: callbacks with the same key are called only once per render (the latest is kept)
+        """
+        if self.rendered.is_set():
+            callback()
+            return
+        self._render_callbacks[key if key is not None else object()] = callback
+
+    @property
+    def render_nbytes(self) -> int:
+        """Memory of the render buffers of the viewer."""
+        return 0
+
+    def _onRenderFinished(self):
+        if not self.rendered.is_set():  # a new render was started in the meantime
+            return
+        callbacks, self._render_callbacks = self._render_callbacks, {}
+        for callback in callbacks.values():
+            callback()
 
     @abstractmethod
     def updateModel(self, model: DataModel) -> None:
@@ -315,8 +419,21 @@ class Viewer(QtWidgets.QWidget):
         raise NotImplementedError
 
 
+class _RenderedEvent(NotifyingEvent):
+    """Event that additionally emits the render signal of the viewer (thread-safe)."""
+
+    def __init__(self, signal):
+        NotifyingEvent.__init__(self)
+        self._signal = signal
+
+    def set(self):
+        NotifyingEvent.set(self)
+        self._signal.emit()
+
+
 class Controller(ABC):
     """Base class for registering controllers."""
+    eager: bool = False  # instantiate on startup (e.g., controllers that subscribe to application events)
 
     @classproperty
     def name(cls) -> str:
@@ -327,6 +444,7 @@ class Controller(ABC):
 class ViewerController(ABC):
     """Base class for viewer controllers."""
     _v_id: int = None
+    memory_map: bool = False  # keep the pixel data of opened files on disk until it is accessed (opt-in)
 
     def __init__(self):
         self._v_id = generateVId()
@@ -344,6 +462,31 @@ class ViewerController(ABC):
         """
         raise NotImplementedError
 
+    @classmethod
+    def readModel(cls, file: str) -> DataModel:
+        """
+        Read the data model from file. Called outside the GUI thread, therefore no widgets must be created.
+
+        :param file: file path to the data (list of file paths for multi file viewers)
+        :type file: str
+        :return: the data model or None if the controller can only be created with fromFile
+        :rtype: DataModel
+        """
+        return None
+
+    @classmethod
+    def readPreview(cls, file: str) -> DataModel:
+        """
+        Read a reduced preview of the data (e.g., for very large images). Called outside the GUI thread before
+        readModel, therefore no widgets must be created.
+
+        :param file: file path to the data (list of file paths for multi file viewers)
+        :type file: str
+        :return: the preview data model or None if no preview is required
+        :rtype: DataModel
+        """
+        return None
+
     @classmethod
     @abstractmethod
     def fromModel(cls, model: DataModel) -> 'ViewerController':
@@ -437,9 +580,9 @@ class ViewerController(ABC):
 class ActionController(Controller):
     """Base class for action items."""
 
-    @property
+    @classproperty
     @abstractmethod
-    def item_config(self) -> ItemConfig:
+    def item_config(cls) -> ItemConfig:
         """
         Create the Configuration.
         Responsible for the representation in the application.
@@ -469,9 +612,9 @@ class DialogController(Controller):
         self._dlg_ui.button_box.accepted.connect(self._onOk)
         self._dlg_ui.button_box.rejected.connect(self._onCancel)
 
-    @property
+    @classproperty
     @abstractmethod
-    def item_config(self) -> ItemConfig:
+    def item_config(cls) -> ItemConfig:
         """
         Create the Configuration.
         Responsible for the representation in the application.
@@ -539,9 +682,9 @@ class DialogController(Controller):
 class ToolController(Controller):
     """Base class for tool items."""
 
-    @property
+    @classproperty
     @abstractmethod
-    def item_config(self) -> ItemConfig:
+    def item_config(cls) -> ItemConfig:
         """
         Create the Configuration.
         Responsible for the representation in the application.
@@ -0,0 +1,187 @@
+"""On-disk cache of decoded FITS image data, keyed by the file content and the HDU index."""
+import hashlib
+import os
+import tempfile
+from threading import Lock
+from typing import Tuple
+
+import numpy as np
+from astropy.io import fits
+
+from solarviewer.config import user_dir
+from solarviewer.config.compression import readCompressed, isGzip
+
+cache_dir = os.path.join(user_dir, "arrays")
+
+
+class ArrayCache:
+    """
+    Stores the decoded data of compressed (tile compressed or gzip files) or scaled FITS images as memory mappable .npy
+    files alongside the header. Uncompressed and unscaled images are not cached, since they can be memory mapped from
+    the file directly.
+    The least recently used entries are evicted when the quota is exceeded.
+    """
+
+    def __init__(self, directory: str = cache_dir, quota: int = 2 * 1024 ** 3):
+        """
+        :param directory: the cache directory
+        :param quota: the maximum size of the cache in bytes (0 disables the cache)
+        """
+        self.directory = directory
+        self.quota = quota
+        self._digests = {}  # (path, size, mtime) -> content hash
+        self._lock = Lock()
+
+    def load(self, file: str) -> Tuple[np.ndarray, fits.Header]:
+        """
+        Returns the decoded data and header of the first image HDU. The data is decoded and stored on the first
+        request and memory mapped from the cache afterwards.
+
+        :param file: the FITS file path
+        :return: (data, header) or None if the cache is disabled or the image does not require decoding
+        """
+        if not self.quota:
+            return None
+        try:
+            gzipped = isGzip(file)  # streamed through the decompressor on the first request
+            with fits.open(file) as hdu_list:
+                index = findImageHDU(hdu_list)
+                if index is None or not (gzipped or requiresDecoding(hdu_list[index])):
+                    return None
+                key = self.getKey(file, index)
+                cached = self._read(key)
+                if cached is not None:
+                    return cached
+                hdu = hdu_list[index]
+                header = hdu.header.copy()
+                data = readCompressed(file, index) if isinstance(hdu, fits.CompImageHDU) else hdu.data
+        except OSError:
+            return None  # no FITS file
+        for k in ["BSCALE", "BZERO", "BLANK"]:  # the data is already scaled
+            header.remove(k, ignore_missing=True)
+        self._write(key, data, header)
+        # memory map the stored copy, so that the decoded array can be released
+        return self._read(key) or (data, header)
+
+    def getKey(self, file: str, hdu_index: int) -> str:
+        """
+        Returns the cache key of the HDU. The content hash is computed once per file modification.
+
+        :param file: the file path
+        :param hdu_index: the index of the HDU
+        :return: the key
+        """
+        stat = os.stat(file)
+        file_id = (os.path.abspath(file), stat.st_size, stat.st_mtime_ns)
+        digest = self._digests.get(file_id)
+        if digest is None:
+            h = hashlib.blake2b(digest_size=20)
+            with open(file, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 ** 2), b""):
+                    h.update(chunk)
+            digest = self._digests[file_id] = h.hexdigest()
+        return "{}_{}".format(digest, hdu_index)
+
+    def getSize(self) -> int:
+        """Returns the number of bytes of the cached data."""
+        return sum(e.stat().st_size for e in self._entries())
+
+    def clear(self):
+        for entry in self._entries():
+            self._remove(entry.path)
+
+    def _read(self, key):
+        data_file, header_file = self._paths(key)
+        try:
+            header = fits.Header.fromfile(header_file)
+            data = np.load(data_file, mmap_mode="r")
+            os.utime(data_file)  # least recently used order
+        except (OSError, ValueError):
+            return None
+        return data, header
+
+    def _write(self, key, data, header):
+        data_file, header_file = self._paths(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # write to temporary files first, so that readers never see partial entries
+            fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+            with os.fdopen(fd, "wb") as f:
+                header.tofile(f)
+            os.replace(tmp, header_file)
+            fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, np.asarray(data))
+            os.replace(tmp, data_file)
+        except OSError:
+            return  # opening works without cache
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda e: e.stat().st_mtime)
+            size = sum(e.stat().st_size for e in entries)
+            for entry in entries:
+                if size <= self.quota:
+                    break
+                size -= entry.stat().st_size
+                self._remove(entry.path)
+
+    def _entries(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return [e for e in os.scandir(self.directory) if e.name.endswith(".npy")]
+
+    def _remove(self, data_file):
+        try:
+            os.remove(data_file)
+            os.remove(data_file[:-len(".npy")] + ".hdr")
+        except OSError:
+            pass  # still mapped (Windows) or removed concurrently
+
+    def _paths(self, key):
+        path = os.path.join(self.directory, key)
+        return path + ".npy", path + ".hdr"
+
+
+def readImage(file: str, memory_map=False) -> Tuple[np.ndarray, fits.Header]:
+    """
+    Reads the image data and the header of the FITS file. Compressed and scaled images are read from the cache.
+
+    :param file: the file path
+    :param memory_map: memory map uncompressed and unscaled image data
+    :return: (data, header)
+    """
+    cached = array_cache.load(file)
+    if cached is not None:
+        return cached
+    with fits.open(file, memmap=memory_map) as hdu_list:
+        index = findImageHDU(hdu_list)
+        if index is None:
+            raise ValueError("No image data found in {}".format(file))
+        hdu = hdu_list[index]
+        data, header = hdu.data, hdu.header.copy()
+    for k in ["BSCALE", "BZERO", "BLANK"]:  # the data is already scaled, same header as a cached image
+        header.remove(k, ignore_missing=True)
+    return data, header
+
+
+def findImageHDU(hdu_list) -> int:
+    """
+    Returns the index of the first HDU with image data.
+
+    :param hdu_list: the opened FITS file
+    :return: the HDU index or None if the file contains no image
+    """
+    for i, hdu in enumerate(hdu_list):
+        if hdu.is_image and hdu.header.get("NAXIS", 0) >= 2:
+            return i
+    return None
+
+
+def requiresDecoding(hdu) -> bool:
+    """Returns True if the HDU data is compressed or scaled and can not be memory mapped from the file."""
+    return isinstance(hdu, fits.CompImageHDU) or "BSCALE" in hdu.header or "BZERO" in hdu.header
+
+
+array_cache = ArrayCache()  # shared cache of decoded images
@@ -0,0 +1,159 @@
+"""Tile compressed FITS images, compressed and decompressed in parallel on multiple cores."""
+import gzip
+import io
+import math
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from astropy.io import fits
+
+compression_types = ["RICE_1", "GZIP_1", "GZIP_2", "HCOMPRESS_1", "PLIO_1"]
+min_parallel_pixels = 2048 * 2048  # smaller images are processed in the calling thread
+fits_extensions = (".fits", ".fit", ".fts")
+
+
+def writeCompressed(file: str, data: np.ndarray, header: fits.Header, compression_type="RICE_1",
+                    tile_shape=None, quantize_level=16., workers=None):
+    """
+    Writes the image as tile compressed FITS file. Large images are split into strips of complete tile rows that
+    are compressed in the worker processes and merged into a single compressed HDU.
+
+    :param file: the output file path
+    :param data: the image data
+    :param header: the image header
+    :param compression_type: the compression algorithm (see compression_types)
+    :param tile_shape: the tile shape (rows, columns). Defaults to single rows.
+    :param quantize_level: the quantization level of floating point data
+    :param workers: the number of strips (defaults to the size of the process pool)
+    """
+    tile_shape = tuple(tile_shape) if tile_shape else (1, data.shape[-1])
+    settings = {"compression_type": compression_type, "tile_shape": tile_shape, "quantize_level": quantize_level,
+                "quantize_method": 1, "dither_seed": int(np.random.randint(1, 10001))}
+    strips = _getStrips(data.shape, tile_shape[0], workers) if data.ndim == 2 else []
+    if len(strips) <= 1 or data.size < min_parallel_pixels:
+        fits.HDUList([fits.PrimaryHDU(), fits.CompImageHDU(data, header, **settings)]).writeto(file, overwrite=True)
+        return
+
+    from solarviewer.util import getProcessPool
+    pool = getProcessPool()
+    tiles_per_row = int(math.ceil(data.shape[1] / tile_shape[1]))
+    futures = [pool.submit(_compressStrip, np.ascontiguousarray(data[start:end]), header,
+                           start // tile_shape[0] * tiles_per_row, settings) for start, end in strips]
+    tables = [fits.open(io.BytesIO(f.result()), disable_image_compression=True)[1] for f in futures]
+    _mergeTables(tables, data.shape).writeto(file, overwrite=True)
+
+
+def readCompressed(file: str, index: int, workers=None) -> np.ndarray:
+    """
+    Reads the image data of the compressed HDU. The tiles of large images are decompressed in the worker processes.
+
+    :param file: the file path
+    :param index: the HDU index
+    :param workers: the number of strips (defaults to the size of the process pool)
+    :return: the decompressed image
+    """
+    with fits.open(file, disable_image_compression=True) as hdu_list:
+        header = hdu_list[index].header
+        shape = tuple(header["ZNAXIS%d" % i] for i in range(header["ZNAXIS"], 0, -1))
+        tile_rows = header.get("ZTILE2", 1)
+    with fits.open(file) as hdu_list:
+        hdu = hdu_list[index]
+        # compressed HDUs support sections only in recent astropy versions
+        if len(shape) != 2 or int(np.prod(shape)) < min_parallel_pixels or not hasattr(hdu, "section"):
+            return hdu.data
+    strips = _getStrips(shape, tile_rows, workers)
+    if len(strips) <= 1:
+        with fits.open(file) as hdu_list:
+            return hdu_list[index].data
+
+    from solarviewer.util import getProcessPool
+    pool = getProcessPool()
+    futures = [pool.submit(_decompressStrip, file, index, start, end) for start, end in strips]
+    return np.concatenate([f.result() for f in futures])
+
+
+def _getStrips(shape, tile_rows, workers):
+    """Splits the rows of the image into strips of complete tile rows."""
+    if workers is None:
+        from solarviewer.util import getProcessPool
+        workers = getProcessPool()._max_workers
+    n_tiles = int(math.ceil(shape[0] / tile_rows))
+    tiles_per_strip = int(math.ceil(n_tiles / max(1, workers)))
+    rows = tiles_per_strip * tile_rows
+    return [(start, min(start + rows, shape[0])) for start in range(0, shape[0], rows)]
+
+
+def _compressStrip(data, header, first_tile, settings):
+    """Process side of writeCompressed. Returns the compressed strip as FITS file content."""
+    settings = dict(settings)
+    # the dither offset of a tile depends on its index in the full image
+    settings["dither_seed"] = (settings["dither_seed"] - 1 + first_tile) % 10000 + 1
+    buffer = io.BytesIO()
+    fits.HDUList([fits.PrimaryHDU(), fits.CompImageHDU(data, header, **settings)]).writeto(buffer)
+    return buffer.getvalue()
+
+
+def _decompressStrip(file, index, start, end):
+    """Process side of readCompressed."""
+    with fits.open(file) as hdu_list:
+        return hdu_list[index].section[start:end]
+
+
+def _mergeTables(tables, shape):
+    """Concatenates the tile rows of the compressed strips into a single compressed HDU."""
+    header = tables[0].header.copy()
+    names = tables[0].columns.names
+    if any(table.columns.names != names for table in tables):
+        raise ValueError("The compressed strips have different columns: {}".format(
+            [table.columns.names for table in tables]))
+    # only strips with undefined (NaN) pixels define the blank value of the quantized tiles
+    blanks = set(table.header["ZBLANK"] for table in tables if "ZBLANK" in table.header)
+    if len(blanks) > 1:
+        raise ValueError("The compressed strips have different blank values: {}".format(sorted(blanks)))
+    if blanks:
+        header["ZBLANK"] = blanks.pop()
+    columns = []
+    for column in tables[0].columns:
+        values = [value for table in tables for value in table.data[column.name]]
+        if column.format.startswith(("1P", "1Q", "P", "Q")):  # variable length tile data
+            columns.append(fits.Column(name=column.name, format=column.format.split("(")[0] + "()", array=values))
+        else:
+            columns.append(fits.Column(name=column.name, format=column.format, array=np.array(values)))
+    table = fits.BinTableHDU.from_columns(columns, header=header)
+    table.header["ZNAXIS2"] = shape[0]
+    return fits.HDUList([fits.PrimaryHDU(), table])
+
+
+def decompressFile(path: str, buffer_size=1024 ** 2) -> str:
+    """
+    Decompresses the gzip file and removes it afterwards. The content is streamed in blocks of buffer_size, the
+    output is written to a temporary file first, so that no partial files remain.
+
+    :param path: the path of the .gz file
+    :param buffer_size: the number of bytes held in memory
+    :return: the path of the decompressed file
+    """
+    target = path[:-len(".gz")] if path.endswith(".gz") else path
+    if not target.lower().endswith(fits_extensions):
+        target += ".fits"
+    fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with gzip.open(path, "rb") as f_in, os.fdopen(fd, "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out, buffer_size)
+        os.replace(tmp, target)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    os.remove(path)
+    return target
+
+
+def isGzip(file: str) -> bool:
+    """Returns True if the file is gzip compressed (e.g., .fits.gz)."""
+    try:
+        with open(file, "rb") as f:
+            return f.read(2) == b"\x1f\x8b"
+    except OSError:
+        return False
@@ -1,5 +1,8 @@
 import copy
 from abc import abstractmethod
+from typing import Dict
+
+import numpy as np
 
 from PyQt5 import QtWidgets
 from PyQt5.QtWidgets import QWidget, QDialogButtonBox
@@ -13,11 +16,14 @@ from solarviewer.config.base import ViewerController, DataModel, ActionControlle
 from solarviewer.config.ioc import RequiredFeature
 from solarviewer.ui.data_tool import Ui_DataTool
 from solarviewer.ui.viewer_tool import Ui_ViewerTool
-from solarviewer.util import executeTask, executeLongRunningTask
+from solarviewer.util import executeTask, executeLongRunningTask, classproperty, executeInProcess
 
 
 class DataToolController(ToolController):
     """Base class for tool items with relation to the currently viewed data"""
+    process_safe: bool = False  # the tool implements getParameters and the pure (static) processData function
+    use_process_pool: bool = False  # execute process safe tools in worker processes (opt-in)
+    copy_data: bool = True  # modifyData receives writable arrays (disable if the data is not modified in place)
     content_ctrl: ContentController = RequiredFeature(content_ctrl_name)
 
     def __init__(self):
@@ -47,15 +53,51 @@ class DataToolController(ToolController):
         """Triggered action for data changes (switched tab, modified data)"""
         raise NotImplementedError
 
-    @abstractmethod
     def modifyData(self, data_model: DataModel) -> DataModel:
         """
-        Triggered apply action.
-        :param data_model: The selected data model
+        Triggered apply action. Process safe tools implement getParameters and processData instead.
+        :param data_model: The selected data model (a private copy with writable arrays, unless copy_data is disabled)
         :return: The modified data model
         """
+        return self.processModel(data_model, self.getParameters())
+
+    def getParameters(self) -> Dict:
+        """
+        Process safe tools: Returns the (picklable) tool parameters. Called on the GUI thread.
+        :return: keyword arguments for processData
+        """
+        return {}
+
+    @staticmethod
+    def processData(data: np.ndarray, **parameters) -> np.ndarray:
+        """
+        Process safe tools: Computes the new data array. Must not access the tool state, as it might be executed in a
+        worker process.
+        :param data: the pixel array (read-only, as it is shared with the displayed model)
+        :param parameters: the parameters from getParameters
+        :return: the new pixel array
+        """
         raise NotImplementedError
 
+    def applyData(self, data_model: DataModel, data: np.ndarray, parameters: Dict) -> DataModel:
+        """
+        Process safe tools: Sets the processed data. Override to adjust additional model attributes.
+        :param data_model: The selected data model
+        :param data: the result of processData
+        :param parameters: the parameters from getParameters
+        :return: The modified data model
+        """
+        data_model.setData(data)
+        return data_model
+
+    def processModel(self, data_model: DataModel, parameters: Dict) -> DataModel:
+        """Runs processData with the selected backend (thread or process pool) and applies the result."""
+        if self.use_process_pool:
+            data = executeInProcess(self.processData, data_model.data, parameters)
+        else:
+            data = self.processData(data_model.data, **parameters)
+        return self.applyData(data_model, data, parameters)
+
     @property
     def view(self) -> QtWidgets:
         viewer_ctrl = self.content_ctrl.getViewerController()
@@ -71,22 +113,27 @@ class DataToolController(ToolController):
         self._tool_ui.message_box.hide()
         self._tool_ui.button_box.setEnabled(False)
         data_model = self.content_ctrl.getDataModel(self._v_id)
-        executeTask(self._apply, [data_model], self._onResult)
+        parameters = self.getParameters() if self.process_safe else None  # read the widgets on the GUI thread
+        executeTask(self._apply, [data_model, parameters], self._onResult, [self._v_id])
 
-    def _apply(self, data_model):
+    def _apply(self, data_model, parameters=None):
         try:
-            data_copy = copy.deepcopy(data_model)
-            result = self.modifyData(data_copy)
+            if parameters is None:
+                data_copy = data_model.privateCopy() if self.copy_data else copy.deepcopy(data_model)
+                result = self.modifyData(data_copy)
+            else:
+                data_copy = copy.deepcopy(data_model)
+                result = self.processModel(data_copy, parameters)
             return result if result else data_copy
         except Exception as ex:
             return ex
 
-    def _onResult(self, result):
+    def _onResult(self, result, v_id):
         self._tool_ui.button_box.setEnabled(True)
         if isinstance(result, Exception):
             self._tool_ui.message_box.showMessage(str(result))
             return
-        self.content_ctrl.setDataModel(result)
+        self.content_ctrl.setDataModel(result, v_id)
 
     def _onTabChanged(self, viewer_ctrl: ViewerController):
         if self._sub_id is not None:
@@ -118,6 +165,7 @@ class DataToolController(ToolController):
 
 class DataActionController(ActionController):
     """Base class for actions related to the currently viewed data"""
+    copy_data: bool = True  # modifyData receives writable arrays (disable if the data is not modified in place)
     content_ctrl = RequiredFeature(ContentController.name)
 
     def onAction(self):
@@ -126,7 +174,7 @@ class DataActionController(ActionController):
         executeLongRunningTask(self._action, [data_model], "Action in Progress", call_after)
 
     def _action(self, data_model):
-        data_copy = copy.deepcopy(data_model)
+        data_copy = data_model.privateCopy() if self.copy_data else copy.deepcopy(data_model)
         modified = self.modifyData(data_copy)
         return modified
 
@@ -143,9 +191,9 @@ class ToolbarController(Controller):
         self._sub_id = None
         self._tab_sub_id = None
 
-    @property
+    @classproperty
     @abstractmethod
-    def item_config(self) -> ToolbarConfig:
+    def item_config(cls) -> ToolbarConfig:
         raise NotImplementedError
 
     @abstractmethod
@@ -8,18 +8,76 @@
 class FeatureBroker:
     def __init__(self, allowReplace=False):
         self.providers = {}
+        self.types = {}
+        self.type_index = {}  # type -> features of this type or a subclass (None for unknown types)
         self.allowReplace = allowReplace
+        self._positions = {}
+        self._queries = {}
 
     def Provide(self, feature, provider, *args, **kwargs):
-        if not self.allowReplace:
-            assert feature not in self.providers, "Duplicate feature: %r" % feature
         if callable(provider):
             def call():
                 return provider(*args, **kwargs)
         else:
             def call():
                 return provider
+        self._register(feature, call, None if callable(provider) else type(provider))
+
+    def ProvideLazy(self, feature, factory, *args, **kwargs):
+        """
+        Register a feature that is created by the factory upon the first request.
+        Subsequent requests return the same instance.
+
+        :param feature: the feature name
+        :param factory: the class (or callable) that creates the feature
+        """
+        instance = []
+
+        def call():
+            if not instance:
+                instance.append(factory(*args, **kwargs))
+            return instance[0]
+
+        self._register(feature, call, factory if isinstance(factory, type) else None)
+
+    def _register(self, feature, call, feature_type):
+        if not self.allowReplace:
+            assert feature not in self.providers, "Duplicate feature: %r" % feature
+        if feature in self.providers:
+            self._removeIndex(feature)
+        self._positions.setdefault(feature, len(self._positions))
         self.providers[feature] = call
+        self.types[feature] = feature_type
+        for t in feature_type.__mro__ if feature_type is not None else [None]:
+            self.type_index.setdefault(t, {})[feature] = None
+        self._queries.clear()
+
+    def _removeIndex(self, feature):
+        feature_type = self.types[feature]
+        for t in feature_type.__mro__ if feature_type is not None else [None]:
+            self.type_index[t].pop(feature, None)
+
+    def FeaturesOfType(self, *classes):
+        """
+        Returns the names of the features that are instances (or subclasses) of the given classes, in order of
+        registration. Features with unknown type (registered factories) are included as candidates.
+
+        :param classes: the feature classes
+        :return: list of feature names
+        """
+        if classes not in self._queries:
+            matching = {}
+            for t in classes + (None,):
+                matching.update(self.type_index.get(t, {}))
+            self._queries[classes] = sorted(matching, key=self._positions.get)
+        return self._queries[classes]
+
+    def __iter__(self):
+        for feature in list(self.providers.keys()):
+            yield self[feature]
+
+    def __len__(self):
+        return len(self.providers)
 
     def __getitem__(self, feature):
         if isinstance(feature, int):
@@ -50,6 +108,14 @@ def NoAssertion(obj): return True
 def IsInstanceOf(*classes):
     def test(obj): return isinstance(obj, classes)
 
+    test.classes = classes  # allows type indexed requests
+    return test
+
+
+def IsSubclassOf(*classes):
+    def test(cls): return isinstance(cls, type) and issubclass(cls, classes)
+
+    test.classes = classes  # allows type indexed requests
     return test
 
 
@@ -118,6 +184,33 @@ class MatchingFeatures:
         return self.result
 
     def Request(self):
-        for obj in features:
+        classes = getattr(self.assertion, "classes", None)
+        if classes is None:
+            candidates = features
+        else:
+            candidates = (features[f] for f in features.FeaturesOfType(*classes))
+        for obj in candidates:
             if self.assertion(obj):
                 yield obj
+
+
+class MatchingFeatureTypes:
+    """Resolves the types of the matching features, without requesting (and instantiating) the features."""
+
+    def __init__(self, assertion=NoAssertion):
+        self.assertion = assertion
+
+    def __get__(self, obj, T):
+        return self.result  # <-- will request the feature types upon first call
+
+    def __getattr__(self, name):
+        assert name == 'result', "Unexpected attribute request other then 'result'"
+        self.result = list(self.Request())
+        return self.result
+
+    def Request(self):
+        classes = getattr(self.assertion, "classes", None)
+        names = features.types.keys() if classes is None else features.FeaturesOfType(*classes)
+        for feature_type in (features.types[f] for f in names):
+            if feature_type is not None and self.assertion(feature_type):
+                yield feature_type
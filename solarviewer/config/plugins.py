@@ -0,0 +1,77 @@
+"""Discovery of plugin modules registered with the 'solarviewer.plugins' entry point."""
+import hashlib
+import json
+import os
+import sys
+from importlib import metadata
+from typing import List
+
+from solarviewer.config import user_dir
+
+plugin_group = "solarviewer.plugins"
+cache_file = os.path.join(user_dir, "plugins.json")
+
+
+def discoverPlugins(rescan: bool = False, cache: str = cache_file) -> List[str]:
+    """
+    Returns the module names of the installed plugins. The result is cached and only rescanned when the
+    installed distributions changed.
+
+    :param rescan: True to ignore the cache
+    :param cache: the path of the cache file
+    :return: list of plugin module names
+    """
+    key = environmentKey()
+    if not rescan:
+        cached = _readCache(cache)
+        if cached is not None and cached.get("key") == key:
+            return cached["modules"]
+    modules = scanPlugins()
+    _writeCache(cache, {"key": key, "modules": modules})
+    return modules
+
+
+def scanPlugins() -> List[str]:
+    """Scans all installed distributions for plugin entry points."""
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        entry_points = entry_points.select(group=plugin_group)
+    else:
+        entry_points = entry_points.get(plugin_group, [])
+    return [ep.value.split(":")[0].strip() for ep in entry_points]
+
+
+def environmentKey() -> str:
+    """
+    Creates a hash of the installation state of the python environment. Covers the modification times of the
+    search paths and of the installed distribution metadata (dist-info, egg-info, egg-link and pth files).
+    """
+    digest = hashlib.sha1()
+    for path in sys.path:
+        if not os.path.isdir(path):
+            continue
+        digest.update("{}:{}".format(path, os.stat(path).st_mtime_ns).encode())
+        for entry in sorted(os.scandir(path), key=lambda e: e.name):
+            if not entry.name.endswith((".dist-info", ".egg-info", ".egg-link", ".pth")):
+                continue
+            entry_file = os.path.join(entry.path, "entry_points.txt")
+            mtime = os.stat(entry_file).st_mtime_ns if os.path.isfile(entry_file) else entry.stat().st_mtime_ns
+            digest.update("{}:{}".format(entry.name, mtime).encode())
+    return digest.hexdigest()
+
+
+def _readCache(cache):
+    try:
+        with open(cache) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _writeCache(cache, content):
+    try:
+        os.makedirs(os.path.dirname(cache), exist_ok=True)
+        with open(cache, "w") as f:
+            json.dump(content, f)
+    except OSError:
+        pass  # discovery works without cache
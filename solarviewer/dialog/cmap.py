@@ -5,14 +5,15 @@ from matplotlib.colors import Colormap
 
 from solarviewer.config.base import DialogController, ItemConfig, ViewerType, DataType, ViewerController, DataModel
 from solarviewer.ui.cmap import Ui_Colormap
+from solarviewer.util import classproperty
 
 
 class CmapController(DialogController):
     def __init__(self):
         DialogController.__init__(self)
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setTitle("Select Coloramap").setMenuPath("Edit/Change Colormap").addSupportedViewer(
             ViewerType.MPL).addSupportedData(DataType.MAP).addSupportedData(DataType.PLAIN_2D).addSupportedData(
             DataType.NDCUBE)
@@ -2,6 +2,7 @@ from astropy import units as u
 
 from solarviewer.config.base import DialogController, ItemConfig, ViewerType, DataType, DataModel, ViewerController
 from solarviewer.ui.rotate import Ui_Rotate
+from solarviewer.util import classproperty
 from solarviewer.viewer.map import MapModel
 
 
@@ -9,8 +10,8 @@ class RotateController(DialogController):
     def __init__(self):
         DialogController.__init__(self)
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setTitle("Rotate").setMenuPath("Edit/Rotate").addSupportedViewer(
             ViewerType.ANY).addSupportedData(DataType.MAP)
 
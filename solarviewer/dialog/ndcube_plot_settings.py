@@ -1,14 +1,13 @@
-from ndcube import NDCube
-
 from solarviewer.config.base import DialogController, DataModel, ViewerController, ItemConfig, DataType, ViewerType
 from solarviewer.ui.ndcube_plot_settings import Ui_NDCubePlotSettings
-from solarviewer.viewer.ndcube import NDCubeModel
+from solarviewer.util import classproperty
+from solarviewer.viewer.ndcube import NDCubeModel, ndcube
 
 
 class NDCubePlotSettingsController(DialogController):
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().addSupportedData(DataType.ANY).addSupportedViewer(ViewerType.MPL).setMenuPath(
             "View/Plot Settings").setTitle("NDCube Plot Settings")
 
@@ -18,7 +17,7 @@ class NDCubePlotSettingsController(DialogController):
 
     def onDataChanged(self, viewer_ctrl: ViewerController):
         image_axes = viewer_ctrl.model.image_axes
-        cube: NDCube = viewer_ctrl.model.cube
+        cube: ndcube.NDCube = viewer_ctrl.model.cube
 
         axes = [ax if ax else "Unknown Axis Type" for ax in cube.world_axis_physical_types]
 
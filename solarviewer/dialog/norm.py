@@ -6,6 +6,7 @@ from matplotlib import colors
 
 from solarviewer.config.base import DialogController, ViewerController, ItemConfig, ViewerType, DataType
 from solarviewer.ui.norm import Ui_Norm
+from solarviewer.util import classproperty
 from solarviewer.viewer.map import MapModel
 
 
@@ -33,8 +34,8 @@ class NormController(DialogController):
 
         DialogController.__init__(self)
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setTitle("Normalization").setMenuPath("Edit/Normalization").addSupportedViewer(
             ViewerType.MPL).addSupportedData(DataType.MAP)
 
@@ -4,12 +4,13 @@ from sunpy.map import Map
 
 from solarviewer.config.base import DialogController, DataModel, ViewerController, ItemConfig, DataType, ViewerType
 from solarviewer.ui.plot_settings import Ui_PlotSettings
+from solarviewer.util import classproperty
 
 
 class PlotSettingsController(DialogController):
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().addSupportedData(DataType.MAP).addSupportedViewer(ViewerType.MPL).setMenuPath(
             "View/Plot Settings").setTitle("Plot Settings")
 
@@ -1,31 +1,43 @@
+import argparse
 import os
 import sys
+import time
 from inspect import isabstract
 
 import matplotlib
-import pkg_resources
 import sunpy
 from PyQt5 import QtWidgets
 from PyQt5.QtCore import QLocale
 
 from solarviewer.app.app import AppController
+from solarviewer.app.session import SessionController
 from solarviewer.config import viewers_name
 from solarviewer.config.base import ViewerController, Controller
+from solarviewer.config.cache import array_cache
+from solarviewer.config.impl import DataToolController
 from solarviewer.config.ioc import features
+from solarviewer.config.plugins import discoverPlugins
+from solarviewer.tool.download_result import DownloadResultController
 from solarviewer.ui.resources_rc import qInitResources
 
 matplotlib.use("Qt5Agg")
 
 
 def main():
+    args, qt_args = parseArguments()
     # check sunpy download directory exists
     os.makedirs(sunpy.config.get("downloads", "download_dir"), exist_ok=True)
     # prepare application
-    app = QtWidgets.QApplication(sys.argv)
+    app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
     QLocale.setDefault(QLocale(QLocale.English, QLocale.UnitedStates))
 
-    prepareImports()
-    registerControllers()
+    prepareImports(report=args.import_report, rescan_plugins=args.rescan_plugins)
+    SessionController.enabled = not args.no_session
+    registerControllers(lazy=not args.eager)
+    DataToolController.use_process_pool = args.process_pool
+    ViewerController.memory_map = args.memory_map
+    array_cache.quota = args.cache_quota * 1024 ** 2
+    DownloadResultController.keep_compressed = args.keep_compressed
     registerViewers()
     loadResources()
 
@@ -36,30 +48,71 @@ def main():
     sys.exit(app.exec_())
 
 
+def parseArguments():
+    parser = argparse.ArgumentParser(prog="solarviewer")
+    parser.add_argument("--eager", action="store_true",
+                        help="instantiate all controllers on startup instead of on first use")
+    parser.add_argument("--import-report", action="store_true",
+                        help="print the cumulative import time of each module on startup")
+    parser.add_argument("--rescan-plugins", action="store_true",
+                        help="ignore the cached plugin discovery and scan the installed packages")
+    parser.add_argument("--process-pool", action="store_true",
+                        help="execute process safe data tools in worker processes")
+    parser.add_argument("--memory-map", action="store_true",
+                        help="keep the data of opened FITS files on disk until it is accessed")
+    parser.add_argument("--cache-quota", type=int, default=2048, metavar="MB",
+                        help="size of the cache of decoded compressed FITS images (0 to disable)")
+    parser.add_argument("--keep-compressed", action="store_true",
+                        help="keep downloaded .gz files compressed and decompress them when opened")
+    parser.add_argument("--no-session", action="store_true",
+                        help="neither restore nor autosave the open viewers")
+    return parser.parse_known_args()
+
+
 def loadResources():
     qInitResources()
 
 
-def prepareImports():
-    __import__("solarviewer.app.content", globals(), locals(), ['*'])
-    __import__("solarviewer.app.statusbar", globals(), locals(), ['*'])
-    __import__("solarviewer.app.history", globals(), locals(), ['*'])
-    __import__("solarviewer.app.error", globals(), locals(), ['*'])
-    __import__("solarviewer.viewer", globals(), locals(), ['*'])
-    __import__("solarviewer.tool", globals(), locals(), ['*'])
-    __import__("solarviewer.action", globals(), locals(), ['*'])
-    __import__("solarviewer.dialog", globals(), locals(), ['*'])
-    __import__("solarviewer.toolbar", globals(), locals(), ['*'])
-    for ep in pkg_resources.iter_entry_points('solarviewer.plugins'):
-        __import__(ep.module_name, globals(), locals(), ['*'])
-
-
-def registerControllers():
-    # load base controllers
-    for c in getAllSubclasses(Controller):
-        if isabstract(c):
-            continue
-        features.Provide(c.name, c())  # instantiate and add to ioc container
+def prepareImports(report=False, rescan_plugins=False):
+    modules = ["solarviewer.app.content", "solarviewer.app.statusbar", "solarviewer.app.history",
+               "solarviewer.app.error", "solarviewer.app.session"]
+    for package in ["solarviewer.viewer", "solarviewer.tool", "solarviewer.action", "solarviewer.dialog",
+                    "solarviewer.toolbar"]:
+        modules.extend([package + "." + m for m in __import__(package, globals(), locals(), ['__all__']).__all__])
+    modules.extend(discoverPlugins(rescan_plugins))
+
+    timings = []
+    for module in modules:
+        loaded = len(sys.modules)
+        start = time.perf_counter()
+        __import__(module, globals(), locals(), ['*'])
+        timings.append((module, time.perf_counter() - start, len(sys.modules) - loaded))
+    if report:
+        printImportReport(timings)
+
+
+def printImportReport(timings):
+    """
+    Prints the cumulative import time of each module (including all modules that were imported for the first time).
+
+    :param timings: list of (module name, seconds, number of newly loaded modules)
+    """
+    print("{:<50} {:>12} {:>12}".format("module", "cumulative", "new modules"), file=sys.stderr)
+    for module, seconds, count in sorted(timings, key=lambda t: t[1], reverse=True):
+        print("{:<50} {:>10.1f}ms {:>12}".format(module, seconds * 1000, count), file=sys.stderr)
+    print("{:<50} {:>10.1f}ms {:>12}".format("total", sum(t[1] for t in timings) * 1000,
+                                             sum(t[2] for t in timings)), file=sys.stderr)
+
+
+def registerControllers(lazy=True):
+    controllers = [c for c in getAllSubclasses(Controller) if not isabstract(c)]
+    # add to ioc container, instantiated on first request
+    for c in controllers:
+        features.ProvideLazy(c.name, c)
+    # instantiate controllers required from startup
+    for c in controllers:
+        if c.eager or not lazy:
+            features[c.name]
 
 
 def registerViewers():
@@ -0,0 +1,238 @@
+import copy
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+from PyQt5.QtWidgets import QApplication, QWidget
+from matplotlib import pyplot as plt
+
+from solarviewer.app.content import ContentController
+from solarviewer.app.plot import PlotWidget
+from solarviewer.config.base import ViewerController, DataModel, DataType, ViewerType, ItemConfig, \
+    ViewerConfig
+from solarviewer.config.impl import DataToolController
+from solarviewer.config.ioc import features, RequiredFeature
+from solarviewer.util import classproperty, executor
+
+
+class ValueModel(DataModel):
+    display_attributes = ("cmap",)
+
+    def __init__(self, value):
+        self.value = value
+        self.cmap = "gray"
+
+
+class ValuePlot(PlotWidget):
+    def draw(self, data_model):
+        pass
+
+
+class ValueViewerController(ViewerController):
+    data_type = DataType.MAP
+    viewer_type = ViewerType.MPL
+    viewer_config = None
+
+    def __init__(self, model):
+        ViewerController.__init__(self)
+        self._model = model
+        self._view = ValuePlot()
+        self._view.updateModel(model)
+
+    @classmethod
+    def fromFile(cls, file):
+        raise NotImplementedError
+
+    @classmethod
+    def fromModel(cls, model):
+        return cls(model)
+
+    @property
+    def model(self):
+        return self._model
+
+    @property
+    def view(self):
+        return self._view
+
+    def updateModel(self, model):
+        self._model = model
+        self._view.updateModel(model)
+
+    def getTitle(self):
+        return str(self._model.value)
+
+
+class FileViewerController(ValueViewerController):
+    viewer_config = ViewerConfig()
+
+    @classmethod
+    def readModel(cls, file):
+        time.sleep(0.05)
+        if file == "invalid":
+            raise ValueError("invalid file")
+        return ValueModel(file)
+
+    @classmethod
+    def readPreview(cls, file):
+        if file == "large_invalid":
+            raise ValueError("invalid preview")
+        if not file.startswith("large"):
+            return None
+        model = ValueModel("preview")
+        model.preview = True
+        return model
+
+
+class TestContentController(unittest.TestCase):
+    n_viewers = 100
+
+    def setUp(self):
+        self.app = QApplication.instance() or QApplication(sys.argv)
+        self.content_ctrl = ContentController()
+        features.allowReplace = True
+        features.Provide(ContentController.name, self.content_ctrl)
+
+        self.viewers = []
+        for i in range(self.n_viewers):
+            viewer_ctrl = ValueViewerController(ValueModel(0))
+            self.content_ctrl.addViewerController(viewer_ctrl)
+            self.viewers.append(viewer_ctrl)
+
+    def tearDown(self):
+        for v in self.viewers:
+            plt.close(v.view.figure)
+        self.content_ctrl.view.deleteLater()
+        self.app.processEvents()
+
+    def _waitFor(self, condition, timeout=20):
+        end = time.time() + timeout
+        while not condition() and time.time() < end:
+            self.app.processEvents()
+            time.sleep(0.005)
+        self.assertTrue(condition())
+
+    def test_render_state(self):
+        self._waitFor(lambda: all(v.view.rendered.is_set() for v in self.viewers))
+        viewer = self.viewers[0]
+        viewer.view.redraw()
+        self.assertFalse(viewer.view.rendered.is_set())
+        self.assertTrue(all(v.view.rendered.is_set() for v in self.viewers[1:]))
+        self._waitFor(lambda: viewer.view.rendered.is_set())
+
+    def test_apply_tools(self):
+        n_threads = threading.active_count()
+        notifications = {}
+
+        def onDataChanged(viewer_ctrl):
+            notifications[viewer_ctrl.v_id] = notifications.get(viewer_ctrl.v_id, 0) + 1
+            self.assertTrue(viewer_ctrl.view.rendered.is_set())
+
+        class IncrementTool(DataToolController):
+            content_ctrl = RequiredFeature(ContentController.name)
+
+            @classproperty
+            def item_config(cls):
+                return ItemConfig().addSupportedViewer(ViewerType.MPL).addSupportedData(DataType.MAP)
+
+            def setupContent(self, content_widget: QWidget):
+                pass
+
+            def onDataChanged(self, viewer_ctrl):
+                pass
+
+            def modifyData(self, data_model):
+                data_model.value += 1
+                return data_model
+
+        tool = IncrementTool()
+        tool.view
+        for v in self.viewers:
+            self.content_ctrl.subscribeDataChanged(v.v_id, onDataChanged)
+            tool._onTabChanged(v)
+            tool._onApply()
+
+        self._waitFor(lambda: len(notifications) == self.n_viewers)
+        self._waitFor(lambda: all(v.view.rendered.is_set() for v in self.viewers))
+        self.app.processEvents()
+
+        self.assertEqual([1] * self.n_viewers, [v.model.value for v in self.viewers])
+        self.assertEqual([1] * self.n_viewers, list(notifications.values()))
+        # no thread per render or notification
+        self.assertLessEqual(threading.active_count(), n_threads + executor.max_workers + 1)
+
+    def test_memory_usage(self):
+        viewer = self.viewers[0]
+        viewer.model.data = np.zeros((100, 100))
+        self.content_ctrl.registerMemoryProvider("history", lambda v_id: 10 if v_id == viewer.v_id else 0)
+
+        usage = self.content_ctrl.getMemoryUsage(viewer.v_id)
+        self.assertEqual(80000, usage["data"])
+        self.assertEqual(10, usage["history"])
+        self.assertGreater(usage["render"], 0)
+        self.assertEqual(usage["data"] + usage["history"] + usage["render"], usage["total"])
+
+        report = self.content_ctrl.getMemoryReport()
+        self.assertEqual(self.n_viewers, len(report))
+        self.assertEqual(0, report[self.viewers[1].v_id]["data"])
+
+    def test_open_files(self):
+        files = ["file_%d" % i for i in range(10)] + ["invalid"]
+        with mock.patch("sys.excepthook") as excepthook:
+            self.content_ctrl.openFiles(FileViewerController, files)
+            self._waitFor(lambda: len(self.content_ctrl.getViewerControllers(DataType.MAP)) == self.n_viewers + 10)
+            self._waitFor(lambda: excepthook.called)
+        opened = [v for v in self.content_ctrl.getViewerControllers(DataType.MAP) if isinstance(v, FileViewerController)]
+        self.viewers.extend(opened)
+        self.assertEqual(set(files[:-1]), {v.model.value for v in opened})
+        self.assertIn("invalid", str(excepthook.call_args[0][1]))
+
+    def test_cancel_open(self):
+        token = self.content_ctrl.openFiles(FileViewerController, ["file_%d" % i for i in range(10)])
+        token.cancel()
+        self._waitFor(lambda: executor.metrics()["queued"] == 0 and executor.metrics()["running"] == 0)
+        self.app.processEvents()
+        self.assertEqual(self.n_viewers, len(self.content_ctrl.getViewerControllers(DataType.MAP)))
+
+    def test_preview(self):
+        self.content_ctrl.openFiles(FileViewerController, ["large_file"])
+        self._waitFor(lambda: len(self.content_ctrl.getViewerControllers(DataType.MAP)) == self.n_viewers + 1)
+        viewer = self.content_ctrl.getViewerControllers(DataType.MAP)[-1]
+        self.viewers.append(viewer)
+        self.assertEqual("preview", viewer.model.value)
+        self._waitFor(lambda: viewer.model.value == "large_file")
+        self.assertFalse(viewer.model.preview)
+
+    def test_preview_changes(self):
+        release = threading.Event()
+
+        def readModel(file):
+            release.wait(5)
+            return ValueModel(file)
+
+        with mock.patch.object(FileViewerController, "readModel", readModel):
+            self.content_ctrl.openFiles(FileViewerController, ["large_file"])
+        self._waitFor(lambda: len(self.content_ctrl.getViewerControllers(DataType.MAP)) == self.n_viewers + 1)
+        viewer = self.content_ctrl.getViewerControllers(DataType.MAP)[-1]
+        self.viewers.append(viewer)
+        model = copy.deepcopy(viewer.model)
+        model.cmap = "viridis"
+        self.content_ctrl.setDataModel(model, viewer.v_id)
+
+        release.set()
+        self._waitFor(lambda: viewer.model.value == "large_file")
+        self.assertFalse(viewer.model.preview)
+        self.assertEqual("viridis", viewer.model.cmap)
+
+    def test_preview_error(self):
+        with mock.patch("sys.excepthook") as excepthook:
+            self.content_ctrl.openFiles(FileViewerController, ["large_invalid"])
+            self._waitFor(lambda: len(self.content_ctrl.getViewerControllers(DataType.MAP)) == self.n_viewers + 1)
+        viewer = self.content_ctrl.getViewerControllers(DataType.MAP)[-1]
+        self.viewers.append(viewer)
+        self.assertEqual("large_invalid", viewer.model.value)
+        self.assertFalse(viewer.model.preview)
+        excepthook.assert_not_called()
@@ -0,0 +1,109 @@
+import copy
+import sys
+import tempfile
+import time
+import unittest
+
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+from mock import Mock
+
+from solarviewer.app.content import ContentController
+from solarviewer.app.history import HistoryController
+from solarviewer.config.ioc import features, RequiredFeature
+from solarviewer.test.models import ArrayModel
+
+
+class ViewerCtrlMock:
+    v_id = 1
+
+    def __init__(self, model):
+        self.model = model
+
+
+class TestHistoryController(unittest.TestCase):
+
+    def setUp(self):
+        self.app = QApplication.instance() or QApplication(sys.argv)
+        self.content_ctrl = Mock()
+        features.allowReplace = True
+        features.Provide(ContentController.name, lambda: self.content_ctrl)
+
+        class TestHistory(HistoryController):
+            content_ctrl = RequiredFeature(ContentController.name)
+
+        self.history = TestHistory()
+        self.arrays = [np.random.rand(256, 256)]
+        self.viewer = ViewerCtrlMock(ArrayModel(self.arrays[0]))
+        self.history.onViewerAdded(self.viewer)
+
+    def tearDown(self):
+        self.history.onViewerClosed(self.viewer)
+
+    def _change(self, n):
+        for i in range(n):
+            data = self.arrays[-1].copy()
+            data[i, :10] = -1  # small modifications
+            self.arrays.append(data)
+            model = copy.deepcopy(self.viewer.model)
+            model.setData(data)
+            self.viewer.model = model
+            self.history.onDataChanged(self.viewer)
+        end = time.time() + 5
+        while any(s.compressing for s in self.history.viewers[1]) and time.time() < end:
+            self.app.processEvents()
+            time.sleep(0.005)
+
+    def _undo(self):
+        self.history.undo(1)
+        model = self.content_ctrl.setDataModel.call_args[0][0]
+        self.viewer.model = model
+        self.history.onDataChanged(self.viewer)  # skipped
+        return model
+
+    def test_compressed(self):
+        self._change(5)
+        footprint = self.history.getFootprint(1)
+        self.assertEqual(6, footprint["entries"])
+        self.assertLess(footprint["memory"], 2 * self.arrays[0].nbytes)
+        self.assertEqual(0, footprint["disk"])
+
+        for data in reversed(self.arrays[:-1]):
+            np.testing.assert_array_equal(data, self._undo().data)
+
+    def test_spill(self):
+        self.history.memory_budget = 0
+        self._change(5)
+        footprint = self.history.getFootprint(1)
+        self.assertGreater(footprint["disk"], 0)
+
+        for data in reversed(self.arrays[:-1]):
+            np.testing.assert_array_equal(data, self._undo().data)
+        self.assertEqual(0, self.history.getFootprint(1)["disk"])
+
+    def test_shared(self):
+        model = copy.deepcopy(self.viewer.model)
+        model.settings["vmin"] = 5
+        self.viewer.model = model
+        self.history.onDataChanged(self.viewer)
+        self.assertEqual(0, self.history.getFootprint(1)["memory"])
+
+        restored = self._undo()
+        self.assertEqual(0, restored.settings["vmin"])
+        self.assertIs(self.arrays[0], restored.data)
+
+    def test_max_entries(self):
+        self.history.max_entries = 3
+        self._change(5)
+        self.assertEqual(3, self.history.getFootprint(1)["entries"])
+
+    def test_memory_mapped(self):
+        with tempfile.NamedTemporaryFile() as f:
+            np.save(f, self.arrays[0])
+            f.flush()
+            self.viewer.model = ArrayModel(np.load(f.name, mmap_mode="r"))
+            self.history.onViewerAdded(self.viewer)
+            self._change(5)
+            footprint = self.history.getFootprint(1)
+            self.assertFalse(self.history.viewers[1][0].compressible)
+            self.assertLess(footprint["memory"], 2 * self.arrays[0].nbytes)
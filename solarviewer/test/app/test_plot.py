@@ -0,0 +1,130 @@
+import io
+import sys
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+from matplotlib import pyplot as plt
+
+from solarviewer.app.plot import PlotWidget
+
+
+class TestPlotWidget(unittest.TestCase):
+
+    def setUp(self):
+        self.app = QApplication.instance() or QApplication(sys.argv)
+
+        class TestPlot(PlotWidget):
+            def __init__(self):
+                PlotWidget.__init__(self)
+                self.drawn = []
+
+            def draw(self, data_model):
+                time.sleep(0.05)
+                if data_model == "error":
+                    raise ValueError(data_model)
+                self.drawn.append(data_model)
+
+        self.plot = TestPlot()
+
+    def tearDown(self):
+        plt.close(self.plot.figure)
+        self.plot.deleteLater()
+        self.app.processEvents()
+
+    def _waitRendered(self, timeout=5):
+        end = time.time() + timeout
+        while not self.plot.rendered.is_set() and time.time() < end:
+            self.app.processEvents()
+            time.sleep(0.005)
+        self.assertTrue(self.plot.rendered.is_set())
+
+    def test_coalesce(self):
+        for i in range(10):
+            self.plot.updateModel(i)
+        self._waitRendered()
+        self.assertEqual([9], self.plot.drawn)
+
+    def test_superseded(self):
+        self.plot.updateModel(1)
+        end = time.time() + 5
+        while not self.plot._rendering and time.time() < end:
+            self.app.processEvents()
+        # update while the first model is rendered
+        self.plot.updateModel(2)
+        self._waitRendered()
+        self.assertEqual(2, self.plot.drawn[-1])
+        self.assertLessEqual(len(self.plot.drawn), 2)
+
+    def test_error(self):
+        with mock.patch("sys.excepthook") as excepthook:
+            self.plot.updateModel("error")
+            self._waitRendered()
+            self.assertIsInstance(excepthook.call_args[0][1], ValueError)
+        self.assertFalse(self.plot._rendering)
+        self.assertTrue(self.plot.ui.progress.isHidden())
+        self.assertIn("error", self.plot.figure.texts[0].get_text())
+        # recovers with the next model
+        self.plot.updateModel(1)
+        self._waitRendered()
+        self.assertEqual([1], self.plot.drawn)
+
+
+class TestOverlayLayer(unittest.TestCase):
+
+    def setUp(self):
+        self.app = QApplication.instance() or QApplication(sys.argv)
+
+        class TestPlot(PlotWidget):
+            def draw(self, data_model):
+                self.figure.add_subplot(111).imshow(np.zeros((10, 10)), cmap="gray", vmin=0, vmax=1)
+
+        self.plot = TestPlot()
+        self.plot.draw(None)
+        self.plot.canvas.draw()
+        self.ax = self.plot.figure.axes[0]
+        self.overlay = self.plot.overlay
+        self.background = self._pixels()
+
+    def tearDown(self):
+        plt.close(self.plot.figure)
+        self.plot.deleteLater()
+        self.app.processEvents()
+
+    def _pixels(self):
+        return np.array(self.plot.canvas.buffer_rgba())
+
+    def _red(self, pixels):
+        return np.sum((pixels[..., 0] > 200) & (pixels[..., 1] < 50))
+
+    def test_blit(self):
+        with mock.patch.object(self.plot.figure, "draw") as draw:
+            line = self.ax.plot([2, 7], [5, 5], color="r", linewidth=5)[0]
+            self.overlay.addArtists([line])
+            red = self._red(self._pixels())
+            self.assertGreater(red, 0)
+            point = self.ax.plot([5], [2], "o", color="r", markersize=10)[0]
+            self.overlay.addArtists([point])
+            self.assertGreater(self._red(self._pixels()), red)
+            self.overlay.removeArtists([line, point])
+            np.testing.assert_array_equal(self.background, self._pixels())
+            draw.assert_not_called()
+        self.assertEqual(0, len(self.ax.lines))
+
+    def test_redraw(self):
+        line = self.ax.plot([2, 7], [5, 5], color="r", linewidth=5)[0]
+        self.overlay.addArtists([line])
+        pixels = self._pixels()
+        # drawn over the new background
+        self.plot.canvas.draw()
+        np.testing.assert_array_equal(pixels, self._pixels())
+        buffer = io.BytesIO()
+        self.plot.figure.savefig(buffer, format="rgba", dpi=self.plot.figure.dpi)
+        saved = np.frombuffer(buffer.getvalue(), np.uint8).reshape(pixels.shape)
+        self.assertGreater(self._red(saved), 0)
+        # removed with the figure
+        self.plot.figure.clear()
+        self.plot.canvas.draw()
+        self.assertEqual([], self.overlay._artists)
@@ -0,0 +1,167 @@
+import json
+import os
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from astropy.time import Time
+from astropy.visualization import ImageNormalize, PowerStretch
+import matplotlib
+from sunpy.map import Map
+
+from solarviewer.action.save import SaveProjectAction
+from solarviewer.app import project
+from solarviewer.app.project import ProjectFile
+from solarviewer.app.util import supported
+from solarviewer.config.base import DataType, ViewerType
+from solarviewer.viewer.composite import CompositeMapModel, CompositeMapViewerController
+from solarviewer.viewer.map import MapModel, MapViewerController
+
+
+class TestProjectFile(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.dir.name, "project.svp")
+        meta = {"CTYPE1": "HPLN-TAN", "CTYPE2": "HPLT-TAN", "CUNIT1": "arcsec", "CUNIT2": "arcsec", "CDELT1": 0.5,
+                "CDELT2": 0.5, "CRPIX1": 64.5, "CRPIX2": 32.5, "CRVAL1": 10, "CRVAL2": -20,
+                "DATE-OBS": "2020-01-01T00:00:00"}
+        self.model = MapModel(Map(np.random.rand(64, 128).astype(np.float32), meta))
+        self.model.norm = ImageNormalize(vmin=0.1, vmax=0.9, clip=True, stretch=PowerStretch(2))
+        self.model.setCMap(matplotlib.colormaps["viridis"])
+        self.model.cmap_preferences["over"] = (1, 0, 0, 1)
+        self.model.plot_preferences["show_limb"] = True
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_round_trip(self):
+        ProjectFile(self.file).save(MapViewerController, self.model)
+        opened = ProjectFile(self.file)
+        self.assertIs(MapViewerController, opened.getViewerType())
+        model = opened.readModel()
+        self.assertIsInstance(model, MapModel)
+        self.assertEqual(self.file, model.path)
+        np.testing.assert_array_equal(self.model.data, model.data)
+        self.assertEqual(self.model.map.meta["crpix1"], model.map.meta["crpix1"])
+        self.assertTrue(model.plot_preferences["show_limb"])
+        self.assertEqual((1, 0, 0, 1), model.cmap_preferences["over"])
+        self.assertIsInstance(model.norm, ImageNormalize)
+        self.assertEqual((0.1, 0.9, True, 2), (model.norm.vmin, model.norm.vmax, model.norm.clip, model.norm.stretch.a))
+        np.testing.assert_array_equal(self.model.cmap(np.linspace(0, 1, 10)), model.cmap(np.linspace(0, 1, 10)))
+        self.assertIsNone(opened.readModel(preview=True))
+
+    def test_incremental_save(self):
+        with mock.patch.object(project, "chunk_size", 4096):
+            ProjectFile(self.file).save(MapViewerController, self.model)
+            size = os.path.getsize(self.file)
+            ProjectFile(self.file).save(MapViewerController, self.model)
+            # only the manifest is appended
+            self.assertLess(os.path.getsize(self.file) - size, 4096)
+
+            data = self.model.data.copy()
+            data[0, 0] = 2
+            self.model.setData(data)
+            ProjectFile(self.file).save(MapViewerController, self.model)
+            self.assertLess(os.path.getsize(self.file) - size, 3 * 4096)
+            np.testing.assert_array_equal(data, ProjectFile(self.file).readModel().data)
+
+    def test_failed_append(self):
+        with mock.patch.object(project, "chunk_size", 4096):
+            ProjectFile(self.file).save(MapViewerController, self.model)
+            size = os.path.getsize(self.file)
+            data = self.model.data
+            changed = data.copy()
+            changed[0, 0] = changed[-1, -1] = 2  # two new chunks
+            self.model.setData(changed)
+            compress = project.zlib.compress
+            with mock.patch.object(project.zlib, "compress", side_effect=[compress(b"chunk"), OSError("disk full")]):
+                with self.assertRaises(OSError):
+                    ProjectFile(self.file).save(MapViewerController, self.model)
+        self.assertEqual(size, os.path.getsize(self.file))
+        np.testing.assert_array_equal(data, ProjectFile(self.file).readModel().data)
+
+    def test_interrupted_append(self):
+        with mock.patch.object(project, "chunk_size", 4096):
+            ProjectFile(self.file).save(MapViewerController, self.model)
+            data = self.model.data
+            changed = data.copy()
+            changed[0, 0] = 2
+            self.model.setData(changed)
+            ProjectFile(self.file).save(MapViewerController, self.model)
+        # the last manifest and trailer were not written completely
+        with open(self.file, "r+b") as f:
+            f.truncate(os.path.getsize(self.file) - 10)
+        np.testing.assert_array_equal(data, ProjectFile(self.file).readModel().data)
+        ProjectFile(self.file).save(MapViewerController, self.model)
+        np.testing.assert_array_equal(self.model.data, ProjectFile(self.file).readModel().data)
+
+    def test_composite(self):
+        model = CompositeMapModel([self.model.map, Map(self.model.data * 2, self.model.map.meta)])
+        ProjectFile(self.file).save(CompositeMapViewerController, model)
+        opened = ProjectFile(self.file)
+        self.assertIs(CompositeMapViewerController, opened.getViewerType())
+        restored = opened.readModel()
+        self.assertEqual(list(model.maps), list(restored.maps))
+        for (m, settings), (r, restored_settings) in zip(model.maps.values(), restored.maps.values()):
+            np.testing.assert_array_equal(m.data, r.data)
+            self.assertEqual(settings, restored_settings)
+
+    def test_time(self):
+        self.model.time = Time(["2020-01-01T00:00:00.123", "2020-01-02T12:00:00"], scale="tai")
+        ProjectFile(self.file).save(MapViewerController, self.model)
+        time = ProjectFile(self.file).readModel().time
+        self.assertEqual(("tai", "isot"), (time.scale, time.format))
+        np.testing.assert_array_equal(self.model.time.jd1, time.jd1)
+        np.testing.assert_array_equal(self.model.time.jd2, time.jd2)
+
+    def test_unsupported(self):
+        self.model.series = object()
+        with self.assertRaises(TypeError):
+            ProjectFile(self.file).save(MapViewerController, self.model)
+        self.assertFalse(os.path.exists(self.file))
+        config = SaveProjectAction.item_config
+        for data_type in [DataType.MAP, DataType.MAP_COMPOSITE, DataType.PLAIN_2D]:
+            self.assertTrue(supported(data_type, ViewerType.MPL, config.supported_data_types,
+                                      config.supported_viewer_types))
+        for data_type in [DataType.SERIES, DataType.SPECTROGRAM, DataType.NDCUBE]:
+            self.assertFalse(supported(data_type, ViewerType.MPL, config.supported_data_types,
+                                       config.supported_viewer_types))
+
+    def test_compact(self):
+        with mock.patch.object(project, "chunk_size", 4096):
+            ProjectFile(self.file).save(MapViewerController, self.model)
+            size = os.path.getsize(self.file)
+            for i in range(3):
+                self.model.setData(np.random.rand(64, 128).astype(np.float32))
+                ProjectFile(self.file).save(MapViewerController, self.model)
+            self.assertLess(os.path.getsize(self.file), 2 * size)
+            np.testing.assert_array_equal(self.model.data, ProjectFile(self.file).readModel().data)
+
+    def test_preview(self):
+        with mock.patch.object(project, "preview_pixels", 1000), mock.patch.object(project, "preview_size", 32):
+            ProjectFile(self.file).save(MapViewerController, self.model)
+        preview = ProjectFile(self.file).readModel(preview=True)
+        self.assertTrue(preview.preview)
+        np.testing.assert_array_equal(self.model.data[::4, ::4], preview.data)
+        self.assertEqual(2., preview.map.meta["cdelt1"])
+        self.assertFalse(ProjectFile(self.file).readModel().preview)
+
+    def test_reject(self):
+        with open(self.file, "wb") as f:
+            pickle.dump(self.model, f)
+        with self.assertRaises(IOError):
+            ProjectFile(self.file).readModel()
+
+        ProjectFile(self.file).save(MapViewerController, self.model)
+        manifest = ProjectFile(self.file).getManifest()
+        manifest["viewer"] = "os:system"
+        manifest["model"]["__model__"]["type"] = "subprocess:Popen"
+        opened = ProjectFile(self.file)
+        opened._manifest = json.loads(json.dumps(manifest))
+        with self.assertRaises(IOError):
+            opened.getViewerType()
+        with self.assertRaises(IOError):
+            opened.readModel()
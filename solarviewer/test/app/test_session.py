@@ -0,0 +1,183 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from threading import Event, Timer
+from unittest import mock
+
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+
+from solarviewer.app.content import ContentController
+from solarviewer.app.history import HistoryController
+from solarviewer.app.project import ProjectFile
+from solarviewer.app.session import SessionController, SessionViewerController, SessionModel
+from solarviewer.config.ioc import features, RequiredFeature
+from solarviewer.test.app.test_content import ValueViewerController
+from solarviewer.test.models import ArrayModel
+
+
+class ArrayViewerController(ValueViewerController):
+
+    def getTitle(self):
+        return "array %d" % self.model.data[0, 0]
+
+
+class TestSessionController(unittest.TestCase):
+
+    def setUp(self):
+        self.app = QApplication.instance() or QApplication(sys.argv)
+        self.dir = tempfile.TemporaryDirectory()
+        self.controllers = []
+
+    def tearDown(self):
+        for content_ctrl, _, session in self.controllers:
+            session._timer.stop()
+            content_ctrl.view.deleteLater()
+        self.app.processEvents()
+        self.dir.cleanup()
+
+    def _start(self):
+        content_ctrl = ContentController()
+        features.allowReplace = True
+        features.Provide(ContentController.name, content_ctrl)
+
+        class TestHistory(HistoryController):
+            content_ctrl = RequiredFeature(ContentController.name)
+
+        history = TestHistory()
+        features.Provide(HistoryController.name, history)
+
+        class TestSession(SessionController):
+            directory = self.dir.name
+            autosave_interval = 3600 * 1000
+            content_ctrl = RequiredFeature(ContentController.name)
+            history_ctrl = RequiredFeature(HistoryController.name)
+
+        session = TestSession()
+        self.controllers.append((content_ctrl, history, session))
+        self.app.processEvents()  # restore
+        return content_ctrl, history, session
+
+    def _waitFor(self, condition, timeout=20):
+        end = time.time() + timeout
+        while not condition() and time.time() < end:
+            self.app.processEvents()
+            time.sleep(0.005)
+        self.assertTrue(condition())
+
+    def _change(self, content_ctrl, history, viewer_ctrl, value):
+        model = ArrayModel(viewer_ctrl.model.data.copy())
+        model.data[0, 0] = value
+        content_ctrl.setDataModel(model, viewer_ctrl.v_id)
+        self._waitFor(lambda: history.viewers[viewer_ctrl.v_id][-1].model is model)
+
+    def _getFiles(self):
+        with open(os.path.join(self.dir.name, "session.json")) as f:
+            return [os.path.join(self.dir.name, e["file"]) for e in json.load(f)["viewers"]]
+
+    def test_restore(self):
+        content_ctrl, history, session = self._start()
+        viewers = [ArrayViewerController(ArrayModel(np.full((64, 64), i, np.float32))) for i in range(3)]
+        for viewer_ctrl in viewers:
+            content_ctrl.addViewerController(viewer_ctrl)
+        self._waitFor(lambda: len(session._files) == 3)
+        self._change(content_ctrl, history, viewers[0], 10)
+        self._change(content_ctrl, history, viewers[0], 20)
+        content_ctrl.activateViewer(viewers[2].v_id)
+        session.checkpoint(blocking=True)
+        files = self._getFiles()
+        self.assertEqual(3, len(files))
+
+        # only changed viewers are written
+        mtimes = [os.stat(f).st_mtime_ns for f in files]
+        self._change(content_ctrl, history, viewers[1], 30)
+        session.checkpoint(blocking=True)
+        self.assertEqual([True, False, True], [os.stat(f).st_mtime_ns == t for f, t in zip(files, mtimes)])
+
+        content_ctrl, history, session = self._start()
+        restored = content_ctrl.getViewerControllers()
+        self.assertEqual(3, len(restored))
+        self.assertEqual(["array 20", "array 30", "array 2"], [v.getTitle() for v in restored])
+        # the active viewer is loaded, the others when they are focused
+        self._waitFor(lambda: isinstance(content_ctrl.getViewerControllers()[2], ArrayViewerController))
+        self.assertTrue(all(isinstance(v, SessionViewerController) for v in content_ctrl.getViewerControllers()[:2]))
+
+        content_ctrl.activateViewer(restored[0].v_id)
+        self._waitFor(lambda: isinstance(content_ctrl.getViewerControllers()[0], ArrayViewerController))
+        self.assertIsInstance(content_ctrl.getViewerControllers()[1], SessionViewerController)
+        viewer_ctrl = content_ctrl.getViewerController()
+        self.assertIs(content_ctrl.getViewerControllers()[0], viewer_ctrl)
+        self.assertEqual(20, viewer_ctrl.model.data[0, 0])
+        self._waitFor(lambda: history.getFootprint(viewer_ctrl.v_id)["entries"] == 3)
+        history.undo(viewer_ctrl.v_id)
+        self._waitFor(lambda: content_ctrl.getDataModel(viewer_ctrl.v_id).data[0, 0] == 10)
+
+    def test_closed(self):
+        content_ctrl, history, session = self._start()
+        viewers = [ArrayViewerController(ArrayModel(np.zeros((8, 8)))) for i in range(2)]
+        for viewer_ctrl in viewers:
+            content_ctrl.addViewerController(viewer_ctrl)
+        self._waitFor(lambda: len(session._files) == 2)
+        session.checkpoint(blocking=True)
+        files = self._getFiles()
+        content_ctrl._onTabClosed(viewers[0].v_id)
+        session.checkpoint(blocking=True)
+        self.assertEqual(files[1:], self._getFiles())
+        self.assertFalse(os.path.exists(files[0]))
+
+    def _addViewers(self, content_ctrl, session, count):
+        viewers = [ArrayViewerController(ArrayModel(np.zeros((8, 8)))) for i in range(count)]
+        for viewer_ctrl in viewers:
+            content_ctrl.addViewerController(viewer_ctrl)
+        self._waitFor(lambda: len(session._files) == count)
+        session.checkpoint(blocking=True)
+        return viewers
+
+    def _readValues(self):
+        return [ProjectFile(f).readModel().data[0, 0] for f in self._getFiles()]
+
+    def test_quit_while_saving(self):
+        content_ctrl, history, session = self._start()
+        viewers = self._addViewers(content_ctrl, session, 3)
+        started, release = Event(), Event()
+        write = session._write
+
+        def slowWrite(jobs, index):
+            started.set()
+            release.wait(5)
+            return write(jobs, index)
+
+        self._change(content_ctrl, history, viewers[0], 10)
+        with mock.patch.object(session, "_write", slowWrite):
+            session.checkpoint()
+            self.assertTrue(started.wait(5))
+        self._change(content_ctrl, history, viewers[1], 20)
+        content_ctrl._onTabClosed(viewers[2].v_id)
+        # the blocking checkpoint waits for the background write
+        Timer(0.1, release.set).start()
+        session.checkpoint(blocking=True)
+        self.assertTrue(release.is_set())
+        self.assertEqual([10, 20], self._readValues())
+
+    def test_quit_before_saving(self):
+        content_ctrl, history, session = self._start()
+        viewers = self._addViewers(content_ctrl, session, 2)
+        self._change(content_ctrl, history, viewers[0], 10)
+        self._change(content_ctrl, history, viewers[1], 20)
+        with mock.patch("solarviewer.app.session.executeTask") as execute:
+            session.checkpoint()
+        self._change(content_ctrl, history, viewers[1], 30)
+        session.checkpoint(blocking=True)
+        self.assertEqual([10, 30], self._readValues())
+
+        # the queued background checkpoint is skipped
+        save, args = execute.call_args[0][:2]
+        self.assertEqual([], save(*args))
+        self.assertEqual([10, 30], self._readValues())
+
+    def test_from_file(self):
+        self.assertRaises(TypeError, SessionViewerController.fromFile, "session.svp")
+        self.assertEqual("title", SessionViewerController.fromModel(SessionModel("session.svp", "title")).getTitle())
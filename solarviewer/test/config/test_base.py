@@ -1,7 +1,9 @@
+import copy
 import sys
 import unittest
 from unittest.mock import Mock
 
+import numpy as np
 from PyQt5 import QtCore
 from PyQt5.QtWidgets import QApplication
 from qtpy import QtWidgets
@@ -10,6 +12,7 @@ from qtpy.QtTest import QTest
 from solarviewer.app.content import ContentController
 from solarviewer.config.base import ItemConfig, DataType, ViewerType, ToolbarConfig, ViewerConfig, DialogController
 from solarviewer.config.ioc import features
+from solarviewer.test.models import ArrayModel
 
 
 class TestConfig(unittest.TestCase):
@@ -53,10 +56,38 @@ class TestConfig(unittest.TestCase):
         self.assertEquals(config.required_pkg, ["PKG"])
 
 
+class TestDataModel(unittest.TestCase):
+
+    def test_copy_on_write(self):
+        model = ArrayModel(np.arange(10))
+        model_copy = copy.deepcopy(model)
+
+        self.assertIs(model.data, model_copy.data)
+        self.assertIsNot(model.settings, model_copy.settings)
+        with self.assertRaises(ValueError):
+            model_copy.data[0] = 1
+
+        model_copy.settings["vmin"] = 5
+        model_copy.setData(model_copy.data * 2)
+        self.assertEqual(0, model.settings["vmin"])
+        self.assertEqual(9, model.data[-1])
+        self.assertEqual(18, model_copy.data[-1])
+
+    def test_private_copy(self):
+        model = ArrayModel(np.arange(10))
+        copy.deepcopy(model)  # shares the read-only array
+        model_copy = model.privateCopy()
+
+        self.assertIsInstance(model_copy, ArrayModel)
+        self.assertIsNot(model.settings, model_copy.settings)
+        model_copy.data[0] = 1
+        self.assertEqual(0, model.data[0])
+
+
 class TestDialogController(unittest.TestCase):
 
     def setUp(self):
-        self.app = QApplication(sys.argv)
+        self.app = QApplication.instance() or QApplication(sys.argv)
         features.allowReplace = True
         features.Provide(ContentController.name, Mock())
 
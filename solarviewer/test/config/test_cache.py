@@ -0,0 +1,78 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from astropy.io import fits
+
+from solarviewer.config.cache import ArrayCache, readImage
+
+
+class TestArrayCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache = ArrayCache(os.path.join(self.dir, "cache"))
+        self.data = np.random.randint(0, 1000, (128, 128)).astype(np.int16)
+        self.file = self._writeCompressed("compressed.fits", self.data)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _writeCompressed(self, name, data):
+        file = os.path.join(self.dir, name)
+        fits.HDUList([fits.PrimaryHDU(), fits.CompImageHDU(data, fits.Header({"TELESCOP": "TEST"}))]).writeto(file)
+        return file
+
+    def test_load(self):
+        data, header = self.cache.load(self.file)
+        np.testing.assert_array_equal(self.data, data)
+        self.assertEqual("TEST", header["TELESCOP"])
+        self.assertGreater(self.cache.getSize(), 0)
+
+        # content addressed
+        copy = os.path.join(self.dir, "copy.fits")
+        shutil.copy(self.file, copy)
+        self.assertEqual(self.cache.getKey(self.file, 1), self.cache.getKey(copy, 1))
+        data, header = self.cache.load(copy)
+        self.assertIsInstance(data, np.memmap)
+        np.testing.assert_array_equal(self.data, data)
+
+    def test_uncompressed(self):
+        file = os.path.join(self.dir, "plain.fits")
+        fits.writeto(file, self.data.astype(np.float32))
+        self.assertIsNone(self.cache.load(file))
+        self.assertEqual(0, self.cache.getSize())
+
+    def test_gzip(self):
+        file = os.path.join(self.dir, "plain.fits.gz")
+        with gzip.open(file, "wb") as f:
+            fits.writeto(f, self.data)
+        data, header = self.cache.load(file)
+        self.assertIsInstance(data, np.memmap)
+        np.testing.assert_array_equal(self.data, data)
+
+    def test_read_image(self):
+        # the image header with and without the cache
+        for quota in [2 * 1024 ** 3, 0]:
+            with mock.patch("solarviewer.config.cache.array_cache", ArrayCache(self.cache.directory, quota)):
+                data, header = readImage(self.file)
+            np.testing.assert_array_equal(self.data, data)
+            self.assertEqual("TEST", header["TELESCOP"])
+            self.assertEqual(2, header["NAXIS"])
+
+    def test_evict(self):
+        self.cache.quota = int(self.data.nbytes * 2.5)
+        files = [self._writeCompressed("file_%d.fits" % i, self.data + i) for i in range(4)]
+        for file in files[:2]:
+            self.cache.load(file)
+        self.cache.load(files[0])  # recently used
+        for file in files[2:]:
+            self.cache.load(file)
+        self.assertLessEqual(self.cache.getSize(), self.cache.quota)
+        keys = [self.cache.getKey(f, 1) for f in files]
+        self.assertIsNone(self.cache._read(keys[1]))
+        self.assertIsNotNone(self.cache._read(keys[3]))
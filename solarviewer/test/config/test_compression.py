@@ -0,0 +1,74 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from astropy.io import fits
+
+from solarviewer.config import compression
+from solarviewer.config.compression import writeCompressed, readCompressed, decompressFile
+
+
+class TestCompression(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.header = fits.Header({"TELESCOP": "TEST"})
+        self._min_pixels = compression.min_parallel_pixels
+        compression.min_parallel_pixels = 0
+
+    def tearDown(self):
+        compression.min_parallel_pixels = self._min_pixels
+        shutil.rmtree(self.dir)
+
+    def _write(self, name, data, workers, **kwargs):
+        file = os.path.join(self.dir, name)
+        np.random.seed(1)  # same dither seed
+        writeCompressed(file, data, self.header, tile_shape=(16, 50), workers=workers, **kwargs)
+        return file
+
+    def test_parallel_write(self):
+        for data, compression_type in [((np.random.rand(200, 120) * 1000).astype(np.float32), "RICE_1"),
+                                       (np.random.randint(0, 1000, (200, 120)).astype(np.int16), "GZIP_2")]:
+            serial = self._write("serial.fits", data, 1, compression_type=compression_type)
+            parallel = self._write("parallel.fits", data, 3, compression_type=compression_type)
+            with fits.open(serial, disable_image_compression=True) as s, \
+                    fits.open(parallel, disable_image_compression=True) as p:
+                self.assertEqual(len(s[1].data), len(p[1].data))
+                for a, b in zip(s[1].data["COMPRESSED_DATA"], p[1].data["COMPRESSED_DATA"]):
+                    if compression_type.startswith("GZIP"):  # the gzip header holds the time of compression
+                        a, b = gzip.decompress(a.tobytes()), gzip.decompress(b.tobytes())
+                    np.testing.assert_array_equal(a, b)
+            with fits.open(parallel) as p:
+                self.assertIsInstance(p[1], fits.CompImageHDU)
+                self.assertEqual("TEST", p[1].header["TELESCOP"])
+                np.testing.assert_array_equal(fits.getdata(serial), p[1].data)
+
+    def test_parallel_nan(self):
+        data = (np.random.rand(200, 120) * 1000).astype(np.float32)
+        data[180:, :25] = np.nan  # only in the last strip
+        serial = self._write("serial.fits", data, 1)
+        parallel = self._write("parallel.fits", data, 3)
+        for file in [serial, parallel]:
+            result = fits.getdata(file)
+            self.assertEqual(500, np.isnan(result).sum())
+            np.testing.assert_array_equal(np.isnan(data), np.isnan(result))
+        np.testing.assert_array_equal(fits.getdata(serial), fits.getdata(parallel))
+
+    def test_parallel_read(self):
+        data = np.random.randint(0, 1000, (200, 120)).astype(np.int32)
+        file = self._write("data.fits", data, 1)
+        np.testing.assert_array_equal(data, readCompressed(file, 1, workers=3))
+
+    def test_decompress_file(self):
+        data = np.arange(64, dtype=np.int16).reshape(8, 8)
+        file = os.path.join(self.dir, "download.fts.gz")
+        with gzip.open(file, "wb") as f:
+            fits.writeto(f, data)
+        path = decompressFile(file, buffer_size=100)
+        self.assertEqual(os.path.join(self.dir, "download.fts"), path)
+        self.assertFalse(os.path.exists(file))
+        np.testing.assert_array_equal(data, fits.getdata(path))
+        self.assertEqual(["download.fts"], os.listdir(self.dir))
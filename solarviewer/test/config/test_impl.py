@@ -1,6 +1,8 @@
 import sys
+import time
 import unittest
 
+import numpy as np
 from PyQt5 import QtWidgets, QtCore
 from PyQt5.QtTest import QTest
 from PyQt5.QtWidgets import QApplication
@@ -11,6 +13,7 @@ from solarviewer.app.content import ContentController
 from solarviewer.config.base import ItemConfig, DataType, ViewerType
 from solarviewer.config.impl import DataToolController, DataActionController, ToolbarController, ViewerToolController
 from solarviewer.config.ioc import features
+from solarviewer.test.models import ArrayModel
 
 
 class ContentCtrlMock:
@@ -23,6 +26,7 @@ class ContentCtrlMock:
     unsubscribe = Mock()
     getViewerController = Mock()
     getDataModel = Mock()
+    setDataModel = Mock()
 
 
 class ConnectionCtrlMock:
@@ -38,10 +42,18 @@ class ViewerMock:
     viewer_type = ViewerType.MPL
 
 
+def waitFor(condition, timeout=5):
+    # the tasks are executed in the background
+    end = time.time() + timeout
+    while not condition() and time.time() < end:
+        time.sleep(0.005)
+    return condition()
+
+
 class TestDataToolController(unittest.TestCase):
 
     def setUp(self):
-        self.app = QApplication(sys.argv)
+        self.app = QApplication.instance() or QApplication(sys.argv)
         self.content_ctrl_mock = ContentCtrlMock()
         features.allowReplace = True
         features.Provide(ContentController.name, self.content_ctrl_mock)
@@ -66,6 +78,7 @@ class TestDataToolController(unittest.TestCase):
 
         apply_button = self.tool._tool_ui.button_box.button(QtWidgets.QDialogButtonBox.Apply)
         QTest.mouseClick(apply_button, QtCore.Qt.LeftButton)
+        waitFor(lambda: self.tool.modifyData.called)
         self.tool.modifyData.assert_called_once()
 
     def test_close(self):
@@ -99,9 +112,75 @@ class TestDataToolController(unittest.TestCase):
         self.assertFalse(view.isEnabled())
 
 
+def _scale(data, factor=1):
+    return data * factor
+
+
+def _scaleInPlace(data, factor=1):
+    data *= factor
+    return data
+
+
+class TestProcessSafeTool(unittest.TestCase):
+
+    def setUp(self):
+        self.app = QApplication.instance() or QApplication(sys.argv)
+        features.allowReplace = True
+        features.Provide(ContentController.name, ContentCtrlMock())
+
+        class TestScaleTool(DataToolController):
+            process_safe = True
+            setupContent = Mock()
+            onDataChanged = Mock()
+            getParameters = Mock(return_value={"factor": 3})
+            processData = staticmethod(_scale)
+
+            @property
+            def item_config(self) -> ItemConfig:
+                return ItemConfig()
+
+        self.tool = TestScaleTool()
+
+    def test_thread(self):
+        result = self.tool._apply(ArrayModel(np.arange(4)), {"factor": 2})
+        np.testing.assert_array_equal([0, 2, 4, 6], result.data)
+
+    def test_process(self):
+        self.tool.use_process_pool = True
+        model = ArrayModel(np.arange(4))
+        result = self.tool._apply(model, {"factor": 2})
+        np.testing.assert_array_equal([0, 2, 4, 6], result.data)
+        np.testing.assert_array_equal([0, 1, 2, 3], model.data)
+
+    def test_modify(self):
+        result = self.tool.modifyData(ArrayModel(np.arange(4)))
+        np.testing.assert_array_equal([0, 3, 6, 9], result.data)
+
+    def test_read_only(self):
+        # the data is shared with the displayed model in both backends
+        self.tool.processData = _scaleInPlace
+        model = ArrayModel(np.arange(4))
+        for use_process_pool in [False, True]:
+            self.tool.use_process_pool = use_process_pool
+            result = self.tool._apply(model, {"factor": 2})
+            self.assertIsInstance(result, ValueError)
+            np.testing.assert_array_equal([0, 1, 2, 3], model.data)
+
+    def test_legacy_in_place(self):
+        def modifyData(data_model):
+            data_model.data *= 2
+            return data_model
+
+        self.tool.modifyData = modifyData
+        model = ArrayModel(np.arange(4))
+        result = self.tool._apply(model)
+        np.testing.assert_array_equal([0, 2, 4, 6], result.data)
+        np.testing.assert_array_equal([0, 1, 2, 3], model.data)
+
+
 class TestDataActionController(unittest.TestCase):
     def setUp(self):
-        self.app = QApplication(sys.argv)
+        self.app = QApplication.instance() or QApplication(sys.argv)
         self.content_ctrl_mock = ContentCtrlMock()
         features.allowReplace = True
         features.Provide(ContentController.name, self.content_ctrl_mock)
@@ -117,12 +196,13 @@ class TestDataActionController(unittest.TestCase):
 
     def test_action(self):
         self.action.onAction()
+        waitFor(lambda: self.action.modifyData.called)
         self.action.modifyData.assert_called_once()
 
 
 class TestToolbarController(unittest.TestCase):
     def setUp(self):
-        self.app = QApplication(sys.argv)
+        self.app = QApplication.instance() or QApplication(sys.argv)
         self.content_ctrl_mock = ContentCtrlMock()
         features.allowReplace = True
         features.Provide(ContentController.name, self.content_ctrl_mock)
@@ -154,7 +234,7 @@ class TestToolbarController(unittest.TestCase):
 
 class TestViewerToolController(unittest.TestCase):
     def setUp(self):
-        self.app = QApplication(sys.argv)
+        self.app = QApplication.instance() or QApplication(sys.argv)
         self.content_ctrl_mock = ContentCtrlMock()
         self.connection_ctrl_mock = ConnectionCtrlMock()
         features.allowReplace = True
@@ -1,15 +1,24 @@
 import unittest
 from typing import List
 
+import mock
 from mock import Mock
 
-from solarviewer.config.ioc import features, RequiredFeature, HasAttributes, HasMethods, MatchingFeatures, IsInstanceOf
+from solarviewer.config.ioc import features, RequiredFeature, HasAttributes, HasMethods, MatchingFeatures, \
+    IsInstanceOf, MatchingFeatureTypes, IsSubclassOf, FeatureBroker
 
 
 class Object:
     test = Mock()
 
 
+class LazyObject:
+    instances = 0
+
+    def __init__(self):
+        LazyObject.instances += 1
+
+
 class TestIoC(unittest.TestCase):
     feature: Object = RequiredFeature("TEST1")
     method: Object = RequiredFeature("TEST2", HasMethods("required_method"))
@@ -18,6 +27,8 @@ class TestIoC(unittest.TestCase):
     features.Provide("1", "1")
     features.Provide("2", "2")
     features.Provide("3", "3")
+    features.ProvideLazy("LAZY", LazyObject)
+    lazy_types: List[type] = MatchingFeatureTypes(IsSubclassOf(LazyObject))
     features: List[str] = MatchingFeatures(IsInstanceOf(str))
 
     def test_provide(self):
@@ -47,3 +58,45 @@ class TestIoC(unittest.TestCase):
 
     def test_matching(self):
         self.assertEqual(["1", "2", "3"], self.features)
+
+    def test_lazy(self):
+        broker = FeatureBroker()
+        broker.ProvideLazy("LAZY", LazyObject)
+        instances = LazyObject.instances
+
+        self.assertEqual(instances, LazyObject.instances)
+        lazy = broker["LAZY"]
+        self.assertIsInstance(lazy, LazyObject)
+        self.assertIs(lazy, broker["LAZY"])
+        self.assertEqual(instances + 1, LazyObject.instances)
+
+    def test_matching_types(self):
+        self.assertEqual([LazyObject], self.lazy_types)
+
+    def test_type_index(self):
+        broker = FeatureBroker(allowReplace=True)
+        broker.Provide("A", "a")
+        broker.ProvideLazy("B", LazyObject)
+        broker.Provide("C", 1)
+
+        self.assertEqual(["A"], broker.FeaturesOfType(str))
+        self.assertEqual(["B"], broker.FeaturesOfType(LazyObject))
+        self.assertEqual(["A", "B", "C"], broker.FeaturesOfType(object))
+
+        broker.Provide("A", 2)
+        self.assertEqual([], broker.FeaturesOfType(str))
+        self.assertEqual(["A", "C"], broker.FeaturesOfType(int))
+
+    def test_indexed_request(self):
+        broker = FeatureBroker()
+        for i in range(20):
+            base = LazyObject if i % 2 == 0 else Object
+            plugin = type("Plugin{}".format(i), (base,), {})
+            broker.ProvideLazy(plugin.__name__, plugin)
+            broker.Provide("setting{}".format(i), str(i))
+
+        with mock.patch("solarviewer.config.ioc.features", broker):
+            indexed = list(MatchingFeatures(IsInstanceOf(LazyObject)).Request())
+        scanned = [obj for obj in broker if isinstance(obj, LazyObject)]
+        self.assertEqual(10, len(indexed))
+        self.assertEqual(scanned, indexed)
@@ -0,0 +1,32 @@
+import os
+import tempfile
+import unittest
+
+from mock import patch
+
+from solarviewer.config import plugins
+
+
+class TestPlugins(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = os.path.join(tempfile.mkdtemp(), "plugins.json")
+
+    def test_cached(self):
+        with patch.object(plugins, "scanPlugins", return_value=["plugin"]) as scan:
+            self.assertEqual(["plugin"], plugins.discoverPlugins(cache=self.cache))
+            self.assertEqual(["plugin"], plugins.discoverPlugins(cache=self.cache))
+            scan.assert_called_once()
+
+    def test_rescan(self):
+        with patch.object(plugins, "scanPlugins", return_value=["plugin"]) as scan:
+            plugins.discoverPlugins(cache=self.cache)
+            plugins.discoverPlugins(rescan=True, cache=self.cache)
+            self.assertEqual(2, scan.call_count)
+
+    def test_environment_changed(self):
+        with patch.object(plugins, "scanPlugins", return_value=["plugin"]) as scan:
+            plugins.discoverPlugins(cache=self.cache)
+            with patch.object(plugins, "environmentKey", return_value="changed"):
+                plugins.discoverPlugins(cache=self.cache)
+            self.assertEqual(2, scan.call_count)
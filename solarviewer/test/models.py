@@ -0,0 +1,13 @@
+from solarviewer.config.base import DataModel
+
+
+class ArrayModel(DataModel):
+    """Data model of the tests. The array is shared between copies, the settings are copied."""
+    shared_attributes = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+        self.settings = {"vmin": 0}
+
+    def setData(self, data):
+        self.data = data
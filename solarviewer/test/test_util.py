@@ -0,0 +1,201 @@
+import time
+import unittest
+from abc import ABC, abstractmethod
+from threading import Event, Thread
+from unittest import mock
+
+import numpy as np
+
+from solarviewer.util import TaskExecutor, Priority, CancellationToken, _Task, executeInProcess, classproperty, \
+    NotifyingEvent
+
+
+class TestTaskExecutor(unittest.TestCase):
+    def setUp(self):
+        self.executor = TaskExecutor(max_workers=2)
+
+    def _waitFor(self, condition, timeout=5):
+        end = time.time() + timeout
+        while not condition() and time.time() < end:
+            time.sleep(0.005)
+        self.assertTrue(condition())
+
+    def _submit(self, execution, args=[], priority=Priority.DEFAULT, token=None):
+        task = _Task(execution, args, token)
+        self.executor.submit(task, priority)
+        return task
+
+    def test_bounded(self):
+        block = Event()
+        for i in range(10):
+            self._submit(block.wait)
+        self._waitFor(lambda: self.executor.metrics()["running"] == 2)
+        metrics = self.executor.metrics()
+        self.assertEqual(2, metrics["workers"])
+        self.assertEqual(8, metrics["queued"])
+
+        block.set()
+        self._waitFor(lambda: self.executor.metrics()["completed"] == 10)
+
+    def test_priority(self):
+        block = Event()
+        order = []
+        self._submit(block.wait, priority=Priority.RENDER)
+        self._submit(block.wait, priority=Priority.RENDER)
+        self._waitFor(lambda: self.executor.metrics()["running"] == 2)
+
+        self._submit(order.append, ["background"], Priority.BACKGROUND)
+        self._submit(order.append, ["default"], Priority.DEFAULT)
+        self._submit(order.append, ["render"], Priority.RENDER)
+        self.assertEqual(1, self.executor.metrics()["queued_background"])
+
+        block.set()
+        self._waitFor(lambda: self.executor.metrics()["completed"] == 5)
+        self.assertEqual(["render", "default", "background"], order)
+
+    def test_background_limit(self):
+        block = Event()
+        self._submit(block.wait, priority=Priority.BACKGROUND)
+        self._submit(block.wait, priority=Priority.BACKGROUND)
+        self._waitFor(lambda: self.executor.metrics()["running"] == 1)
+
+        # one worker stays available for ui tasks
+        done = Event()
+        self._submit(done.set, priority=Priority.RENDER)
+        self.assertTrue(done.wait(5))
+        self.assertEqual(1, self.executor.metrics()["queued_background"])
+
+        block.set()
+        self._waitFor(lambda: self.executor.metrics()["completed"] == 3)
+
+    def test_cancel(self):
+        block = Event()
+        executed = []
+        self._submit(block.wait)
+        self._submit(block.wait)
+        token = CancellationToken()
+        self._submit(executed.append, [1], token=token)
+        token.cancel()
+
+        block.set()
+        self._waitFor(lambda: self.executor.metrics()["cancelled"] == 1)
+        self.assertEqual([], executed)
+
+    def test_error(self):
+        self._submit(lambda: 1 / 0)
+        self._waitFor(lambda: self.executor.metrics()["failed"] == 1)
+
+    def test_wait(self):
+        event = Event()
+        executed = Event()
+        for i in range(10):
+            self.executor.submitWhen(event, _Task(lambda: None, []))
+        self.executor.submitWhen(event, _Task(executed.set, []))
+        self.assertEqual(11, self.executor.metrics()["waiting"])
+
+        # waiting tasks do not occupy the workers
+        done = Event()
+        self._submit(done.set)
+        self.assertTrue(done.wait(5))
+        self.assertFalse(executed.is_set())
+
+        event.set()
+        self.assertTrue(executed.wait(5))
+        self._waitFor(lambda: self.executor.metrics()["waiting"] == 0)
+
+    def test_submit_returns(self):
+        done = Event()
+        self._submit(done.set)
+        self.assertTrue(done.wait(5))
+        self._waitFor(lambda: self.executor.metrics()["idle"] == 1)
+
+        # the idle worker is notified, submit does not wait until it picked up the task
+        executed = Event()
+        with mock.patch.object(self.executor._condition, "notify"):
+            submit = Thread(target=self._submit, args=(executed.set,))
+            submit.start()
+            submit.join(5)
+            self.assertFalse(submit.is_alive())
+        self.assertEqual(1, self.executor.metrics()["queued"])
+
+        with self.executor._condition:
+            self.executor._condition.notify()
+        self.assertTrue(executed.wait(5))
+
+    def test_wait_notifying(self):
+        self.executor.poll_interval = 3600  # the monitor is woken up by the event
+        event = NotifyingEvent()
+        executed = Event()
+        self.executor.submitWhen(event, _Task(executed.set, []))
+        self._waitFor(lambda: self.executor.metrics()["waiting"] == 1)
+        self.assertFalse(executed.wait(0.05))
+
+        event.set()
+        self.assertTrue(executed.wait(5))
+
+        # set and cleared (e.g., by the next render) before the monitor checked the event
+        executed.clear()
+        event.clear()
+        self.executor.submitWhen(event, _Task(executed.set, []))
+        event.set()
+        event.clear()
+        self.assertTrue(executed.wait(5))
+        self.assertEqual(0, self.executor.metrics()["waiting"])
+
+
+def _negate(data):
+    return np.negative(data)
+
+
+def _negateInPlace(data):
+    np.negative(data, out=data)
+    return data
+
+
+def _sumRows(data, scale=1):
+    return data.sum(axis=0) * scale
+
+
+class TestExecuteInProcess(unittest.TestCase):
+
+    def test_same_shape(self):
+        data = np.arange(12, dtype=np.float32).reshape(3, 4)
+        result = executeInProcess(_negate, data)
+        np.testing.assert_array_equal(-data, result)
+        self.assertEqual(np.float32, result.dtype)
+
+    def test_read_only(self):
+        data = np.arange(12, dtype=np.float32).reshape(3, 4)
+        with self.assertRaises(ValueError):
+            executeInProcess(_negateInPlace, data)
+
+    def test_new_array(self):
+        data = np.arange(12).reshape(3, 4)
+        result = executeInProcess(_sumRows, data, {"scale": 2})
+        np.testing.assert_array_equal(data.sum(axis=0) * 2, result)
+
+    def test_error(self):
+        with self.assertRaises(TypeError):
+            executeInProcess(_sumRows, np.ones(4), {"unknown": 1})
+
+
+class TestClassProperty(unittest.TestCase):
+
+    def test_abstract(self):
+        class Base(ABC):
+            @classproperty
+            @abstractmethod
+            def config(cls):
+                pass
+
+        class Missing(Base):
+            pass
+
+        class Implemented(Base):
+            @classproperty
+            def config(cls):
+                return cls.__name__
+
+        self.assertRaises(TypeError, Missing)
+        self.assertEqual("Implemented", Implemented.config)
+        Implemented()
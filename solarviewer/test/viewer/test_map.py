@@ -0,0 +1,156 @@
+import os
+import sys
+import tempfile
+import unittest
+from copy import deepcopy
+from unittest import mock
+
+import matplotlib
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+from astropy import units as u
+from astropy.io import fits
+from matplotlib import colors
+from sunpy.map import Map
+
+from solarviewer.viewer.map import openMapPreview, checkMemory, openMapRegion, MapViewer, MapModel
+
+
+class TestMapPreview(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.dir.name, "map.fits")
+        header = fits.Header({"CTYPE1": "HPLN-TAN", "CTYPE2": "HPLT-TAN", "CUNIT1": "arcsec", "CUNIT2": "arcsec",
+                              "CDELT1": 0.5, "CDELT2": 0.5, "CRPIX1": 512.5, "CRPIX2": 480.5, "CRVAL1": 10,
+                              "CRVAL2": -20, "DATE-OBS": "2020-01-01T00:00:00"})
+        self.data = np.random.rand(1000, 1024).astype(np.float32)
+        fits.writeto(self.file, self.data, header)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_preview(self):
+        preview = openMapPreview(self.file, 1000, 256)
+        s_map = Map(self.file)
+        self.assertEqual((250, 256), preview.data.shape)
+        np.testing.assert_array_equal(self.data[::4, ::4], preview.data)
+        for x, y in [(0, 0), (100, 37), (255, 249)]:
+            expected = s_map.pixel_to_world(x * 4 * u.pixel, y * 4 * u.pixel)
+            coord = preview.pixel_to_world(x * u.pixel, y * u.pixel)
+            self.assertAlmostEqual(expected.Tx.value, coord.Tx.value, 6)
+            self.assertAlmostEqual(expected.Ty.value, coord.Ty.value, 6)
+
+    def test_no_preview(self):
+        self.assertIsNone(openMapPreview(self.file, 1024 * 1024, 256))
+
+    def test_region(self):
+        region = openMapRegion(self.file, (100, 200), (611, 711))
+        s_map = Map(self.file)
+        self.assertEqual((512, 512), region.data.shape)
+        np.testing.assert_array_equal(self.data[200:712, 100:612], region.data)
+        expected = s_map.pixel_to_world(150 * u.pixel, 300 * u.pixel)
+        coord = region.pixel_to_world(50 * u.pixel, 100 * u.pixel)
+        self.assertAlmostEqual(expected.Tx.value, coord.Tx.value, 6)
+        self.assertAlmostEqual(expected.Ty.value, coord.Ty.value, 6)
+
+    def test_world_region(self):
+        region = openMapRegion(self.file, (0, -30), (20, -10), world=True)
+        bottom_left = region.pixel_to_world(0 * u.pixel, 0 * u.pixel)
+        top_right = region.pixel_to_world((region.data.shape[1] - 1) * u.pixel, (region.data.shape[0] - 1) * u.pixel)
+        self.assertLessEqual(bottom_left.Tx.value, 0)
+        self.assertLessEqual(bottom_left.Ty.value, -30)
+        self.assertGreaterEqual(top_right.Tx.value, 20)
+        self.assertGreaterEqual(top_right.Ty.value, -10)
+        self.assertLessEqual(region.data.shape[1], 43)
+
+    def test_memory(self):
+        with mock.patch("solarviewer.viewer.map.availableMemory", return_value=self.data.nbytes // 2):
+            self.assertRaises(MemoryError, checkMemory, self.file)
+        with mock.patch("solarviewer.viewer.map.availableMemory", return_value=self.data.nbytes * 2):
+            checkMemory(self.file)
+
+
+class TestMapViewer(unittest.TestCase):
+
+    def setUp(self):
+        self.app = QApplication.instance() or QApplication(sys.argv)
+        header = fits.Header({"CTYPE1": "HPLN-TAN", "CTYPE2": "HPLT-TAN", "CUNIT1": "arcsec", "CUNIT2": "arcsec",
+                              "CDELT1": 0.5, "CDELT2": 0.5, "CRPIX1": 1024.5, "CRPIX2": 1024.5,
+                              "DATE-OBS": "2020-01-01T00:00:00"})
+        self.data = np.random.rand(4096, 4096).astype(np.float32)
+        self.viewer = MapViewer()
+        self.viewer.figure.set_size_inches(4, 4)
+        self.model = MapModel(Map(self.data, header))
+        self.viewer.draw(self.model)
+        self.ax = self.viewer.figure.axes[0]
+        self.image = self.ax.get_images()[0]
+
+    def tearDown(self):
+        self.viewer.deleteLater()
+
+    def test_levels(self):
+        self.assertGreater(self.viewer.level, 0)
+        self.assertLess(self.image.get_array().shape[0], self.data.shape[0])
+        self.assertEqual((-0.5, 4095.5), self.ax.get_xlim())
+        self.assertEqual((float(self.data.min()), float(self.data.max())), (self.image.norm.vmin, self.image.norm.vmax))
+
+    def test_viewport(self):
+        self.ax.set_xlim(1000, 1100)
+        self.ax.set_ylim(2000, 2100)
+        self.app.processEvents()  # updated once both limits are set
+        self.assertEqual(0, self.viewer.level)
+        x0, x1, y0, y1 = self.viewer.window
+        self.assertTrue(x0 <= 1000 and x1 >= 1101 and y0 <= 2000 and y1 >= 2101)
+        np.testing.assert_array_equal(self.data[y0:y1, x0:x1], self.image.get_array())
+        self.assertEqual((x0 - 0.5, x1 - 0.5, y0 - 0.5, y1 - 0.5), tuple(self.image.get_extent()))
+
+        # panning within the margin keeps the image
+        array = self.image.get_array()
+        self.ax.set_xlim(1010, 1110)
+        self.app.processEvents()
+        self.assertIs(array, self.image.get_array())
+        self.ax.set_xlim(1500, 1600)
+        self.app.processEvents()
+        self.assertIsNot(array, self.image.get_array())
+        self.assertLessEqual(self.viewer.window[0], 1500)
+
+    def test_zoom_rectangle(self):
+        self.ax.set_xlim(-0.5, 4095.5)
+        self.ax.set_ylim(-0.5, 4095.5)
+        self.app.processEvents()
+        pyramid = self.viewer._level_image[1]
+        # rectangle zoom of the toolbar (the x limits are set before the y limits)
+        x0, y0 = self.ax.transData.transform((1000, 2000))
+        x1, y1 = self.ax.transData.transform((1100, 2100))
+        with mock.patch.object(pyramid, "getLevel", wraps=pyramid.getLevel) as get_level:
+            self.ax._set_view_from_bbox((x0, y0, x1, y1))
+            self.app.processEvents()
+        get_level.assert_called_once()
+        self.assertEqual(0, self.viewer.level)
+        x_lim, y_lim = self.ax.get_xlim(), self.ax.get_ylim()
+        x0, x1, y0, y1 = self.viewer.window
+        self.assertTrue(x0 <= x_lim[0] and x1 >= x_lim[1] and y0 <= y_lim[0] and y1 >= y_lim[1])
+        self.assertLess(y1 - y0, 2 * (y_lim[1] - y_lim[0]) + 2)
+        np.testing.assert_array_equal(self.data[y0:y1, x0:x1], self.image.get_array())
+
+    def test_display_change(self):
+        self.viewer._model = self.model  # rendered
+        self.viewer.rendered.set()
+        model = deepcopy(self.model)
+        model.setCMap(matplotlib.colormaps["viridis"])
+        model.norm = colors.LogNorm(vmin=0.1)
+        with mock.patch.object(self.viewer, "redraw") as redraw:
+            self.viewer.updateModel(model)
+            redraw.assert_not_called()
+        self.assertEqual([self.image], self.ax.get_images())
+        self.assertEqual("viridis", self.image.cmap.name)
+        self.assertIsInstance(self.image.norm, colors.LogNorm)
+        self.assertEqual((0.1, float(self.data.max())), (self.image.norm.vmin, self.image.norm.vmax))
+        self.assertIsNone(model.norm.vmax)
+
+        model = deepcopy(model)
+        model.setData(self.data * 2)
+        with mock.patch.object(self.viewer, "redraw") as redraw:
+            self.viewer.updateModel(model)
+            redraw.assert_called_once()
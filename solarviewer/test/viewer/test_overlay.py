@@ -0,0 +1,75 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+from astropy import units as u
+from astropy.io import fits
+from matplotlib import pyplot as plt
+from sunpy.map import GenericMap, Map
+
+from solarviewer.viewer import overlay
+from solarviewer.viewer.overlay import drawContours, drawGrid, drawLimb
+
+
+class TestOverlay(unittest.TestCase):
+
+    def setUp(self):
+        header = fits.Header({"CTYPE1": "HPLN-TAN", "CTYPE2": "HPLT-TAN", "CUNIT1": "arcsec", "CUNIT2": "arcsec",
+                              "CDELT1": 10, "CDELT2": 10, "CRPIX1": 128.5, "CRPIX2": 128.5, "CRVAL1": 0,
+                              "CRVAL2": 0, "DATE-OBS": "2020-01-01T00:00:00", "DSUN_OBS": 1.496e11,
+                              "HGLN_OBS": 0, "HGLT_OBS": 3})
+        y, x = np.mgrid[:256, :256]
+        self.map = Map(np.exp(-((x - 128.) ** 2 + (y - 100.) ** 2) / 2000), header)
+        overlay._geometry.clear()
+
+    def tearDown(self):
+        plt.close("all")
+
+    def _axes(self):
+        ax = plt.figure().add_subplot(111, projection=self.map)
+        ax.set_xlim(-0.5, 255.5)
+        ax.set_ylim(-0.5, 255.5)
+        return ax
+
+    def test_contours(self):
+        expected = drawContours(self.map, [50, 10], self._axes())
+        with mock.patch.object(GenericMap, "draw_contours") as draw_contours:
+            contours = drawContours(self.map, [10, 50], self._axes())
+            draw_contours.assert_not_called()
+        np.testing.assert_array_equal(expected.levels, contours.levels)
+        self.assertEqual([len(s) for s in expected.allsegs], [len(s) for s in contours.allsegs])
+        for segments, cached_segments in zip(expected.allsegs, contours.allsegs):
+            for s, c in zip(segments, cached_segments):
+                np.testing.assert_array_equal(s, c)
+        np.testing.assert_array_equal(expected.to_rgba(expected.levels), contours.to_rgba(contours.levels))
+        # new data
+        self.map = Map(self.map.data * 2, self.map.meta)
+        with mock.patch.object(GenericMap, "draw_contours") as draw_contours:
+            drawContours(self.map, [10, 50], self._axes())
+            draw_contours.assert_called_once()
+
+    def test_limb(self):
+        ax = self._axes()
+        limb = drawLimb(self.map, ax)
+        self.assertEqual(limb, ax.patches[:])
+        vertices = limb[0].get_xy()
+        radius = np.hypot(vertices[:, 0] - 127.5, vertices[:, 1] - 127.5)
+        expected = self.map.rsun_obs.to_value(u.arcsec) / 10
+        np.testing.assert_allclose(expected, radius, rtol=1e-2)
+        with mock.patch.object(GenericMap, "draw_limb") as draw_limb:
+            np.testing.assert_array_equal(vertices, drawLimb(self.map, self._axes())[0].get_xy())
+            draw_limb.assert_not_called()
+
+    def test_grid(self):
+        ax = self._axes()
+        drawGrid(self.map, ax, 30 * u.deg)
+        lines = ax.collections[-1].get_segments()
+        self.assertEqual(12 + 5, len(lines))
+        # central meridian on the visible side, the opposite meridian hidden at the equator
+        self.assertTrue(np.all(np.isnan(lines[0][60:121])))
+        meridian = lines[6][~np.isnan(lines[6][:, 0])]
+        np.testing.assert_allclose(127.5, meridian[:, 0], atol=0.5)
+        self.assertTrue(np.all(np.hypot(*(meridian - 127.5).T) <= self.map.rsun_obs.to_value(u.arcsec) / 10))
+        with mock.patch.object(overlay, "_gridLines") as grid_lines:
+            drawGrid(self.map, self._axes(), 30 * u.deg)
+            grid_lines.assert_not_called()
@@ -0,0 +1,86 @@
+import unittest
+
+import numpy as np
+
+from solarviewer.viewer import pyramid as pyramid_module
+from solarviewer.viewer.pyramid import ImagePyramid, getPyramid
+
+
+class TestImagePyramid(unittest.TestCase):
+
+    def setUp(self):
+        self.data = np.random.randint(0, 1000, (130, 257)).astype(np.int16)
+
+    def test_levels(self):
+        pyramid = ImagePyramid(self.data)
+        self.assertIs(self.data, pyramid.getLevel(0))
+        level = pyramid.getLevel(2)
+        self.assertEqual((32, 64), level.shape)
+        self.assertEqual(np.float32, level.dtype)
+        np.testing.assert_allclose(self.data[:4, :4].mean(), level[0, 0], rtol=1e-6)
+        np.testing.assert_allclose(self.data[124:128, 252:256].mean(), level[-1, -1], rtol=1e-6)
+        # computed from level 2
+        np.testing.assert_allclose(self.data[:8, :8].mean(), pyramid.getLevel(3)[0, 0], rtol=1e-6)
+        self.assertEqual(6, pyramid.max_level)
+        self.assertEqual((2, 4), pyramid.getLevel(10).shape)
+
+    def test_strips(self):
+        strip_pixels = pyramid_module.strip_pixels
+        pyramid_module.strip_pixels = 100
+        try:
+            level = ImagePyramid(self.data).getLevel(1)
+        finally:
+            pyramid_module.strip_pixels = strip_pixels
+        expected = self.data[:130, :256].reshape(65, 2, 128, 2).mean(axis=(1, 3))
+        np.testing.assert_allclose(expected, level, rtol=1e-6)
+
+    def test_mask(self):
+        mask = np.zeros(self.data.shape, bool)
+        mask[:2, :2] = True
+        mask[2, 2] = True
+        data = self.data.astype(np.float32)
+        data[mask] = -1e6  # fill value
+        pyramid = ImagePyramid(data, mask)
+        level = pyramid.getLevel(1)
+        self.assertTrue(level.mask[0, 0])
+        self.assertFalse(level.mask[1, 1])
+        # only unmasked pixels are averaged
+        np.testing.assert_allclose(self.data[2:4, 2:4].ravel()[1:].mean(), level[1, 1], rtol=1e-6)
+        # computed from level 1, weighted by the unmasked pixels
+        expected = np.ma.array(self.data[:4, :4], mask=mask[:4, :4]).mean()
+        np.testing.assert_allclose(expected, pyramid.getLevel(2)[0, 0], rtol=1e-6)
+        self.assertFalse(np.ma.is_masked(pyramid.getLevel(2)[0, 0]))
+
+    def test_extent(self):
+        pyramid = ImagePyramid(self.data)
+        self.assertEqual((-0.5, 255.5, -0.5, 127.5), pyramid.getExtent(2, (0, 64, 0, 32)))
+        self.assertEqual((-0.5, 255.5, 127.5, -0.5), pyramid.getExtent(2, (0, 64, 0, 32), "upper"))
+        self.assertEqual((39.5, 79.5, 3.5, 11.5), pyramid.getExtent(2, (10, 20, 1, 3)))
+
+    def test_window(self):
+        pyramid = ImagePyramid(self.data)
+        self.assertEqual((10, 20, 1, 3), pyramid.getWindow(2, (39.5, 79.5), (11.5, 3.5)))
+        self.assertEqual((9, 21, 0, 4), pyramid.getWindow(2, (40, 79), (4, 11), margin=0.1))
+        self.assertEqual((0, 64, 0, 32), pyramid.getWindow(2, (-100, 1000), (-100, 1000)))
+        window = pyramid.getWindow(0, (10.5, 20.5), (5.5, 7.5))
+        np.testing.assert_array_equal(self.data[6:8, 11:21], pyramid.getLevel(0, window))
+
+    def test_select_level(self):
+        pyramid = ImagePyramid(np.zeros((8192, 8192)))
+        self.assertEqual(3, pyramid.selectLevel((8192, 8192), (800, 600)))
+        self.assertEqual(0, pyramid.selectLevel((1000, 1000), (800, 600)))
+        self.assertEqual(1, pyramid.selectLevel((2000, -1600), (800, 600)))
+        self.assertEqual(pyramid.max_level, pyramid.selectLevel((8192, 8192), (1, 1)))
+
+    def test_shared(self):
+        data = np.zeros((64, 64))
+        pyramid = getPyramid(data)
+        self.assertIs(pyramid, getPyramid(data))
+        self.assertIsNot(pyramid, getPyramid(data.copy()))
+        mask = np.zeros((64, 64), bool)
+        self.assertIs(mask, getPyramid(data, mask).mask)
+
+    def test_limits(self):
+        data = self.data.astype(np.float32)
+        data[0, 0] = np.nan
+        self.assertEqual((np.nanmin(data), np.nanmax(data)), ImagePyramid(data).getLimits())
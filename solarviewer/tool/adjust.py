@@ -4,10 +4,12 @@ from PyQt5.QtWidgets import QWidget
 from solarviewer.config.base import ItemConfig, ViewerType, DataType, DataModel
 from solarviewer.config.impl import DataToolController
 from solarviewer.ui.adjust import Ui_AdjustData
+from solarviewer.util import classproperty
 from solarviewer.viewer.map import MapModel
 
 
 class ValueAdjustmentController(DataToolController):
+    process_safe = True
 
     def setupContent(self, content_widget: QWidget):
         self._ui = Ui_AdjustData()
@@ -22,26 +24,36 @@ class ValueAdjustmentController(DataToolController):
         self._ui.range_min_spin.setValue(norm_vmin)
         self._ui.clip_spin.setRange(vmin, vmax)
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setTitle("Value Adjustment").setMenuPath("Tools/Adjust Data").addSupportedData(
             DataType.MAP).addSupportedViewer(ViewerType.ANY)
 
-    def modifyData(self, data_model: DataModel) -> DataModel:
-        d = data_model.data
+    def getParameters(self):
         if self._ui.clip_radio.isChecked():
-            limit = self._ui.clip_spin.value()
-            data_model.setData(d.clip(limit))
+            return {"mode": "clip", "limit": self._ui.clip_spin.value()}
         if self._ui.offset_radio.isChecked():
-            min_value = np.nanmin(d)
-            offset = self._ui.offset_spin.value()
-            data_model.setData(d - min_value + offset)
-            data_model.norm.vmin += offset - min_value
-            data_model.norm.vmax += offset - min_value
+            return {"mode": "offset", "offset": self._ui.offset_spin.value()}
         if self._ui.range_radio.isChecked():
-            vmin = self._ui.range_min_spin.value()
-            vmax = self._ui.range_max_spin.value()
-            data_model.setData(np.clip(d, vmin, vmax))
+            return {"mode": "range", "vmin": self._ui.range_min_spin.value(), "vmax": self._ui.range_max_spin.value()}
+        return {"mode": None}
+
+    @staticmethod
+    def processData(data, mode=None, limit=None, offset=0, vmin=None, vmax=None):
+        if mode == "clip":
+            return data.clip(limit)
+        if mode == "offset":
+            return data - np.nanmin(data) + offset
+        if mode == "range":
+            return np.clip(data, vmin, vmax)
+        return data
+
+    def applyData(self, data_model: DataModel, data, parameters) -> DataModel:
+        if parameters["mode"] == "offset":
+            shift = parameters["offset"] - np.nanmin(data_model.data)
+            data_model.norm.vmin += shift
+            data_model.norm.vmax += shift
+        data_model.setData(data)
 
         self._adjustNorm(data_model)
         return data_model
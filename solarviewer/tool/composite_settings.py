@@ -4,10 +4,12 @@ from PyQt5.QtWidgets import QWidget
 from solarviewer.config.base import ItemConfig, DataModel, DataType, ViewerType
 from solarviewer.config.impl import DataToolController
 from solarviewer.ui.composite_form import Ui_CompositeForm
+from solarviewer.util import classproperty
 from solarviewer.viewer.composite import CompositeMapModel
 
 
 class CompositeSettingsController(DataToolController):
+    copy_data = False  # only the display state is changed
 
     def __init__(self):
         DataToolController.__init__(self)
@@ -48,8 +50,8 @@ class CompositeSettingsController(DataToolController):
 
         return data_model
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setTitle("Composite Map Settings").setMenuPath(
             "View/Composite Map/Settings").addSupportedData(DataType.MAP_COMPOSITE).addSupportedViewer(ViewerType.ANY)
 
@@ -7,11 +7,12 @@ from solarviewer.app.plot import PlotWidget
 from solarviewer.config.base import ItemConfig, ViewerType, DataType, DataModel
 from solarviewer.config.impl import DataToolController
 from solarviewer.ui.contrast import Ui_Contrast
-from solarviewer.util import executeWaitTask
+from solarviewer.util import classproperty
 from solarviewer.viewer.map import MapModel, MapViewerController
 
 
 class ContrastController(DataToolController):
+    copy_data = False  # only the display state is changed
 
     def __init__(self):
         self._view: QtWidgets.QWidget = None
@@ -20,9 +21,10 @@ class ContrastController(DataToolController):
         self._model = ContrastModel()
 
         DataToolController.__init__(self)
+        self.content_ctrl.registerMemoryProvider("render", self._getHistogramBytes)
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setTitle("Contrast Adjustment").setMenuPath("Tools/Contrast").addSupportedViewer(
             ViewerType.MPL).addSupportedData(DataType.MAP)
 
@@ -74,6 +76,9 @@ class ContrastController(DataToolController):
 
         return data_model
 
+    def _getHistogramBytes(self, v_id):
+        return self._hist.render_nbytes if self._hist and v_id == self._v_id else 0
+
     def toggleHist(self):
         if self._hist:
             self._model.max_line.remove()
@@ -84,7 +89,7 @@ class ContrastController(DataToolController):
             self._hist = None
             return
         self._hist = _ContrastHist()
-        executeWaitTask(self._hist.rendered, self._drawLines)
+        self._hist.callAfterRender(self._drawLines)
         self._hist.updateModel(self._model)
 
         self._ui.histo_plot.layout().addWidget(self._hist)
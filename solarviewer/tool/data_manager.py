@@ -4,15 +4,17 @@ import sunpy
 from PyQt5 import QtWidgets, QtSql, QtCore
 from PyQt5.QtGui import QCursor
 from PyQt5.QtWidgets import QWidget, QMenu, QStyle
-from sunpy.database import Database
 
 from solarviewer.app.content import ContentController
 from solarviewer.config.base import ToolController, ItemConfig
 from solarviewer.config.ioc import RequiredFeature
 from solarviewer.ui.data_manager import Ui_DataManager
 from solarviewer.ui.data_manager_filter import Ui_DataManagerFilter
+from solarviewer.util import classproperty, lazyImport
 from solarviewer.viewer.map import MapViewerController
 
+database = lazyImport("sunpy.database")
+
 
 class DataManagerController(ToolController):
     content_ctrl: ContentController = RequiredFeature(ContentController.name)
@@ -45,7 +47,7 @@ class DataManagerController(ToolController):
         self._ui.refresh_button.clicked.connect(lambda x: self.model.select())
         self._ui.filter_button.clicked.connect(lambda x: self.onFilter())
 
-        self.sunpy_db = Database()
+        self.sunpy_db = database.Database()
         self.model = model
 
     def initTableHeader(self, model):
@@ -84,9 +86,7 @@ class DataManagerController(ToolController):
     def onOpen(self):
         rows = set([i.row() for i in self._ui.data_table.selectedIndexes()])
         paths = [self.model.index(row, self.model.fieldIndex("path")).data() for row in rows]
-        for path in paths:
-            viewer_ctrl = MapViewerController.fromFile(path)
-            self.content_ctrl.addViewerController(viewer_ctrl)
+        self.content_ctrl.openFiles(MapViewerController, paths)
 
     def onFilter(self):
         if self.dlg.exec_():
@@ -110,8 +110,8 @@ class DataManagerController(ToolController):
 
         menu.exec_(QCursor.pos())
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setMenuPath("File/Data Manager").setTitle("Data Manager")
 
     @property
@@ -4,7 +4,6 @@ from PyQt5 import QtWidgets, QtCore
 from PyQt5.QtCore import QDateTime
 from PyQt5.QtWidgets import QFrame
 from astropy import units as u
-from sunpy.net import attr, attrs
 
 from solarviewer.config.base import ToolController, ItemConfig
 from solarviewer.config.ioc import RequiredFeature
@@ -14,6 +13,10 @@ from solarviewer.ui.download import Ui_Download
 from solarviewer.ui.time_range import Ui_TimeRange
 from solarviewer.ui.wave_range import Ui_WaveRange
 from solarviewer.ui.wave_select import Ui_WaveSelect
+from solarviewer.util import classproperty, lazyImport
+
+attr = lazyImport("sunpy.net.attr")
+attrs = lazyImport("sunpy.net.attrs")
 
 
 class DownloadController(ToolController):
@@ -79,8 +82,8 @@ class DownloadController(ToolController):
         self.refreshActiveFilters()
         filter_panel.deleteLater()
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setTitle("Download Tool").setMenuPath("File/Download Data")
 
     @property
@@ -1,14 +1,14 @@
 from PyQt5 import QtWidgets, QtCore
 from PyQt5.QtCore import QDateTime
-from sunpy.net import hek
-from sunpy.net.hek import HEKClient
-from sunpy.net.hek2vso import hek2vso
 
 from solarviewer.config.base import ToolController, ItemConfig
 from solarviewer.config.ioc import RequiredFeature
 from solarviewer.tool.download_result import DownloadResultController
 from solarviewer.ui.download_event import Ui_DownloadEvent
-from solarviewer.util import executeTask
+from solarviewer.util import executeTask, classproperty, lazyImport, Priority
+
+hek = lazyImport("sunpy.net.hek")
+hek2vso = lazyImport("sunpy.net.hek2vso.hek2vso")
 
 
 class EventController(ToolController):  #
@@ -16,7 +16,7 @@ class EventController(ToolController):  #
     result_ctrl: DownloadResultController = RequiredFeature(DownloadResultController.name)
 
     def __init__(self):
-        self.client = HEKClient()
+        self.client = hek.HEKClient()
 
         self.query_id = 0
 
@@ -40,8 +40,8 @@ class EventController(ToolController):  #
         self._ui.search_button.clicked.connect(self._onSearch)
         self._ui.query_button.clicked.connect(self._onQuery)
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setTitle("Event Download Tool").setMenuPath("File/HEK")
 
     @property
@@ -60,7 +60,7 @@ class EventController(ToolController):  #
             end = self._ui.to_date.dateTime().toString(QtCore.Qt.ISODate)
             event = self._ui.event_type.currentText()
             attrs = [hek.attrs.Time(start=start, end=end), hek.attrs.EventType(event)]
-            executeTask(self.client.search, attrs, self._onSearchResult)
+            executeTask(self.client.search, attrs, self._onSearchResult, priority=Priority.BACKGROUND)
         except Exception as ex:
             self._ui.message_label.setText("Invalid Query: " + str(ex))
             self._ui.message_box.show()
@@ -1,7 +1,5 @@
 import copy
-import gzip
 import os
-import shutil
 from datetime import datetime
 
 import sunpy
@@ -10,18 +8,21 @@ from PyQt5.QtCore import pyqtSignal
 from PyQt5.QtGui import QCursor
 from PyQt5.QtWidgets import QTableWidgetItem
 from dateutil import parser
-from sunpy.database import Database, tables
-from sunpy.net import Fido
 
 from solarviewer.app.app import AppController
 from solarviewer.app.content import ContentController
 from solarviewer.config.base import ToolController, ItemConfig
+from solarviewer.config.compression import decompressFile
 from solarviewer.config.ioc import RequiredFeature
 from solarviewer.ui.download_result import Ui_DownloadResult
 from solarviewer.ui.result_tab import Ui_ResultTab
-from solarviewer.util import executeTask
+from solarviewer.util import executeTask, classproperty, lazyImport, Priority
 from solarviewer.viewer.map import MapViewerController
 
+database = lazyImport("sunpy.database")
+tables = lazyImport("sunpy.database.tables")
+net = lazyImport("sunpy.net")
+
 columns = [
     ["", lambda item: item.fileid],
     ["Start Time", lambda item: _parseTime(item.time.start) if hasattr(item.time, "start") else "None"],
@@ -49,6 +50,7 @@ def _parseTime(item_time):
 
 class DownloadResultController(ToolController):
     queries = {}
+    keep_compressed = False  # keep downloaded .gz files, they are decompressed once when opened (see ArrayCache)
     app_ctrl: AppController = RequiredFeature(AppController.name)
     content_ctrl: ContentController = RequiredFeature(ContentController.name)
 
@@ -61,7 +63,7 @@ class DownloadResultController(ToolController):
         self._ui.tabs.tabCloseRequested.connect(self._onRemoveTab)
 
         os.makedirs(sunpy.config.get("general", "working_dir"), exist_ok=True)
-        self.database = Database()
+        self.database = database.Database()
 
         self.tabs = {}
         self.queries = {}
@@ -84,7 +86,7 @@ class DownloadResultController(ToolController):
         index = self._ui.tabs.addTab(tab, "Query " + str(self.query_id))
         self._ui.tabs.setCurrentIndex(index)
         # start query
-        executeTask(Fido.search, attrs, self._onQueryResult, [self.query_id])
+        executeTask(net.Fido.search, attrs, self._onQueryResult, [self.query_id], priority=Priority.BACKGROUND)
         # register events
         tab.download.connect(lambda f_id, q_id=self.query_id: self.download(q_id, f_id))
         tab.open.connect(lambda f_id: self._onOpen(f_id))
@@ -105,29 +107,26 @@ class DownloadResultController(ToolController):
             resp[:] = [item for item in resp if item.fileid == f_id]
 
         self._addLoading([f_id])
-        executeTask(lambda x: Fido.fetch(x, progress=False), [req], self._onDownloadResult, [f_id, req])
+        executeTask(lambda x: net.Fido.fetch(x, progress=False), [req], self._onDownloadResult, [f_id, req],
+                    priority=Priority.BACKGROUND)
 
     def _onDownloadResult(self, paths, f_id, request):
-        path = self._unzipResult(paths[0])
+        path = paths[0]
+        if path.endswith(".gz") and not self.keep_compressed:
+            # streamed on a worker, downloads that finish together are decompressed in parallel
+            executeTask(decompressFile, [path], self._onDownloaded, [f_id, request], priority=Priority.BACKGROUND)
+            return
+        self._onDownloaded(path, f_id, request)
+
+    def _onDownloaded(self, path, f_id, request):
         entry = list(tables.entries_from_fido_search_result(request, self.database.default_waveunit))[0]
         entry.path = path
         self.database.add(entry)
         self.database.commit()
         self._addLoaded({f_id: path})
 
-    def _unzipResult(self, path: str):
-        if path.endswith(".gz"):
-            with gzip.open(path, 'rb') as f_in:
-                unzip_path = path.replace(".gz", ".fits")
-                with open(unzip_path, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
-            os.remove(path)
-            return unzip_path
-        return path
-
     def _onOpen(self, f_id):
-        viewer = MapViewerController.fromFile(self.loaded[f_id])
-        self.content_ctrl.addViewerController(viewer)
+        self.content_ctrl.openFiles(MapViewerController, [self.loaded[f_id]])
 
     def _onRemoveTab(self, index):
         tab = self._ui.tabs.widget(index)
@@ -145,10 +144,9 @@ class DownloadResultController(ToolController):
     def _onOpenSelected(self):
         tab = self._ui.tabs.currentWidget()
         f_ids = tab.getSelectedFIds()
-        for f_id in f_ids:
-            if f_id not in self.loaded:
-                continue
-            self._onOpen(f_id)
+        paths = [self.loaded[f_id] for f_id in f_ids if f_id in self.loaded]
+        if paths:
+            self.content_ctrl.openFiles(MapViewerController, paths)
 
     def _convertQuery(self, query):
         # fix fileid
@@ -169,8 +167,8 @@ class DownloadResultController(ToolController):
         for tab in self.tabs.values():
             tab.setLoaded(dict.keys())
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setTitle("Download Results").setOrientation(QtCore.Qt.BottomDockWidgetArea)
 
     @property
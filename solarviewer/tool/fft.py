@@ -4,12 +4,14 @@ from PyQt5.QtWidgets import QWidget
 from solarviewer.config.base import ItemConfig, ViewerType, DataType
 from solarviewer.config.impl import DataToolController
 from solarviewer.ui.fft import Ui_FFT
+from solarviewer.util import classproperty
 
 
 class FFTController(DataToolController):
+    process_safe = True
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setTitle("FFT").setMenuPath("Tools/FFT").addSupportedData(
             DataType.PLAIN_2D).addSupportedData(DataType.MAP).addSupportedViewer(
             ViewerType.ANY)
@@ -22,59 +24,60 @@ class FFTController(DataToolController):
         # no action needed
         pass
 
-    def modifyData(self, data_model):
-        data = data_model.data
+    def getParameters(self):
+        return {"highpass": self._ui.highpass_check.isChecked(), "lowpass": self._ui.lowpass_check.isChecked(),
+                "highpass_percent": self._ui.highpass_spin.value(), "lowpass_percent": self._ui.lowpass_spin.value(),
+                "butterworth": self._ui.butter_radio.isChecked(), "order": self._ui.butter_order_spin.value()}
 
+    @staticmethod
+    def processData(data, highpass=False, lowpass=False, highpass_percent=0, lowpass_percent=0, butterworth=True,
+                    order=1):
         # calculate radius
         shape = data.shape
         r = np.sqrt((shape[0] / 2) ** 2 + (shape[1] / 2) ** 2)
 
         # calculate cut off frequencies
-        h_val = self._ui.highpass_spin.value() / 100 * r
-        l_val = self._ui.lowpass_spin.value() / 100 * r
-
-        # determine check box status
-        highpass = self._ui.highpass_check.isChecked()
-        lowpass = self._ui.lowpass_check.isChecked()
+        h_val = highpass_percent / 100 * r
+        l_val = lowpass_percent / 100 * r
 
         # create filter
-        if self._ui.butter_radio.isChecked():
-            order = self._ui.butter_order_spin.value()
-            filt = self._createButterworthFilter(h_val, highpass, l_val, lowpass, shape, order)
-        else:
-            filt = self._createIdealFilter(h_val, highpass, l_val, lowpass, shape)
-
-        # filter and set data
-        data = self._filterMap(filt, data)
-        data_model.setData(data)
-        return data_model
-
-    def _filterMap(self, filt, data):
-        np.nan_to_num(data, copy=False)
-        fft = np.fft.fftshift(np.fft.fft2(data))
-        filtered_fft = fft * filt
-        back_transformed = np.abs(np.fft.ifft2(np.fft.ifftshift(filtered_fft)))
-        return back_transformed
-
-    def _createButterworthFilter(self, h_val, highpass, l_val, lowpass, shape, order):
-        if highpass and lowpass:
-            filt = butter2d_bp(shape, l_val, h_val, order)
-        else:
-            if highpass:
-                filt = butter2d_hp(shape, h_val, order)
-            if lowpass:
-                filt = butter2d_lp(shape, l_val, order)
-        return filt
-
-    def _createIdealFilter(self, h_val, highpass, l_val, lowpass, shape):
-        if highpass and lowpass:
-            filt = ideal2d_bp(shape, l_val, h_val)
+        if butterworth:
+            filt = _createButterworthFilter(h_val, highpass, l_val, lowpass, shape, order)
         else:
-            if highpass:
-                filt = ideal2d_hp(shape, h_val)
-            if lowpass:
-                filt = ideal2d_lp(shape, l_val)
-        return filt
+            filt = _createIdealFilter(h_val, highpass, l_val, lowpass, shape)
+
+        # filter data
+        return _filterMap(filt, data)
+
+
+def _filterMap(filt, data):
+    data = np.nan_to_num(data)
+    fft = np.fft.fftshift(np.fft.fft2(data))
+    filtered_fft = fft * filt
+    back_transformed = np.abs(np.fft.ifft2(np.fft.ifftshift(filtered_fft)))
+    return back_transformed
+
+
+def _createButterworthFilter(h_val, highpass, l_val, lowpass, shape, order):
+    if highpass and lowpass:
+        filt = butter2d_bp(shape, l_val, h_val, order)
+    else:
+        if highpass:
+            filt = butter2d_hp(shape, h_val, order)
+        if lowpass:
+            filt = butter2d_lp(shape, l_val, order)
+    return filt
+
+
+def _createIdealFilter(h_val, highpass, l_val, lowpass, shape):
+    if highpass and lowpass:
+        filt = ideal2d_bp(shape, l_val, h_val)
+    else:
+        if highpass:
+            filt = ideal2d_hp(shape, h_val)
+        if lowpass:
+            filt = ideal2d_lp(shape, l_val)
+    return filt
 
 
 def butter2d_lp(shape, f, n=2, pxd=1):
@@ -8,12 +8,13 @@ from solarviewer.app.plot import PlotWidget
 from solarviewer.config.base import ViewerController, ItemConfig, DataType, ViewerType
 from solarviewer.config.impl import ViewerToolController
 from solarviewer.ui.profile import Ui_Profile
+from solarviewer.util import classproperty
 
 
 class ProfileController(ViewerToolController):
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setTitle("Profile").setMenuPath("Tools/Profile").addSupportedData(
             DataType.MAP).addSupportedViewer(ViewerType.MPL)
 
@@ -30,6 +31,7 @@ class ProfileController(ViewerToolController):
 
     def connect(self, viewer_ctrl: ViewerController):
         self.model.figure = viewer_ctrl.view.figure
+        self.model.overlay = viewer_ctrl.view.overlay
         self.model.connection_id = viewer_ctrl.view.figure.canvas.mpl_connect('button_press_event', self.onFigureClick)
         self.cursor = Cursor(self.model.getAxes(), useblit=True, horizOn=False, vertOn=False)
         self.onModeChange(self.model.mode)
@@ -48,10 +50,8 @@ class ProfileController(ViewerToolController):
     def _removeLine(self, refresh=True):
         if self.model.line is None:
             return
-        self.model.line.remove()
+        self.model.overlay.removeArtists([self.model.line], refresh)
         self.model.line = None
-        if refresh:
-            self.model.getCanvas().draw()
 
     def _removeProfile(self):
         if self.model.profile is None:
@@ -92,7 +92,7 @@ class ProfileController(ViewerToolController):
         x_ax, y_ax = np.transpose(self.model.points)
         self._removeLine(False)
         self.model.line = self.model.getAxes().plot(x_ax, y_ax, "-o", color="r")[0]
-        self.model.getCanvas().draw()
+        self.model.overlay.addArtists([self.model.line])
 
     def _extractCoordinates(self, sotMap, event):
         x = int(np.rint(event.xdata))
@@ -11,6 +11,7 @@ from matplotlib.widgets import Cursor
 from solarviewer.config.base import ItemConfig, ViewerController, DataType, ViewerType
 from solarviewer.config.impl import ViewerToolController
 from solarviewer.ui.selection import Ui_Selection
+from solarviewer.util import classproperty
 
 
 class SelectionModel:
@@ -29,6 +30,9 @@ class SelectionModel:
     def getAxes(self):
         return self.view.figure.axes[0]
 
+    def getOverlay(self):
+        return self.view.overlay
+
     def getMarkerColour(self):
         return (self.marker_colour.red() / 255, self.marker_colour.green() / 255, self.marker_colour.blue() / 255)
 
@@ -77,8 +81,8 @@ class SelectionController(ViewerToolController):
         self._removeCursor()
         self.onClear()
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setTitle("Highlight Values").setMenuPath("Tools/Highlight Values").addSupportedData(
             DataType.MAP).addSupportedViewer(ViewerType.MPL)
 
@@ -102,15 +106,10 @@ class SelectionController(ViewerToolController):
 
     def onClear(self):
         self.model.points.clear()
-        for point in self.model.fig_points:
-            try:
-                point.remove()
-            except:
-                pass  # points are already removed
+        if self.model.isEnabled():
+            self.model.getOverlay().removeArtists(self.model.fig_points)
         self.model.fig_points = []
         self.table.setRowCount(0)
-        if self.model.isEnabled():
-            self.model.getCanvas().draw()
 
     def onExport(self, evt):
         path, _ = QFileDialog.getSaveFileName(None, filter="CSV files (*.csv);;Text files (*.txt)")
@@ -149,20 +148,20 @@ class SelectionController(ViewerToolController):
         self.cursor = Cursor(ax, useblit=True, horizOn=True, vertOn=True)
 
     def _drawPoint(self, x, y, i, refresh=True):
-        self.model.fig_points.append(self.model.getAxes().scatter(x, y, color=self.model.getMarkerColour()))
-        self.model.fig_points.append(self.model.getAxes().annotate(i + 1, (x, y), color=self.model.getTextColour()))
-        if refresh:
-            self.model.getCanvas().draw()
+        # markers are blitted over the map, the map is not redrawn
+        artists = [self.model.getAxes().scatter(x, y, color=self.model.getMarkerColour()),
+                   self.model.getAxes().annotate(i + 1, (x, y), color=self.model.getTextColour())]
+        self.model.fig_points.extend(artists)
+        self.model.getOverlay().addArtists(artists, refresh)
 
     def _drawPoints(self):
         for p in self.model.points:
             i = self.onAdd(p[2], p[3], p[4])
             self._drawPoint(p[0].value, p[1].value, i, False)
-        self.model.getCanvas().draw()
+        self.model.getOverlay().update()
 
     def _redrawPoints(self):
-        for point in self.model.fig_points:
-            point.remove()
+        self.model.getOverlay().removeArtists(self.model.fig_points, refresh=False)
         self.model.fig_points = []
         self.table.setRowCount(0)
         self._drawPoints()
@@ -1,14 +1,17 @@
 import numpy as np
-import pywt
 from PyQt5.QtWidgets import QWidget
-from skimage.restoration import estimate_sigma
 
-from solarviewer.config.base import ItemConfig, DataModel, DataType, ViewerType
+from solarviewer.config.base import ItemConfig, DataType, ViewerType
 from solarviewer.config.impl import DataToolController
 from solarviewer.ui.wavelet import Ui_Wavelet
+from solarviewer.util import classproperty, lazyImport
+
+pywt = lazyImport("pywt")
+restoration = lazyImport("skimage.restoration")
 
 
 class WaveletController(DataToolController):
+    process_safe = True
 
     def setupContent(self, content_widget: QWidget):
         self.ui = Ui_Wavelet()
@@ -21,24 +24,24 @@ class WaveletController(DataToolController):
         self.ui.wavelet_family_combo.currentIndexChanged.connect(self._onFamilyChanged)
 
     def onDataChanged(self, viewer_ctrl):
-        estimated_sigma = estimate_sigma(viewer_ctrl.model.data)
+        estimated_sigma = restoration.estimate_sigma(viewer_ctrl.model.data)
         self.ui.sigma_spin.setValue(estimated_sigma)
 
-    def modifyData(self, data_model: DataModel) -> DataModel:
-        noise_sigma = self.ui.sigma_spin.value()
-        wavelet = self.ui.wavelet_combo.currentText()
-        level = self.ui.level_spin.value()
+    def getParameters(self):
+        return {"noise_sigma": self.ui.sigma_spin.value(), "wavelet": self.ui.wavelet_combo.currentText(),
+                "level": self.ui.level_spin.value()}
 
-        wc = pywt.wavedec2(data=data_model.data, wavelet=wavelet, level=level)
+    @staticmethod
+    def processData(data, noise_sigma=0, wavelet="haar", level=1):
+        wc = pywt.wavedec2(data=data, wavelet=wavelet, level=level)
 
-        threshold = noise_sigma * np.sqrt(2 * np.log(data_model.data.size))
+        threshold = noise_sigma * np.sqrt(2 * np.log(data.size))
 
         nwc = map(lambda x: pywt.threshold(x, threshold), wc)
-        data_model.setData(pywt.waverec2(list(nwc), wavelet=wavelet))
-        return data_model
+        return pywt.waverec2(list(nwc), wavelet=wavelet)
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ItemConfig().setTitle("Wavelet Filter").setMenuPath("Tools/Wavelet Filter").addSupportedData(
             DataType.MAP).addSupportedData(DataType.PLAIN_2D).addSupportedViewer(ViewerType.ANY)
 
@@ -5,6 +5,7 @@ from solarviewer.app.connect import ViewerLock, ViewerConnectionController
 from solarviewer.config.base import ItemConfig, ToolbarConfig, ViewerController, ViewerType, DataType
 from solarviewer.config.impl import ToolbarController
 from solarviewer.config.ioc import RequiredFeature
+from solarviewer.util import classproperty
 
 
 class MplToolbarController(ToolbarController):
@@ -13,8 +14,8 @@ class MplToolbarController(ToolbarController):
     def __init__(self):
         ToolbarController.__init__(self)
 
-    @property
-    def item_config(self) -> ItemConfig:
+    @classproperty
+    def item_config(cls) -> ItemConfig:
         return ToolbarConfig().setMenuPath("View/Toolbar/Default").addSupportedViewer(
             ViewerType.MPL).addSupportedData(DataType.ANY)
 
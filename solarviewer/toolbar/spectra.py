@@ -2,7 +2,6 @@ import copy
 
 from PyQt5 import QtWidgets, QtGui, QtCore
 from PyQt5.QtCore import QDateTime
-from radiospectra.sources import CallistoSpectrogram
 
 from solarviewer.app.content import ContentController
 from solarviewer.config.base import ToolbarConfig, ViewerType, DataType
@@ -10,7 +9,7 @@ from solarviewer.config.impl import ToolbarController
 from solarviewer.config.ioc import RequiredFeature
 from solarviewer.ui.time_range import Ui_TimeRange
 from solarviewer.util import executeLongRunningTask
-from solarviewer.viewer.spectra import CallistoModel
+from solarviewer.viewer.spectra import CallistoModel, sources
 
 
 class SpectraToolbarController(ToolbarController):
@@ -58,9 +57,9 @@ class SpectraToolbarController(ToolbarController):
                                                           filter="FITS files (*.fits; *.fit; *.fts)")
         if paths:
             model: CallistoModel = copy.deepcopy(self.content_ctrl.getDataModel())
-            spectra = [CallistoSpectrogram.read(p) for p in paths]
+            spectra = [sources.CallistoSpectrogram.read(p) for p in paths]
             spectra.append(model.spectrogram)
-            model.spectrogram = CallistoSpectrogram.join_many(spectra)
+            model.spectrogram = sources.CallistoSpectrogram.join_many(spectra)
             self.content_ctrl.setDataModel(model, v_id)
 
     def _extendAction(self, minutes):
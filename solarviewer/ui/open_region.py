@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'open_region.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_OpenRegion(object):
+    def setupUi(self, OpenRegion):
+        OpenRegion.setObjectName("OpenRegion")
+        OpenRegion.resize(280, 180)
+        self.formLayout = QtWidgets.QFormLayout(OpenRegion)
+        self.formLayout.setObjectName("formLayout")
+        self.label = QtWidgets.QLabel(OpenRegion)
+        self.label.setObjectName("label")
+        self.formLayout.setWidget(0, QtWidgets.QFormLayout.LabelRole, self.label)
+        self.unit_combo = QtWidgets.QComboBox(OpenRegion)
+        self.unit_combo.setObjectName("unit_combo")
+        self.unit_combo.addItem("")
+        self.unit_combo.addItem("")
+        self.formLayout.setWidget(0, QtWidgets.QFormLayout.FieldRole, self.unit_combo)
+        self.label_2 = QtWidgets.QLabel(OpenRegion)
+        self.label_2.setObjectName("label_2")
+        self.formLayout.setWidget(1, QtWidgets.QFormLayout.LabelRole, self.label_2)
+        self.widget = QtWidgets.QWidget(OpenRegion)
+        self.widget.setObjectName("widget")
+        self.horizontalLayout = QtWidgets.QHBoxLayout(self.widget)
+        self.horizontalLayout.setContentsMargins(0, 0, 0, 0)
+        self.horizontalLayout.setObjectName("horizontalLayout")
+        self.x_min = QtWidgets.QDoubleSpinBox(self.widget)
+        self.x_min.setMinimum(-100000.0)
+        self.x_min.setMaximum(100000.0)
+        self.x_min.setObjectName("x_min")
+        self.horizontalLayout.addWidget(self.x_min)
+        self.y_min = QtWidgets.QDoubleSpinBox(self.widget)
+        self.y_min.setMinimum(-100000.0)
+        self.y_min.setMaximum(100000.0)
+        self.y_min.setObjectName("y_min")
+        self.horizontalLayout.addWidget(self.y_min)
+        self.formLayout.setWidget(1, QtWidgets.QFormLayout.FieldRole, self.widget)
+        self.label_3 = QtWidgets.QLabel(OpenRegion)
+        self.label_3.setObjectName("label_3")
+        self.formLayout.setWidget(2, QtWidgets.QFormLayout.LabelRole, self.label_3)
+        self.widget_2 = QtWidgets.QWidget(OpenRegion)
+        self.widget_2.setObjectName("widget_2")
+        self.horizontalLayout_2 = QtWidgets.QHBoxLayout(self.widget_2)
+        self.horizontalLayout_2.setContentsMargins(0, 0, 0, 0)
+        self.horizontalLayout_2.setObjectName("horizontalLayout_2")
+        self.x_max = QtWidgets.QDoubleSpinBox(self.widget_2)
+        self.x_max.setMinimum(-100000.0)
+        self.x_max.setMaximum(100000.0)
+        self.x_max.setProperty("value", 511.0)
+        self.x_max.setObjectName("x_max")
+        self.horizontalLayout_2.addWidget(self.x_max)
+        self.y_max = QtWidgets.QDoubleSpinBox(self.widget_2)
+        self.y_max.setMinimum(-100000.0)
+        self.y_max.setMaximum(100000.0)
+        self.y_max.setProperty("value", 511.0)
+        self.y_max.setObjectName("y_max")
+        self.horizontalLayout_2.addWidget(self.y_max)
+        self.formLayout.setWidget(2, QtWidgets.QFormLayout.FieldRole, self.widget_2)
+        self.button_box = QtWidgets.QDialogButtonBox(OpenRegion)
+        self.button_box.setStandardButtons(QtWidgets.QDialogButtonBox.Cancel|QtWidgets.QDialogButtonBox.Ok)
+        self.button_box.setObjectName("button_box")
+        self.formLayout.setWidget(3, QtWidgets.QFormLayout.SpanningRole, self.button_box)
+
+        self.retranslateUi(OpenRegion)
+        self.button_box.accepted.connect(OpenRegion.accept) # type: ignore
+        self.button_box.rejected.connect(OpenRegion.reject) # type: ignore
+        QtCore.QMetaObject.connectSlotsByName(OpenRegion)
+
+    def retranslateUi(self, OpenRegion):
+        _translate = QtCore.QCoreApplication.translate
+        OpenRegion.setWindowTitle(_translate("OpenRegion", "Open Region"))
+        self.label.setText(_translate("OpenRegion", "Unit:"))
+        self.unit_combo.setItemText(0, _translate("OpenRegion", "Pixel"))
+        self.unit_combo.setItemText(1, _translate("OpenRegion", "Arcsec"))
+        self.label_2.setText(_translate("OpenRegion", "Bottom Left:"))
+        self.label_3.setText(_translate("OpenRegion", "Top Right:"))
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'save_fits.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_SaveFits(object):
+    def setupUi(self, SaveFits):
+        SaveFits.setObjectName("SaveFits")
+        SaveFits.resize(394, 190)
+        self.verticalLayout = QtWidgets.QVBoxLayout(SaveFits)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.widget = QtWidgets.QWidget(SaveFits)
+        self.widget.setObjectName("widget")
+        self.formLayout = QtWidgets.QFormLayout(self.widget)
+        self.formLayout.setObjectName("formLayout")
+        self.label = QtWidgets.QLabel(self.widget)
+        self.label.setObjectName("label")
+        self.formLayout.setWidget(0, QtWidgets.QFormLayout.LabelRole, self.label)
+        self.widget_2 = QtWidgets.QWidget(self.widget)
+        self.widget_2.setObjectName("widget_2")
+        self.horizontalLayout = QtWidgets.QHBoxLayout(self.widget_2)
+        self.horizontalLayout.setContentsMargins(0, 0, -1, 0)
+        self.horizontalLayout.setObjectName("horizontalLayout")
+        self.file_path = QtWidgets.QLineEdit(self.widget_2)
+        self.file_path.setEnabled(False)
+        self.file_path.setObjectName("file_path")
+        self.horizontalLayout.addWidget(self.file_path)
+        self.file_select = QtWidgets.QPushButton(self.widget_2)
+        self.file_select.setObjectName("file_select")
+        self.horizontalLayout.addWidget(self.file_select)
+        self.formLayout.setWidget(0, QtWidgets.QFormLayout.FieldRole, self.widget_2)
+        self.label_2 = QtWidgets.QLabel(self.widget)
+        self.label_2.setObjectName("label_2")
+        self.formLayout.setWidget(1, QtWidgets.QFormLayout.LabelRole, self.label_2)
+        self.compression_combo = QtWidgets.QComboBox(self.widget)
+        self.compression_combo.setObjectName("compression_combo")
+        self.formLayout.setWidget(1, QtWidgets.QFormLayout.FieldRole, self.compression_combo)
+        self.label_3 = QtWidgets.QLabel(self.widget)
+        self.label_3.setObjectName("label_3")
+        self.formLayout.setWidget(2, QtWidgets.QFormLayout.LabelRole, self.label_3)
+        self.widget_3 = QtWidgets.QWidget(self.widget)
+        self.widget_3.setObjectName("widget_3")
+        self.horizontalLayout_2 = QtWidgets.QHBoxLayout(self.widget_3)
+        self.horizontalLayout_2.setContentsMargins(0, 0, -1, 0)
+        self.horizontalLayout_2.setObjectName("horizontalLayout_2")
+        self.tile_rows_spin = QtWidgets.QSpinBox(self.widget_3)
+        self.tile_rows_spin.setMinimum(1)
+        self.tile_rows_spin.setMaximum(100000)
+        self.tile_rows_spin.setProperty("value", 32)
+        self.tile_rows_spin.setObjectName("tile_rows_spin")
+        self.horizontalLayout_2.addWidget(self.tile_rows_spin)
+        self.tile_columns_spin = QtWidgets.QSpinBox(self.widget_3)
+        self.tile_columns_spin.setMinimum(1)
+        self.tile_columns_spin.setMaximum(100000)
+        self.tile_columns_spin.setProperty("value", 32)
+        self.tile_columns_spin.setObjectName("tile_columns_spin")
+        self.horizontalLayout_2.addWidget(self.tile_columns_spin)
+        self.formLayout.setWidget(2, QtWidgets.QFormLayout.FieldRole, self.widget_3)
+        self.label_4 = QtWidgets.QLabel(self.widget)
+        self.label_4.setObjectName("label_4")
+        self.formLayout.setWidget(3, QtWidgets.QFormLayout.LabelRole, self.label_4)
+        self.quantize_spin = QtWidgets.QDoubleSpinBox(self.widget)
+        self.quantize_spin.setMinimum(1.0)
+        self.quantize_spin.setMaximum(1000.0)
+        self.quantize_spin.setProperty("value", 16.0)
+        self.quantize_spin.setObjectName("quantize_spin")
+        self.formLayout.setWidget(3, QtWidgets.QFormLayout.FieldRole, self.quantize_spin)
+        self.verticalLayout.addWidget(self.widget)
+        self.button_box = QtWidgets.QDialogButtonBox(SaveFits)
+        self.button_box.setOrientation(QtCore.Qt.Horizontal)
+        self.button_box.setStandardButtons(QtWidgets.QDialogButtonBox.Cancel|QtWidgets.QDialogButtonBox.Ok)
+        self.button_box.setObjectName("button_box")
+        self.verticalLayout.addWidget(self.button_box)
+
+        self.retranslateUi(SaveFits)
+        self.button_box.accepted.connect(SaveFits.accept) # type: ignore
+        self.button_box.rejected.connect(SaveFits.reject) # type: ignore
+        QtCore.QMetaObject.connectSlotsByName(SaveFits)
+
+    def retranslateUi(self, SaveFits):
+        _translate = QtCore.QCoreApplication.translate
+        SaveFits.setWindowTitle(_translate("SaveFits", "Export FITS"))
+        self.label.setText(_translate("SaveFits", "Filepath:"))
+        self.file_select.setText(_translate("SaveFits", "..."))
+        self.label_2.setText(_translate("SaveFits", "Compression:"))
+        self.label_3.setText(_translate("SaveFits", "Tile Size:"))
+        self.tile_rows_spin.setSuffix(_translate("SaveFits", " rows"))
+        self.tile_columns_spin.setSuffix(_translate("SaveFits", " columns"))
+        self.label_4.setText(_translate("SaveFits", "Quantization:"))
@@ -1,7 +1,18 @@
+import heapq
+import importlib
+import itertools
+import multiprocessing
+import os
 import pkgutil
-from threading import Event, Thread
-from typing import Callable, List
-
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from enum import IntEnum
+from multiprocessing import shared_memory
+from threading import Event, Thread, Condition, Lock
+from types import ModuleType
+from typing import Callable, List, Dict
+
+import numpy as np
 from PyQt5 import QtCore, QtWidgets
 from PyQt5.QtCore import pyqtSignal
 
@@ -10,12 +21,273 @@ class classproperty(object):
 
     def __init__(self, fget):
         self.fget = fget
+        self.__isabstractmethod__ = getattr(fget, "__isabstractmethod__", False)
 
     def __get__(self, owner_self, owner_cls):
+        if self.__isabstractmethod__:
+            return self  # not implemented by the class, inspected by ABCMeta like an abstract property
         return self.fget(owner_cls)
 
 
-def executeWaitTask(event: Event, call_after: Callable, call_after_args=[]):
+def lazyImport(name: str) -> ModuleType:
+    """
+    Returns a proxy for the module, which is imported upon the first attribute access.
+    Use for heavy modules that are only required by specific controllers.
+
+    :param name: the full module name (e.g., 'sunpy.net')
+    :return: the module or a lazy module proxy if the module was not imported yet
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    return _LazyModule(name)
+
+
+class Priority(IntEnum):
+    """Priority classes of the task executor. Lower values are executed first."""
+    RENDER = 0  # UI critical tasks (e.g., rendering of the viewers)
+    DEFAULT = 1
+    BACKGROUND = 2  # long running I/O (e.g., downloads)
+
+
+class CancellationToken:
+    """Token to cancel submitted tasks. Results of cancelled tasks are discarded."""
+
+    def __init__(self):
+        self._event = Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class NotifyingEvent(Event):
+    """Event that calls the subscribed functions when it is set (on the setting thread)."""
+
+    def __init__(self):
+        Event.__init__(self)
+        self._callbacks = []
+
+    def subscribe(self, callback: Callable):
+        """
+        Calls the function with the event each time the event is set. Functions are subscribed only once.
+
+        :param callback: function of form callback(event), must not block
+        """
+        if callback not in self._callbacks:
+            self._callbacks.append(callback)
+
+    def set(self):
+        Event.set(self)
+        for callback in list(self._callbacks):
+            callback(self)
+
+
+class TaskExecutor:
+    """
+    Bounded worker pool for the execution of tasks outside the main thread.
+    Queued tasks are executed in order of priority. Background tasks never occupy all workers.
+    """
+
+    def __init__(self, max_workers: int = None, poll_interval: float = 0.01):
+        self.max_workers = max_workers or max(2, min(8, os.cpu_count() or 1))
+        self.background_limit = max(1, self.max_workers - 1)
+        self.poll_interval = poll_interval  # only for events that do not notify when set
+
+        self._lock = Lock()
+        self._condition = Condition(self._lock)  # signals queued tasks to the workers
+        self._events = Condition(self._lock)  # signals waiting tasks and set events to the event monitor
+        self._fired = set()  # notifying events that were set since the last check
+        self._queue = []
+        self._sequence = itertools.count()
+        self._workers = []
+        self._idle = 0
+        self._running = {p: 0 for p in Priority}
+        self._waiting = []
+        self._monitor = None
+        self._active = set()
+        self._counts = {"completed": 0, "failed": 0, "cancelled": 0}
+
+    def submit(self, task: "_Task", priority: Priority = Priority.DEFAULT):
+        """
+        Queues the task for execution.
+
+        :param task: the task to execute
+        :param priority: the priority class of the task
+        """
+        worker = None
+        with self._condition:
+            self._active.add(task)
+            heapq.heappush(self._queue, (priority, next(self._sequence), task))
+            if self._idle < len(self._queue) and len(self._workers) < self.max_workers:
+                # hand the next task directly to the new worker
+                first = self._next() if self._eligible() else None
+                worker = Thread(target=self._work, args=(first,), name="TaskExecutor-{}".format(len(self._workers)),
+                                daemon=True)
+                self._workers.append(worker)
+            else:
+                self._condition.notify()
+        if worker is not None:
+            worker.start()
+
+    def submitWhen(self, event: Event, task: "_Task"):
+        """
+        Executes the task when the event is set. Waiting tasks do not occupy workers.
+        A NotifyingEvent wakes the event monitor when it is set, other events are polled.
+
+        :param event: threading event
+        :param task: the (short) task to execute
+        """
+        with self._condition:
+            self._active.add(task)
+            self._waiting.append((event, task))
+            if isinstance(event, NotifyingEvent):
+                event.subscribe(self._onEventSet)
+            if self._monitor is None:
+                self._monitor = Thread(target=self._monitorEvents, name="TaskExecutor-Monitor", daemon=True)
+                self._monitor.start()
+            self._events.notify()
+
+    def metrics(self) -> Dict[str, int]:
+        """
+        Returns the current state of the executor.
+
+        :return: dictionary with the number of workers, queued tasks (per priority), running and waiting tasks and
+            the total number of completed, failed and cancelled tasks
+        """
+        with self._condition:
+            metrics = {"workers": len(self._workers), "idle": self._idle, "queued": len(self._queue),
+                       "running": sum(self._running.values()), "waiting": len(self._waiting)}
+            for p in Priority:
+                metrics["queued_" + p.name.lower()] = len([t for t in self._queue if t[0] == p])
+            metrics.update(self._counts)
+            return metrics
+
+    def _eligible(self):
+        if not self._queue:
+            return False
+        priority = self._queue[0][0]
+        return priority != Priority.BACKGROUND or self._running[priority] < self.background_limit
+
+    def _next(self):
+        priority, _, task = heapq.heappop(self._queue)
+        self._running[priority] += 1
+        return priority, task
+
+    def _work(self, first=None):
+        while True:
+            if first is not None:
+                priority, task = first
+                first = None
+            else:
+                with self._condition:
+                    while not self._eligible():
+                        self._idle += 1
+                        self._condition.wait()
+                        self._idle -= 1
+                    priority, task = self._next()
+            try:
+                self._run(task)
+            finally:
+                with self._condition:
+                    self._running[priority] -= 1
+                    self._condition.notify()
+
+    def _onEventSet(self, event):
+        with self._condition:
+            if any(e is event for e, t in self._waiting):
+                self._fired.add(event)
+                self._events.notify()
+
+    def _monitorEvents(self):
+        while True:
+            with self._condition:
+                while not self._waiting:
+                    self._events.wait()
+                fired, self._fired = self._fired, set()
+                ready = [t for e, t in self._waiting if e in fired or e.is_set()]
+                self._waiting = [(e, t) for e, t in self._waiting if not (e in fired or e.is_set())]
+                if not ready:
+                    polled = any(not isinstance(e, NotifyingEvent) for e, t in self._waiting)
+                    self._events.wait(self.poll_interval if polled else None)
+            for task in ready:
+                self._run(task)
+
+    def _run(self, task):
+        state = task.run()
+        with self._condition:
+            self._counts[state] += 1
+            self._active.discard(task)
+
+
+executor = TaskExecutor()  # shared task executor
+
+
+def availableMemory() -> int:
+    """
+    Returns the physical memory that is currently available.
+
+    :return: the number of bytes or None if unknown
+    """
+    try:
+        with open("/proc/meminfo") as f:  # includes reclaimable caches
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_AVPHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+_process_pool = None
+
+
+def getProcessPool() -> ProcessPoolExecutor:
+    """Returns the shared process pool (created upon the first request)."""
+    global _process_pool
+    if _process_pool is None:
+        # spawn: forking the multi-threaded Qt application is unsafe
+        _process_pool = ProcessPoolExecutor(max(1, (os.cpu_count() or 2) - 1), multiprocessing.get_context("spawn"))
+    return _process_pool
+
+
+def executeInProcess(function: Callable, data: np.ndarray, kwargs: Dict = {}) -> np.ndarray:
+    """
+    Executes the array function in a worker process. The array is placed in shared memory, only the function
+    reference, the array metadata and the keyword arguments are pickled. Blocks until the result is available.
+
+    :param function: module level (or static) function of form function(data, **kwargs) -> np.ndarray
+    :param data: the input array (read-only for the function)
+    :param kwargs: additional (picklable) keyword arguments for the function
+    :return: the resulting array
+    """
+    data = np.asarray(data)
+    shm = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+    try:
+        _sharedArray(shm, data.shape, data.dtype)[...] = data
+        result = getProcessPool().submit(_executeShared, function, shm.name, data.shape, data.dtype.str,
+                                         kwargs).result()
+        if result is None:  # written to the input buffer
+            return _sharedArray(shm, data.shape, data.dtype).copy()
+        name, shape, dtype = result
+        result_shm = shared_memory.SharedMemory(name=name)
+        try:
+            return _sharedArray(result_shm, shape, dtype).copy()
+        finally:
+            result_shm.close()
+            result_shm.unlink()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def executeWaitTask(event: Event, call_after: Callable, call_after_args=[],
+                    token: CancellationToken = None) -> CancellationToken:
     """
     Waits for the event to finish and executes the call after function afterwards.
     Prevents long thread executions outside the main thread.
@@ -23,14 +295,18 @@ def executeWaitTask(event: Event, call_after: Callable, call_after_args=[]):
     :param event: threading event
     :param call_after: function to call after event finished
     :param call_after_args: arguments for the call after function
-    :return: None
+    :param token: optional cancellation token
+    :return: the cancellation token of the task
     """
-    wt = _WaitingThread(event)
-    wt.finished.connect(lambda: call_after(*call_after_args))
-    wt.start()
+    task = _Task(lambda: None, [], token)
+    task.finished.connect(lambda x: call_after(*call_after_args))
+    executor.submitWhen(event, task)
+    return task.token
 
 
-def executeTask(execution: Callable, args=[], call_after: Callable = None, call_after_args=[]):
+def executeTask(execution: Callable, args=[], call_after: Callable = None, call_after_args=[],
+                priority: Priority = Priority.DEFAULT, token: CancellationToken = None,
+                call_error: Callable = None) -> CancellationToken:
     """
     Executes the function and executes afterwards the call after function.
     The return value of the execution function will be passed to the call_after function as first parameter if not None.
@@ -40,17 +316,27 @@ def executeTask(execution: Callable, args=[], call_after: Callable = None, call_
     :param args: arguments for the execution function
     :param call_after: function to call after execution finished
     :param call_after_args: additional arguments for the call after function
-    :return: None
+    :param priority: the priority class of the task
+    :param token: optional cancellation token
+    :param call_error: function to call with the exception and the call after arguments if the execution failed.
+    By default the exception is raised in the main thread.
+    :return: the cancellation token of the task
     """
-    thread = _Thread(execution, args)
-    thread.error.connect(_raise)
+    task = _Task(execution, args, token)
+    if call_error:
+        task.error.connect(lambda ex: call_error(ex, *call_after_args))
+    else:
+        task.error.connect(_raise)
     if call_after:
-        thread.finished.connect(
+        task.finished.connect(
             lambda x: call_after(x, *call_after_args) if x is not None else call_after(*call_after_args))
-    thread.start()
+    executor.submit(task, priority)
+    return task.token
 
 
-def executeLongRunningTask(execution: Callable, args=[], message="", call_after: Callable = None, call_after_args=[]):
+def executeLongRunningTask(execution: Callable, args=[], message="", call_after: Callable = None, call_after_args=[],
+                           priority: Priority = Priority.DEFAULT,
+                           token: CancellationToken = None) -> CancellationToken:
     """
     Shows a waiting indicator and executes the function. Afterwards the call after function is called.
     The return value of the execution function will be passed to the call_after function as first parameter if not None.
@@ -60,24 +346,30 @@ def executeLongRunningTask(execution: Callable, args=[], message="", call_after:
     :param args: arguments for the execution function
     :param call_after: function to call after execution finished
     :param call_after_args: additional arguments for the call after function
-    :return: None
+    :param priority: the priority class of the task
+    :param token: optional cancellation token. A cancel button is shown if provided.
+    :return: the cancellation token of the task
     """
-    thread = _Thread(execution, args)
-    progress = QtWidgets.QProgressDialog(message, None, 0, 0, flags=QtCore.Qt.FramelessWindowHint)
+    task = _Task(execution, args, token)
+    cancel_text = "Cancel" if token else None
+    progress = QtWidgets.QProgressDialog(message, cancel_text, 0, 0, flags=QtCore.Qt.FramelessWindowHint)
     progress.setWindowModality(QtCore.Qt.ApplicationModal)
     bar = QtWidgets.QProgressBar()
     bar.setRange(0, 0)
     bar.setTextVisible(False)
     progress.setBar(bar)
+    progress.canceled.connect(task.token.cancel)
 
-    thread.error.connect(_raise)
+    task.error.connect(_raise)
     if call_after:
-        thread.finished.connect(lambda x: call_after(x, *call_after_args) if x else call_after(*call_after_args))
-    close_progress = lambda x, p=progress: p.close()
-    thread.finished.connect(close_progress)
-    thread.error.connect(close_progress)
+        task.finished.connect(lambda x: call_after(x, *call_after_args) if x else call_after(*call_after_args))
+    close_progress = lambda *x, p=progress: p.close()
+    task.finished.connect(close_progress)
+    task.error.connect(close_progress)
+    task.cancelled.connect(close_progress)
     progress.show()
-    thread.start()
+    executor.submit(task, priority)
+    return task.token
 
 
 def installMissingAndExecute(package_names: List[str], execution: Callable, args=[]):
@@ -101,7 +393,8 @@ def installMissingAndExecute(package_names: List[str], execution: Callable, args
 
     for pkg_name in package_names:
         if not pkgutil.find_loader(pkg_name):
-            executeLongRunningTask(_install, [pkg_name], "Installing Packages", execution, args)
+            executeLongRunningTask(_install, [pkg_name], "Installing Packages", execution, args,
+                                   priority=Priority.BACKGROUND)
 
 
 def checkPackages(package_names: List[str]) -> bool:
@@ -121,7 +414,7 @@ def checkPackages(package_names: List[str]) -> bool:
 
     for pkg_name in package_names:
         if not pkgutil.find_loader(pkg_name):
-            executeLongRunningTask(_install, [pkg_name], "Downloading Packages")
+            executeLongRunningTask(_install, [pkg_name], "Downloading Packages", priority=Priority.BACKGROUND)
     return False
 
 
@@ -139,37 +432,66 @@ def _install(pkg_name):
     subprocess.call([sys.executable, "-m", "pip", "install", pkg_name])
 
 
-class _Thread(QtCore.QObject, Thread):
+class _Task(QtCore.QObject):
     finished = pyqtSignal(object)
     error = pyqtSignal(object)
+    cancelled = pyqtSignal()
+
+    def __init__(self, execution, args, token=None):
+        QtCore.QObject.__init__(self)
 
-    def __init__(self, execution, args):
         self.execution = execution
         self.args = args
+        self.token = token if token is not None else CancellationToken()
 
-        QtCore.QObject.__init__(self)
-        Thread.__init__(self)
-
-    def run(self):
+    def run(self) -> str:
+        if self.token.cancelled:
+            self.cancelled.emit()
+            return "cancelled"
         try:
             result = self.execution(*self.args)
-            self.finished.emit(result)
         except Exception as ex:
             self.error.emit(ex)
+            return "failed"
+        if self.token.cancelled:
+            self.cancelled.emit()
+            return "cancelled"
+        self.finished.emit(result)
+        return "completed"
+
+
+def _sharedArray(shm, shape, dtype):
+    return np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+
+
+def _executeShared(function, name, shape, dtype, kwargs):
+    """Process side of executeInProcess. Returns the result location or None if written to the input buffer."""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        data = _sharedArray(shm, shape, dtype)
+        data.flags.writeable = False  # same contract as the arrays shared between data models
+        result = np.asarray(function(data, **kwargs))
+        if result.shape == tuple(shape) and result.dtype == np.dtype(dtype):
+            _sharedArray(shm, shape, dtype)[...] = result
+            return None
+        result_shm = shared_memory.SharedMemory(create=True, size=max(result.nbytes, 1))
+        _sharedArray(result_shm, result.shape, result.dtype)[...] = result
+        result_shm.close()
+        return result_shm.name, result.shape, result.dtype.str
+    finally:
+        data = result = None  # release the buffer views before closing
+        try:
+            shm.close()
+        except BufferError:  # still referenced by an exception traceback
+            pass
 
 
-class _WaitingThread(QtCore.QObject, Thread):
-    finished = pyqtSignal()
-
-    def __init__(self, event):
-        self.event = event
-
-        QtCore.QObject.__init__(self)
-        Thread.__init__(self)
+class _LazyModule(ModuleType):
 
-    def run(self):
-        self.event.wait()
-        self.finished.emit()
+    def __getattr__(self, item):
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, item)
 
 
 def _raise(ex: Exception):
@@ -1,18 +1,21 @@
 import os
 from copy import copy
 
-from astropy.io.fits import getdata, getheader
 from astropy.wcs import WCS
 from matplotlib import cm
 from matplotlib.colors import Normalize
 
 from solarviewer.app.plot import PlotWidget
 from solarviewer.config.base import ViewerController, DataType, ViewerType, ViewerConfig, DataModel, Viewer
+from solarviewer.config.cache import readImage
 from solarviewer.util import classproperty
 from solarviewer.viewer.util import MPLCoordinatesMixin
 
 
 class Plain2DModel(DataModel):
+    shared_attributes = ("_data",)
+    display_attributes = ("_cmap", "cmap_preferences", "norm")
+
     def __init__(self, data):
         self._data = data
         self.wcs = None
@@ -76,13 +79,15 @@ class AstroPyViewerController(ViewerController, MPLCoordinatesMixin):
 
     @classmethod
     def fromFile(cls, file):
-        data = getdata(file)
-        header = getheader(file)
+        return cls(cls.readModel(file))
+
+    @classmethod
+    def readModel(cls, file):
+        data, header = readImage(file, cls.memory_map)
         model = Plain2DModel(data)
         model.wcs = WCS(header)
         model.title = os.path.basename(file)
-
-        return cls(model)
+        return model
 
     @classmethod
     def fromModel(cls, model):
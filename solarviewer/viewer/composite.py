@@ -1,14 +1,19 @@
+from copy import deepcopy
+
 from matplotlib import pyplot as plt
 from sunpy.map import Map
 
 from solarviewer.app.plot import PlotWidget
-from solarviewer.config.base import DataModel, DataType, ViewerType, ViewerController, ViewerConfig, Viewer
+from solarviewer.config.base import DataModel, DataType, ViewerType, ViewerController, ViewerConfig, Viewer, \
+    arrayBytes
 from solarviewer.util import classproperty
+from solarviewer.viewer.map import shareMap, openMap
 from solarviewer.viewer.util import MPLCoordinatesMixin
 
 
 class CompositeMapModel(DataModel):
     c_id = 0
+    shared_attributes = ("maps",)
 
     def __init__(self, maps):
         self.maps = {self._generateId(): (map, self._defaultSettings()) for map in maps}
@@ -22,6 +27,13 @@ class CompositeMapModel(DataModel):
                 comp_map.set_levels(i, sorted(settings["levels"]), True)
         return comp_map
 
+    @property
+    def nbytes(self):
+        return sum(arrayBytes(m.data) for m, _ in self.maps.values())
+
+    def copyShared(self, name, value, memo):
+        return {c_id: (shareMap(m, memo), deepcopy(settings, memo)) for c_id, (m, settings) in value.items()}
+
     def _defaultSettings(self):
         settings = {"zorder": 0, "alpha": 50, "levels": False}
         return settings
@@ -62,9 +74,12 @@ class CompositeMapViewerController(ViewerController, MPLCoordinatesMixin):
 
     @classmethod
     def fromFile(cls, files):
-        maps = [Map(file) for file in files]
-        model = CompositeMapModel(maps)
-        return cls(model)
+        return cls(cls.readModel(files))
+
+    @classmethod
+    def readModel(cls, files):
+        maps = [openMap(file, cls.memory_map) for file in files]
+        return CompositeMapModel(maps)
 
     @classmethod
     def fromModel(cls, model):
@@ -1,9 +1,8 @@
 from PyQt5 import QtWidgets, QtCore
-from sunpy.map import Map
 
 from solarviewer.config.base import DataType, ViewerType, ViewerController, Viewer, DataModel, ViewerConfig
 from solarviewer.util import classproperty
-from solarviewer.viewer.map import MapModel
+from solarviewer.viewer.map import MapModel, openMap
 
 
 class GingaMapViewerController(ViewerController):
@@ -19,11 +18,11 @@ class GingaMapViewerController(ViewerController):
 
     @classmethod
     def fromFile(cls, file):
-        s_map = Map(file)
-        s_map.path = file
+        return cls(cls.readModel(file))
 
-        model = MapModel(s_map)
-        return cls(model)
+    @classmethod
+    def readModel(cls, file):
+        return MapModel(openMap(file, cls.memory_map))
 
     @classmethod
     def fromModel(cls, model):
@@ -1,16 +1,28 @@
-from copy import copy
+import math
+from copy import copy, deepcopy
 
 from astropy import units as u
+from astropy.io import fits
+from astropy.wcs import WCS
+from matplotlib import colors
+from PyQt5 import QtCore
 from sunpy.map import Map
 from sunpy.visualization import wcsaxes_compat
 
 from solarviewer.app.plot import PlotWidget
-from solarviewer.config.base import ViewerController, DataType, ViewerType, ViewerConfig, DataModel, Viewer
-from solarviewer.util import classproperty
+from solarviewer.config.base import ViewerController, DataType, ViewerType, ViewerConfig, DataModel, Viewer, \
+    shareArray
+from solarviewer.config.cache import array_cache, findImageHDU
+from solarviewer.util import classproperty, availableMemory
+from solarviewer.viewer.overlay import drawContours, drawGrid, drawLimb
+from solarviewer.viewer.pyramid import ImagePyramid, getPyramid
 from solarviewer.viewer.util import MPLCoordinatesMixin
 
 
 class MapModel(DataModel):
+    shared_attributes = ("map",)
+    display_attributes = ("plot_preferences", "_cmap", "cmap_preferences", "norm", "interpolation")
+
     def __init__(self, s_map):
         self.plot_preferences = {"show_colorbar": False, "show_limb": False, "contours": False,
                                  "draw_grid": False, "mask": False, "wcs_grid": True, "annotate": True}
@@ -29,6 +41,16 @@ class MapModel(DataModel):
     def setData(self, data):
         self.map._data = data
 
+    def copyShared(self, name, value, memo):
+        return shareMap(value, memo)
+
+    @property
+    def pyramid(self) -> ImagePyramid:
+        """The resolution levels of the image (built on request), None for data that is not two dimensional."""
+        if self.map.data.ndim != 2:
+            return None
+        return getPyramid(self.map.data, self.map.mask)
+
     @property
     def title(self):
         try:
@@ -54,9 +76,174 @@ class MapModel(DataModel):
         return cmap
 
 
+def shareMap(s_map, memo=None):
+    """Copy of the map that references the (read-only) data array. Meta data and plot settings are copied."""
+    map_copy = copy(s_map)
+    map_copy.meta = deepcopy(s_map.meta, memo)
+    map_copy.plot_settings = deepcopy(s_map.plot_settings, memo)
+    shareArray(s_map.data)
+    return map_copy
+
+
+def levelMap(s_map, pyramid: ImagePyramid, level: int):
+    """
+    Shallow copy of the map that plots a level of the pyramid. The meta data (and WCS) of the full resolution map is
+    kept, the plotted image needs to be stretched to the extent of the full resolution image (see ImagePyramid).
+
+    :param s_map: the full resolution map
+    :param pyramid: the pyramid of the map data
+    :param level: the level to plot
+    :return: the map of the level
+    """
+    if level == 0:
+        return s_map
+    level_map = copy(s_map)
+    level_map._data = pyramid.getLevel(level)
+    level_map.mask = None  # part of the level data
+    return level_map
+
+
+def openMap(file: str, memory_map=False):
+    """
+    Opens the file as SunPy Map.
+
+    :param file: the file path
+    :param memory_map: memory map uncompressed and unscaled image data, pixels are read from disk on access.
+        Compressed and scaled images are decoded once and memory mapped from the array cache.
+    :return: the map
+    """
+    cached = array_cache.load(file)
+    if cached is not None:
+        s_map = Map(*cached)
+    else:
+        s_map = Map(file, memmap=True) if memory_map else Map(file)
+    s_map.path = file
+    return s_map
+
+
+def openMapPreview(file: str, max_pixels: int, size: int):
+    """
+    Opens a decimated map of large images. Only every n-th pixel is read from the file.
+
+    :param file: the file path
+    :param max_pixels: minimum number of pixels of the image to create a preview
+    :param size: the maximum side length of the preview
+    :return: the preview map or None if the file is no FITS image with more than max_pixels
+    """
+    try:
+        hdu_list = fits.open(file)
+    except OSError:
+        return None
+    with hdu_list:
+        hdu = _getImageHDU(hdu_list)
+        if hdu is None or hdu.header["NAXIS"] != 2 or hdu.header["NAXIS1"] * hdu.header["NAXIS2"] <= max_pixels:
+            return None
+        step = int(math.ceil(max(hdu.header["NAXIS1"], hdu.header["NAXIS2"]) / size))
+        # compressed HDUs support sections only in recent astropy versions
+        data = hdu.section[::step, ::step] if hasattr(hdu, "section") else hdu.data[::step, ::step]
+        header = sectionHeader(hdu.header, step=step)
+    header["NAXIS1"], header["NAXIS2"] = data.shape[1], data.shape[0]
+    s_map = Map(data, header)
+    s_map.path = file
+    return s_map
+
+
+def openMapRegion(file: str, bottom_left, top_right, world=False):
+    """
+    Opens a region of the map. Only the pixels of the region are read from the file.
+
+    :param file: the file path
+    :param bottom_left: the (x, y) corner of the region in pixels (0-based) or arcsec (world=True)
+    :param top_right: the (x, y) corner of the region (inclusive)
+    :param world: True if the corners are given in world coordinates
+    :return: the map of the region
+    """
+    with fits.open(file) as hdu_list:
+        hdu = _getImageHDU(hdu_list)
+        if hdu is None or hdu.header["NAXIS"] != 2:
+            raise ValueError("No two dimensional image found in {}".format(file))
+        shape = (hdu.header["NAXIS2"], hdu.header["NAXIS1"])
+        corners = [bottom_left, top_right, (bottom_left[0], top_right[1]), (top_right[0], bottom_left[1])]
+        if world:
+            wcs = WCS(hdu.header)
+            corners = [wcs.wcs_world2pix([[(x * u.arcsec).to_value(wcs.wcs.cunit[0]),
+                                           (y * u.arcsec).to_value(wcs.wcs.cunit[1])]], 0)[0] for x, y in corners]
+        x_min = max(int(math.floor(min(c[0] for c in corners))), 0)
+        y_min = max(int(math.floor(min(c[1] for c in corners))), 0)
+        x_max = min(int(math.ceil(max(c[0] for c in corners))), shape[1] - 1)
+        y_max = min(int(math.ceil(max(c[1] for c in corners))), shape[0] - 1)
+        if x_min > x_max or y_min > y_max:
+            raise ValueError("The region is outside of the image")
+        # compressed HDUs support sections only in recent astropy versions
+        section = hdu.section if hasattr(hdu, "section") else hdu.data
+        data = section[y_min:y_max + 1, x_min:x_max + 1]
+        header = sectionHeader(hdu.header, offset=(x_min, y_min))
+    header["NAXIS1"], header["NAXIS2"] = data.shape[1], data.shape[0]
+    s_map = Map(data, header)
+    s_map.path = file
+    return s_map
+
+
+def sectionHeader(header: fits.Header, offset=(0, 0), step=1) -> fits.Header:
+    """
+    Adjusts the WCS of the header to a section of the image.
+
+    :param header: the header of the full image (or the meta data of the map)
+    :param offset: the first pixel (x, y) of the section (0-based)
+    :param step: the stride of the section along both axes
+    :return: the adjusted copy of the header
+    """
+    header = header.copy()
+    for key in ["BSCALE", "BZERO", "BLANK"]:  # the section is already scaled
+        header.pop(key, None)
+    for axis, start in zip([1, 2], offset):
+        crpix = "CRPIX%d" % axis
+        header[crpix] = (header.get(crpix, 1.) - 1 - start) / step + 1
+        if "CDELT%d" % axis in header:
+            header["CDELT%d" % axis] *= step
+        for i in [1, 2]:
+            if "CD%d_%d" % (i, axis) in header:
+                header["CD%d_%d" % (i, axis)] *= step
+    return header
+
+
+def checkMemory(file: str):
+    """
+    Estimates the memory of the decoded image and raises a MemoryError if it exceeds the available memory.
+
+    :param file: the file path
+    """
+    try:
+        with fits.open(file) as hdu_list:
+            hdu = _getImageHDU(hdu_list)
+            header = hdu.header if hdu is not None else None
+    except OSError:
+        return  # no FITS file
+    available = availableMemory()
+    if header is None or available is None:
+        return
+    n_pixels = 1
+    for axis in range(1, header["NAXIS"] + 1):
+        n_pixels *= header["NAXIS%d" % axis]
+    bitpix = abs(header["BITPIX"])
+    # scaled integer data is converted to floating point
+    item_size = (4 if bitpix <= 16 else 8) if "BSCALE" in header or "BZERO" in header else bitpix // 8
+    required = n_pixels * item_size
+    if required > available:
+        raise MemoryError("Loading {} requires {:.1f} GB, but only {:.1f} GB are available".format(
+            file, required / 1024 ** 3, available / 1024 ** 3))
+
+
+def _getImageHDU(hdu_list):
+    index = findImageHDU(hdu_list)
+    return hdu_list[index] if index is not None else None
+
+
 class MapViewerController(ViewerController, MPLCoordinatesMixin):
     data_type = DataType.MAP
     viewer_type = ViewerType.MPL
+    preview_pixels = 4096 * 4096  # larger images are opened with a decimated preview first
+    preview_size = 1024  # maximum side length of the preview
 
     def __init__(self, model):
         ViewerController.__init__(self)
@@ -73,11 +260,22 @@ class MapViewerController(ViewerController, MPLCoordinatesMixin):
 
     @classmethod
     def fromFile(cls, file):
-        s_map = Map(file)
-        s_map.path = file
+        return cls(cls.readModel(file))
+
+    @classmethod
+    def readModel(cls, file):
+        if not cls.memory_map:
+            checkMemory(file)
+        return MapModel(openMap(file, cls.memory_map))
 
+    @classmethod
+    def readPreview(cls, file):
+        s_map = openMapPreview(file, cls.preview_pixels, cls.preview_size)
+        if s_map is None:
+            return None
         model = MapModel(s_map)
-        return cls(model)
+        model.preview = True
+        return model
 
     @classmethod
     def fromModel(cls, model):
@@ -116,30 +314,37 @@ class MapViewerController(ViewerController, MPLCoordinatesMixin):
 
 
 class MapViewer(PlotWidget):
+    window_margin = 0.25  # pixels rendered around the visible region, relative to its size
 
     def __init__(self):
         PlotWidget.__init__(self)
+        self._level_image = None  # (image, pyramid, level, window) of the displayed map
+        self._level_pending = False
+        self.canvas.mpl_connect("resize_event", lambda evt: self._scheduleLevelUpdate())
 
     def draw(self, model):
         self.figure.clear()
+        self._level_image = None
         try:
             s_map = model.map
             plot_preferences = model.plot_preferences
 
             ax = self.figure.add_subplot(111, projection=s_map)
-            image = s_map.plot(axes=ax, title=False, cmap=model.cmap, norm=model.norm,
-                               interpolation=model.interpolation, origin=model.origin,
-                               annotate=plot_preferences["annotate"])
+            pyramid = model.pyramid
+            level = self._selectLevel(pyramid, ax, (-0.5, s_map.data.shape[1] - 0.5))
+            image = levelMap(s_map, pyramid, level).plot(axes=ax, title=False, cmap=model.cmap, norm=model.norm,
+                                                         interpolation=model.interpolation, origin=model.origin,
+                                                         annotate=plot_preferences["annotate"])
+            self._initLevel(ax, image, pyramid, level, model.norm or s_map.plot_settings.get("norm"))
 
             if plot_preferences["show_colorbar"]:
                 self.figure.colorbar(image)
             if plot_preferences["show_limb"]:
-                s_map.draw_limb(axes=ax)
+                drawLimb(s_map, ax)
             if plot_preferences["contours"]:
-                levels = sorted(plot_preferences["contours"])
-                s_map.draw_contours(levels * u.percent, axes=ax)
+                drawContours(s_map, plot_preferences["contours"], ax)
             if plot_preferences["draw_grid"]:
-                s_map.draw_grid(grid_spacing=10 * u.deg, axes=ax)
+                drawGrid(s_map, ax, 10 * u.deg)
             if not plot_preferences["wcs_grid"]:
                 ax.coords.grid(alpha=0)
         except Exception as ex:
@@ -147,25 +352,135 @@ class MapViewer(PlotWidget):
 
     def _drawFallback(self, model):
         self.figure.clear()
+        self._level_image = None
         try:
             s_map = model.map
             plot_preferences = model.plot_preferences
 
             ax = self.figure.add_subplot(111, projection=s_map)
-            image = ax.imshow(model.data, cmap=model.cmap, norm=model.norm,
+            pyramid = model.pyramid
+            level = self._selectLevel(pyramid, ax, (-0.5, s_map.data.shape[1] - 0.5))
+            data = pyramid.getLevel(level) if pyramid is not None else model.data
+            image = ax.imshow(data, cmap=model.cmap, norm=model.norm,
                               interpolation=model.interpolation, origin=model.origin)
+            self._initLevel(ax, image, pyramid, level, model.norm)
 
             if plot_preferences["show_colorbar"]:
                 self.figure.colorbar(image)
             if plot_preferences["show_limb"]:
-                s_map.draw_limb(axes=ax)
+                drawLimb(s_map, ax)
             if plot_preferences["contours"]:
-                levels = sorted(plot_preferences["contours"])
-                s_map.draw_contours(levels * u.percent, axes=ax)
+                drawContours(s_map, plot_preferences["contours"], ax)
             if plot_preferences["draw_grid"]:
-                s_map.draw_grid(grid_spacing=10 * u.deg, axes=ax)
+                drawGrid(s_map, ax, 10 * u.deg)
             if plot_preferences["wcs_grid"] and wcsaxes_compat.is_wcsaxes(ax):
                 wcsaxes_compat.default_wcs_grid(ax, units=s_map.spatial_units, ctypes=s_map.wcs.wcs.ctype)
         except Exception as ex:
             self.figure.clear()
             self.figure.text(0.5, 0.5, s="Error during rendering data: " + str(ex), ha="center", va="center")
+
+    def _selectLevel(self, pyramid, ax, x_lim, y_lim=None):
+        if pyramid is None:
+            return 0
+        y_lim = y_lim or (-0.5, pyramid.data.shape[0] - 0.5)
+        return pyramid.selectLevel((x_lim[1] - x_lim[0], y_lim[1] - y_lim[0]), (ax.bbox.width, ax.bbox.height))
+
+    def _initLevel(self, ax, image, pyramid, level, norm):
+        """Stretches the plotted level to the full resolution image and follows zoom and resize events."""
+        if pyramid is None:
+            return
+        ny, nx = pyramid.data.shape
+        rows, columns = pyramid.getShape(level)
+        window = (0, columns, 0, rows)
+        image.set_extent(pyramid.getExtent(level, window, image.origin))
+        ax.set_xlim(-0.5, nx - 0.5)
+        ax.set_ylim(*((-0.5, ny - 0.5) if image.origin == "lower" else (ny - 0.5, -0.5)))
+        self._level_image = (image, pyramid, level, window)
+        self._setNorm(image, norm)
+        ax.callbacks.connect("xlim_changed", lambda a: self._scheduleLevelUpdate())
+        ax.callbacks.connect("ylim_changed", lambda a: self._scheduleLevelUpdate())
+
+    def _setNorm(self, image, norm):
+        """Sets a copy of the normalization. Levels are averaged, missing limits are taken from the full image."""
+        vmin, vmax = self._level_image[1].getLimits()
+        norm = deepcopy(norm) if norm is not None else colors.Normalize()
+        if norm.vmin is None:
+            norm.vmin = vmin
+        if norm.vmax is None:
+            norm.vmax = vmax
+        image.set_norm(norm)
+
+    def updateArtists(self, previous, model):
+        if self._level_image is None or not _isDisplayChange(previous, model):
+            return False
+        image = self._level_image[0]
+        image.set_cmap(model.cmap)
+        self._setNorm(image, model.norm or model.map.plot_settings.get("norm"))
+        return True
+
+    def _scheduleLevelUpdate(self):
+        # zooms set the x and y limits one after another, the level is updated once both are final
+        if self._level_pending:
+            return
+        self._level_pending = True
+        QtCore.QTimer.singleShot(0, self._onLevelUpdate)
+
+    def _onLevelUpdate(self):
+        self._level_pending = False
+        if self._updateLevel():
+            self.canvas.draw_idle()
+
+    def _updateLevel(self) -> bool:
+        """
+        Shows the pixels of the level that matches the current axes limits and the size of the canvas. Only the
+        visible window (with a margin) is passed to the image, it is replaced when the view leaves the window.
+
+        :return: True if the image was changed
+        """
+        if self._level_image is None:
+            return False
+        image, pyramid, level, window = self._level_image
+        ax = image.axes
+        x_lim, y_lim = ax.get_xlim(), ax.get_ylim()
+        new_level = self._selectLevel(pyramid, ax, x_lim, y_lim)
+        visible = pyramid.getWindow(new_level, x_lim, y_lim)
+        if new_level == level and _isCached(window, visible, 2 * (1 + 2 * self.window_margin)):
+            return False
+        window = pyramid.getWindow(new_level, x_lim, y_lim, self.window_margin)
+        if window[0] == window[1] or window[2] == window[3]:
+            return False  # outside of the image
+        image.set_data(pyramid.getLevel(new_level, window))
+        image.set_extent(pyramid.getExtent(new_level, window, image.origin))
+        self._level_image = (image, pyramid, new_level, window)
+        return True
+
+    @property
+    def level(self) -> int:
+        """The displayed resolution level of the map (0 for full resolution)."""
+        return self._level_image[2] if self._level_image is not None else 0
+
+    @property
+    def window(self):
+        """The (x_start, x_stop, y_start, y_stop) pixels of the level that are passed to the image."""
+        return self._level_image[3] if self._level_image is not None else None
+
+
+def _isCached(window, visible, max_ratio):
+    """Returns True if the window contains the visible pixels and is at most max_ratio times larger."""
+    for i in [0, 2]:
+        if visible[i] < window[i] or visible[i + 1] > window[i + 1]:
+            return False
+        if window[i + 1] - window[i] > max(visible[i + 1] - visible[i], 1) * max_ratio:
+            return False
+    return True
+
+
+def _isDisplayChange(previous: MapModel, model: MapModel) -> bool:
+    """Returns True if the models show the same map and differ at most in the colormap and normalization."""
+    if previous.map.data is not model.map.data or previous.map.mask is not model.map.mask:
+        return False
+    try:
+        return previous.map.meta == model.map.meta and previous.plot_preferences == model.plot_preferences and \
+               previous.interpolation == model.interpolation and previous.origin == model.origin
+    except ValueError:  # array valued meta data
+        return False
@@ -1,14 +1,17 @@
 import os
 from copy import copy
 
-from astropy.io.fits import getdata, getheader
 from astropy.wcs import WCS
-from ndcube import NDCube, NDCubeSequence
 
 from solarviewer.app.plot import PlotWidget
-from solarviewer.config.base import ViewerController, Viewer, DataModel, ViewerConfig, DataType, ViewerType
+from solarviewer.config.base import ViewerController, Viewer, DataModel, ViewerConfig, DataType, ViewerType, \
+    arrayBytes
+from solarviewer.config.cache import readImage
+from solarviewer.util import lazyImport
 from solarviewer.viewer.util import MPLCoordinatesMixin
 
+ndcube = lazyImport("ndcube")
+
 
 class NDCubeModel(DataModel):
     def __init__(self, cube, files):
@@ -22,6 +25,11 @@ class NDCubeModel(DataModel):
         else:
             self.title = "NDCubeSequence ({} cubes)".format(len(files))
 
+    @property
+    def nbytes(self):
+        cubes = self.cube.data if isinstance(self.cube, ndcube.NDCubeSequence) else [self.cube]
+        return sum(arrayBytes(c.data) for c in cubes)
+
     @property
     def cmap(self):
         cmap = copy(self._cmap)
@@ -58,13 +66,17 @@ class NDCubeViewerController(ViewerController, MPLCoordinatesMixin):
 
     @classmethod
     def fromFile(cls, files: str) -> 'ViewerController':
-        cubes = [NDCube(getdata(f), WCS(getheader(f))) for f in files]
+        return cls(cls.readModel(files))
+
+    @classmethod
+    def readModel(cls, files):
+        images = [readImage(f, cls.memory_map) for f in files]
+        cubes = [ndcube.NDCube(data, WCS(header)) for data, header in images]
         if len(cubes) == 1:
             cube = cubes[0]
         else:
-            cube = NDCubeSequence(cubes)
-        model = NDCubeModel(cube, files)
-        return cls(model)
+            cube = ndcube.NDCubeSequence(cubes)
+        return NDCubeModel(cube, files)
 
     @classmethod
     def fromModel(cls, model: DataModel) -> 'ViewerController':
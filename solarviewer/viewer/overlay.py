@@ -0,0 +1,141 @@
+"""Overlays of maps (contours, limb and heliographic grid) drawn from cached geometry in pixel coordinates."""
+import weakref
+from collections import OrderedDict
+from copy import deepcopy
+from threading import Lock
+
+import numpy as np
+from astropy import units as u
+from astropy.coordinates import SkyCoord
+from matplotlib import rcParams
+from matplotlib.collections import LineCollection
+from matplotlib.contour import ContourSet
+from matplotlib.patches import Polygon
+from sunpy.coordinates import HeliographicStonyhurst, Heliocentric
+
+max_entries = 32  # cached limb and grid geometries (one per WCS and grid spacing)
+grid_resolution = 1  # deg, sampling of the grid lines
+grid_style = {"color": "white", "alpha": 0.5, "zorder": 100}  # see sunpy.visualization.wcsaxes_compat
+
+_contours = {}  # id(array) -> (weak reference, {levels: contour geometry})
+_geometry = OrderedDict()  # (overlay, WCS, ...) -> geometry, least recently used first
+_lock = Lock()
+
+
+def drawContours(s_map, levels, axes) -> ContourSet:
+    """
+    Draws the contours of the map. The contour paths are computed once per data array and levels.
+
+    :param s_map: the map
+    :param levels: the contour levels in percent of the maximum
+    :param axes: the WCSAxes of the map
+    :return: the contour set
+    """
+    levels = tuple(sorted(levels))
+    key = id(s_map.data)
+    cached = _contours.get(key)
+    if cached is None or cached[0]() is not s_map.data:
+        cached = (weakref.ref(s_map.data, lambda ref: _forgetContours(key, ref)), {})
+        _contours[key] = cached
+    geometry = cached[1].get(levels)
+    if geometry is None:
+        contours = s_map.draw_contours(levels * u.percent, axes=axes)
+        # segments and colors of the levels, available in all matplotlib versions
+        cached[1][levels] = (contours.levels, contours.allsegs, contours.allkinds, contours.colors,
+                             None if contours.colors is not None else contours.cmap, deepcopy(contours.norm))
+        return contours
+    values, segments, kinds, colors, cmap, norm = geometry
+    return ContourSet(axes, values, segments, kinds, colors=colors, cmap=cmap, norm=norm)
+
+
+def _forgetContours(key, ref):
+    if _contours.get(key, (None,))[0] is ref:
+        del _contours[key]
+
+
+def drawLimb(s_map, axes):
+    """
+    Draws the solar limb as seen by the observer of the map. The limb is computed once per WCS.
+
+    :param s_map: the map
+    :param axes: the WCSAxes of the map
+    :return: the limb patches
+    """
+
+    def compute():
+        patches = [p for p in s_map.draw_limb(axes=axes) if p is not None]
+        to_pixel = axes.transData.inverted()
+        geometry = [(to_pixel.transform(p.get_transform().transform(_flatten(p.get_path()))), {
+            "fill": p.get_fill(), "facecolor": p.get_facecolor(), "edgecolor": p.get_edgecolor(),
+            "linewidth": p.get_linewidth(), "linestyle": p.get_linestyle(), "zorder": p.get_zorder()})
+                    for p in patches]
+        for p in patches:
+            p.remove()
+        return geometry
+
+    geometry = _getGeometry(("limb", _wcsKey(s_map)), compute)
+    return [axes.add_patch(Polygon(vertices, closed=True, transform=axes.transData, **properties))
+            for vertices, properties in geometry]
+
+
+def drawGrid(s_map, axes, grid_spacing=15 * u.deg):
+    """
+    Draws the Stonyhurst heliographic grid. The tick labels are added by the coordinate overlay of the axes,
+    the grid lines on the visible hemisphere are computed once per WCS and grid spacing.
+
+    :param s_map: the map
+    :param axes: the WCSAxes of the map
+    :param grid_spacing: the spacing of the longitude and latitude lines
+    :return: the coordinate overlay
+    """
+    overlay = s_map.draw_grid(grid_spacing=grid_spacing, axes=axes)
+    try:
+        lines = _getGeometry(("grid", _wcsKey(s_map), grid_spacing.to_value(u.deg)),
+                             lambda: _gridLines(s_map, grid_spacing.to_value(u.deg)))
+    except Exception:
+        return overlay  # e.g., no observer, drawn by the overlay
+    overlay.grid(draw_grid=False)
+    style = dict(linewidth=rcParams["grid.linewidth"], linestyle=rcParams["grid.linestyle"], **grid_style)
+    axes.add_collection(LineCollection(lines, transform=axes.transData, **style), autolim=False)
+    return overlay
+
+
+def _gridLines(s_map, spacing):
+    lines = [(np.full(int(180 / grid_resolution) + 1, lon), np.linspace(-90, 90, int(180 / grid_resolution) + 1))
+             for lon in np.arange(-180, 180, spacing)]
+    lines += [(np.linspace(-180, 180, int(360 / grid_resolution) + 1), np.full(int(360 / grid_resolution) + 1, lat))
+              for lat in np.arange(-90 + spacing, 90, spacing)]
+    lon, lat = np.concatenate([l[0] for l in lines]), np.concatenate([l[1] for l in lines])
+    frame = HeliographicStonyhurst(obstime=s_map.reference_date, rsun=s_map.rsun_meters)
+    coords = SkyCoord(lon * u.deg, lat * u.deg, s_map.rsun_meters, frame=frame)
+    # points on the far side are hidden by the sun (P * O > R^2 for the observer at O)
+    observer = s_map.observer_coordinate
+    z = coords.transform_to(Heliocentric(observer=observer, obstime=s_map.reference_date)).z
+    visible = z * observer.radius > s_map.rsun_meters ** 2
+    x, y = s_map.wcs.world_to_pixel(coords)
+    x, y = np.where(visible, x, np.nan), np.where(visible, y, np.nan)
+    splits = np.cumsum([len(l[0]) for l in lines])[:-1]
+    return [np.column_stack(xy) for xy in zip(np.split(x, splits), np.split(y, splits))]
+
+
+def _flatten(path, samples=16):
+    # vertices along the curves of the path, the world transform of the patch is not affine
+    return np.concatenate([curve(np.linspace(0, 1, samples)) for curve, _ in path.iter_bezier()])
+
+
+def _wcsKey(s_map):
+    return s_map.wcs.to_header_string(), s_map.rsun_meters.to_value(u.m)
+
+
+def _getGeometry(key, compute):
+    with _lock:
+        geometry = _geometry.get(key)
+        if geometry is not None:
+            _geometry.move_to_end(key)
+            return geometry
+    geometry = compute()
+    with _lock:
+        _geometry[key] = geometry
+        while len(_geometry) > max_entries:
+            _geometry.popitem(last=False)
+    return geometry
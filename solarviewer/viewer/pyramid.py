@@ -0,0 +1,171 @@
+"""Multi-resolution pyramids of large images, so that maps are rendered at screen resolution."""
+import math
+import weakref
+from threading import Lock
+from typing import Tuple
+
+import numpy as np
+
+strip_pixels = 4096 * 1024  # source pixels averaged at once, limits the temporary memory of memory mapped images
+
+_pyramids = {}  # id(array) -> (weak reference, pyramid)
+
+
+class ImagePyramid:
+    """
+    Block averaged levels of a two dimensional image. Level n averages blocks of 2^n x 2^n pixels, level 0 is the
+    image itself. Levels are computed from the finest available level on the first request.
+    Masked pixels are excluded from the averages, blocks without unmasked pixels are masked.
+    Remaining rows and columns that do not fill a block are cropped.
+    """
+
+    def __init__(self, data: np.ndarray, mask: np.ndarray = None):
+        """
+        :param data: the two dimensional image
+        :param mask: the optional mask of the image (True for masked pixels)
+        """
+        self.data = data
+        self.mask = mask
+        self._levels = {0: (data, mask, None)}  # level -> (data, mask, number of unmasked pixels per block)
+        self._limits = None
+        self._lock = Lock()
+
+    @property
+    def max_level(self) -> int:
+        """The coarsest level, with at least two pixels along each axis."""
+        return max(int(math.log2(min(self.data.shape))) - 1, 0)
+
+    def getLevel(self, level: int, window=None) -> np.ndarray:
+        """
+        Returns the image of the level (masked array if the image is masked).
+
+        :param level: the level (0 for full resolution)
+        :param window: the optional (x_start, x_stop, y_start, y_stop) slice bounds of the returned pixels
+        :return: the block averaged image
+        """
+        level = min(max(level, 0), self.max_level)
+        with self._lock:
+            if level not in self._levels:
+                source = max(l for l in self._levels if l < level)
+                data, mask, weights = self._levels[source]
+                factor = 2 ** (level - source)
+                if mask is None:
+                    self._levels[level] = (blockAverage(data, factor), None, None)
+                else:
+                    data, weights = blockAverage(data, factor, ~np.asarray(mask) if weights is None else weights)
+                    self._levels[level] = (data, weights == 0, weights)
+            data, mask, _ = self._levels[level]
+        if window is not None:
+            data = data[window[2]:window[3], window[0]:window[1]]
+            mask = None if mask is None else np.asarray(mask)[window[2]:window[3], window[0]:window[1]]
+        return data if mask is None else np.ma.array(data, mask=mask)
+
+    def getShape(self, level: int) -> Tuple[int, int]:
+        """Returns the (rows, columns) of the level."""
+        factor = 2 ** level
+        return self.data.shape[0] // factor, self.data.shape[1] // factor
+
+    def getWindow(self, level: int, x_lim, y_lim, margin=0.) -> Tuple[int, int, int, int]:
+        """
+        Returns the pixels of the level that cover the limits.
+
+        :param level: the level
+        :param x_lim: the horizontal limits in pixel coordinates of the full resolution image
+        :param y_lim: the vertical limits in pixel coordinates of the full resolution image
+        :param margin: additional pixels on each side, relative to the size of the window
+        :return: the (x_start, x_stop, y_start, y_stop) slice bounds of the window
+        """
+        factor = 2 ** level
+        window = []
+        for lim, size in zip([x_lim, y_lim], reversed(self.getShape(level))):
+            start, stop = (min(lim) + 0.5) / factor, (max(lim) + 0.5) / factor
+            extension = (stop - start) * margin
+            window.append(min(max(int(math.floor(start - extension)), 0), size))
+            window.append(min(max(int(math.ceil(stop + extension)), 0), size))
+        return tuple(window)
+
+    def getExtent(self, level: int, window, origin="lower") -> Tuple[float, float, float, float]:
+        """
+        Returns the extent of a window of the level in pixel coordinates of the full resolution image.
+
+        :param level: the level
+        :param window: the (x_start, x_stop, y_start, y_stop) slice bounds of the window
+        :param origin: the origin of the plotted image ("lower" or "upper")
+        :return: the (left, right, bottom, top) extent
+        """
+        factor = 2 ** level
+        x0, x1, y0, y1 = [i * factor - 0.5 for i in window]
+        if origin == "upper":  # the first row is shown at the top
+            return x0, x1, y1, y0
+        return x0, x1, y0, y1
+
+    def getLimits(self) -> Tuple[float, float]:
+        """Returns the minimum and maximum of the full resolution image (NaNs are ignored)."""
+        if self._limits is None:
+            self._limits = (float(np.nanmin(self.data)), float(np.nanmax(self.data)))
+        return self._limits
+
+    def selectLevel(self, view_size, screen_size) -> int:
+        """
+        Returns the coarsest level that still has at least one pixel per screen pixel.
+
+        :param view_size: the (width, height) of the visible region in image pixels
+        :param screen_size: the (width, height) of the region on screen in device pixels
+        :return: the level
+        """
+        ratio = min(abs(v) / max(s, 1) for v, s in zip(view_size, screen_size))
+        if ratio < 2:
+            return 0
+        return min(int(math.floor(math.log2(ratio))), self.max_level)
+
+
+def getPyramid(data: np.ndarray, mask: np.ndarray = None) -> ImagePyramid:
+    """
+    Returns the pyramid of the image. Pyramids are shared between the copies of a model that reference the same
+    (read-only) array and released with the array.
+
+    :param data: the two dimensional image
+    :param mask: the optional mask of the image
+    :return: the pyramid
+    """
+    key = id(data)
+    cached = _pyramids.get(key)
+    if cached is not None and cached[0]() is data and cached[1].mask is mask:
+        return cached[1]
+    pyramid = ImagePyramid(data, mask)
+    _pyramids[key] = (weakref.ref(data, lambda ref: _forgetPyramid(key, ref)), pyramid)
+    return pyramid
+
+
+def _forgetPyramid(key, ref):
+    if _pyramids.get(key, (None,))[0] is ref:
+        del _pyramids[key]
+
+
+def blockAverage(data: np.ndarray, factor: int, weights: np.ndarray = None):
+    """
+    Averages blocks of factor x factor pixels. Integer images are averaged in single precision.
+
+    :param data: the two dimensional image
+    :param factor: the side length of the blocks
+    :param weights: the optional weights of the pixels (e.g., False for masked pixels)
+    :return: the reduced image or, with weights, the weighted averages and the summed weights of the blocks.
+        Blocks without weight are 0.
+    """
+    dtype = data.dtype if data.dtype.kind == "f" else np.float32
+    ny, nx = data.shape[0] // factor, data.shape[1] // factor
+    reduced = np.empty((ny, nx), dtype)
+    reduced_weights = None if weights is None else np.empty((ny, nx), np.float32)
+    rows = max(strip_pixels // max(nx * factor * factor, 1), 1)
+    for y in range(0, ny, rows):
+        strip = np.asarray(data[y * factor:min(y + rows, ny) * factor, :nx * factor], dtype=dtype)
+        if weights is None:
+            reduced[y:y + rows] = strip.reshape(-1, factor, nx, factor).mean(axis=(1, 3))
+            continue
+        w = np.asarray(weights[y * factor:min(y + rows, ny) * factor, :nx * factor], dtype=np.float32)
+        # masked pixels may hold any (fill) value
+        total = (np.where(w > 0, strip, 0) * w).reshape(-1, factor, nx, factor).sum(axis=(1, 3))
+        w = w.reshape(-1, factor, nx, factor).sum(axis=(1, 3))
+        reduced[y:y + rows] = np.divide(total, w, out=np.zeros_like(total), where=w > 0)
+        reduced_weights[y:y + rows] = w
+    return reduced if weights is None else (reduced, reduced_weights)
@@ -1,16 +1,20 @@
-from sunpy.timeseries import TimeSeries
-
 from solarviewer.app.plot import PlotWidget
 from solarviewer.config.base import ViewerController, DataModel, ViewerConfig, DataType, ViewerType, Viewer
-from solarviewer.util import classproperty
+from solarviewer.util import classproperty, lazyImport
 from solarviewer.viewer.util import MPLCoordinatesMixin
 
+timeseries = lazyImport("sunpy.timeseries")
+
 
 class TimeSeriesModel(DataModel):
     def __init__(self, time_series):
         self.title = "{} ({:%Y-%m-%d %H:%M:%S})".format(time_series.source.upper(), time_series.time_range.start)
         self.series = time_series
 
+    @property
+    def nbytes(self):
+        return int(self.series.data.memory_usage().sum())
+
 
 class TimeSeriesViewerController(ViewerController, MPLCoordinatesMixin):
     data_type = DataType.SERIES
@@ -27,9 +31,12 @@ class TimeSeriesViewerController(ViewerController, MPLCoordinatesMixin):
 
     @classmethod
     def fromFile(cls, file):
-        series = TimeSeries(file)
-        model = TimeSeriesModel(series)
-        return cls(model)
+        return cls(cls.readModel(file))
+
+    @classmethod
+    def readModel(cls, file):
+        series = timeseries.TimeSeries(file)
+        return TimeSeriesModel(series)
 
     @classmethod
     def fromModel(cls, model):
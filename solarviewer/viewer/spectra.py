@@ -1,17 +1,20 @@
 from matplotlib import pyplot as plt
-from radiospectra.sources import CallistoSpectrogram
-from radiospectra.util import get_day
 
 from solarviewer.app.app import AppController
 from solarviewer.app.plot import PlotWidget
-from solarviewer.config.base import DataModel, ViewerController, Viewer, ViewerConfig, DataType, ViewerType
+from solarviewer.config.base import DataModel, ViewerController, Viewer, ViewerConfig, DataType, ViewerType, \
+    arrayBytes
 from solarviewer.config.ioc import RequiredFeature
+from solarviewer.util import lazyImport
 from solarviewer.viewer.util import MPLCoordinatesMixin
 
+sources = lazyImport("radiospectra.sources")
+radio_util = lazyImport("radiospectra.util")
+
 
 class CallistoModel(DataModel):
 
-    def __init__(self, spectrogram: CallistoSpectrogram):
+    def __init__(self, spectrogram: "sources.CallistoSpectrogram"):
         self.spectrogram = spectrogram
         self.vmin = None
         self.vmax = None
@@ -19,6 +22,10 @@ class CallistoModel(DataModel):
         self.linear = True
         self.substract_background = False
 
+    @property
+    def nbytes(self):
+        return arrayBytes(self.spectrogram.data)
+
 
 class CallistoViewer(PlotWidget):
 
@@ -48,10 +55,13 @@ class CallistoViewerController(ViewerController, MPLCoordinatesMixin):
 
     @classmethod
     def fromFile(cls, files) -> 'ViewerController':
-        list = [CallistoSpectrogram.read(file) for file in files]
-        spectrogram = CallistoSpectrogram.join_many(list)
-        model = CallistoModel(spectrogram)
-        return cls(model)
+        return cls(cls.readModel(files))
+
+    @classmethod
+    def readModel(cls, files):
+        list = [sources.CallistoSpectrogram.read(file) for file in files]
+        spectrogram = sources.CallistoSpectrogram.join_many(list)
+        return CallistoModel(spectrogram)
 
     @classmethod
     def fromModel(cls, model: DataModel) -> 'ViewerController':
@@ -77,7 +87,7 @@ class CallistoViewerController(ViewerController, MPLCoordinatesMixin):
     def getTitle(self) -> str:
         img = self._model.spectrogram
         return ' '.join(
-            [get_day(img.start).strftime("%d %b %Y"), 'Radio flux density', '(' + ', '.join(img.instruments) + ')', ])
+            [radio_util.get_day(img.start).strftime("%d %b %Y"), 'Radio flux density', '(' + ', '.join(img.instruments) + ')', ])
 
     @property
     def data_type(self) -> str: